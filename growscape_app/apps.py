@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class GrowscapeAppConfig(AppConfig):
     name = 'growscape_app'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
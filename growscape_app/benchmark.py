@@ -0,0 +1,233 @@
+"""
+End-to-end URL benchmark.
+
+Every route in the URLconf (except Django admin and logout) is requested
+through the test client against a freshly seeded, deterministic dataset.
+Parameterised routes get sample arguments from SAMPLE_ARGUMENTS, and a few
+extra requests cover query strings (search, filters, paging). Each URL
+gets warm-up requests and then timed iterations. For each one we record
+p50/p95 latency, steady-state and cold query counts, response bytes and
+status.
+
+compare() checks a run against a stored baseline. p95 latency may grow by
+a relative threshold (ignoring changes below a small absolute floor). Query
+counts may not grow at all.
+
+check_query_plans() EXPLAINs the hot list queries and reports any whose
+plan does not use the index added for it (migration 0008).
+"""
+import platform
+import time
+from datetime import timedelta
+from statistics import median
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from .models import Blog, Category, ContactMessage, GalleryImage, Project, Service, ServiceInquiry, TeamMember, Testimonial
+from .sitemap import SITEMAPS
+
+SKIPPED_ROUTES = {"admin_logout"}
+
+# url name -> callable returning a list of kwargs dicts to request it with
+SAMPLE_ARGUMENTS = {
+    "service_detail": lambda: [{"slug": Service.objects.order_by("pk").values_list("slug", flat=True).first()}],
+    "project_detail": lambda: [{"pk": Project.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "blog_detail": lambda: [{"slug": Blog.objects.order_by("pk").values_list("slug", flat=True).first()}],
+    "service_update": lambda: [{"pk": Service.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "project_update": lambda: [{"pk": Project.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "team_update": lambda: [{"pk": TeamMember.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "blog_update": lambda: [{"pk": Blog.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "update_category": lambda: [{"pk": Category.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "testimonial_update": lambda: [{"pk": Testimonial.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    # GET on the delete routes only redirects; requesting them is harmless.
+    "service_delete": lambda: [{"pk": Service.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "project_delete": lambda: [{"pk": Project.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "team_delete": lambda: [{"pk": TeamMember.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "blog_delete": lambda: [{"pk": Blog.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "delete_category": lambda: [{"pk": Category.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "delete_image": lambda: [{"image_id": GalleryImage.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "testimonial_delete": lambda: [{"pk": Testimonial.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "delete_contact": lambda: [{"pk": ContactMessage.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "inquiry_delete": lambda: [{"pk": ServiceInquiry.objects.order_by("pk").values_list("pk", flat=True).first()}],
+    "sitemap_section": lambda: [{"section": section} for section in SITEMAPS],
+    # Only routed when MEDIA_SERVE_MODE is set outside DEBUG.
+    "media": lambda: [{"path": GalleryImage.objects.order_by("pk").values_list("image", flat=True).first()}],
+}
+
+# (label, url name, query string) for variants the bare routes don't cover
+EXTRA_REQUESTS = [
+    ("search?q", "search", "q=garden+maintenance"),
+    ("search_json?q", "search_json", "q=pool"),
+    ("gallery?category", "gallery", lambda: f"category={Category.objects.order_by('pk').values_list('pk', flat=True).first()}"),
+    ("gallery_fragment?page=2", "gallery_fragment", "page=2"),
+    ("public_blog_list?page=2", "public_blog_list", "page=2"),
+    ("admin_dashboard?range=12m", "admin_dashboard", "range=12m"),
+]
+
+# (index name, callable returning the queryset that should use it)
+PLAN_CHECKS = [
+    ("project_created_id_idx", lambda: Project.objects.order_by("-created_at", "-id")[:20]),
+    (
+        "project_created_id_idx",
+        lambda: Project.objects.filter(created_at__gte=timezone.now() - timedelta(days=30)).order_by("-created_at"),
+    ),
+    ("blog_created_id_idx", lambda: Blog.objects.order_by("-created_at", "-id")[:20]),
+    ("contact_created_id_idx", lambda: ContactMessage.objects.order_by("-created_at", "-id")[:20]),
+    ("inquiry_created_id_idx", lambda: ServiceInquiry.objects.order_by("-created_at", "-id")[:20]),
+    (
+        "gallery_cat_uploaded_idx",
+        lambda: GalleryImage.objects.filter(
+            category_id=Category.objects.order_by("pk").values_list("pk", flat=True).first()
+        ).order_by("-uploaded_at", "-id")[:8],
+    ),
+    ("gallery_uploaded_idx", lambda: GalleryImage.objects.order_by("-uploaded_at", "-id")[:24]),
+    ("category_created_idx", lambda: Category.objects.order_by("-created_at")[:20]),
+    ("testimonial_name_lower_idx", lambda: Testimonial.objects.order_by(Lower("name"))[:20]),
+]
+
+
+def _walk(resolver, prefix=""):
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name == "admin":
+                continue
+            yield from _walk(pattern, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield pattern, prefix + str(pattern.pattern)
+
+
+def discover_requests():
+    """[(label, path, needs_login)] for every benchmarked request."""
+    requests = []
+    for pattern, route in _walk(get_resolver()):
+        name = pattern.name
+        if name in SKIPPED_ROUTES:
+            continue
+        if name is None:
+            if pattern.pattern.regex.groups or "<" in route:
+                continue
+            path = "/" + route.lstrip("^").rstrip("$")
+            requests.append((path, path, path.startswith("/dashboard/")))
+            continue
+
+        if pattern.pattern.regex.groups:
+            if name not in SAMPLE_ARGUMENTS:
+                raise LookupError(f"No sample arguments for route {name!r}; add it to SAMPLE_ARGUMENTS.")
+            for kwargs in SAMPLE_ARGUMENTS[name]():
+                path = reverse(name, kwargs=kwargs)
+                label = f"{name}[{','.join(str(v) for v in kwargs.values())}]" if name == "sitemap_section" else name
+                requests.append((label, path, path.startswith("/dashboard/")))
+        else:
+            path = reverse(name)
+            requests.append((name, path, path.startswith("/dashboard/")))
+
+    for label, name, query in EXTRA_REQUESTS:
+        query = query() if callable(query) else query
+        path = f"{reverse(name)}?{query}"
+        requests.append((label, path, path.startswith("/dashboard/")))
+    return requests
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _fetch(client, path):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(path)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return response.status_code, elapsed_ms, len(queries), size
+
+
+def run(iterations=20, warmup=2, log=None):
+    """Benchmark every discovered request. Returns {label: metrics}."""
+    log = log or (lambda message: None)
+    user_model = get_user_model()
+    user = user_model.objects.filter(username="benchmark").first() or user_model.objects.create_superuser(
+        "benchmark", "benchmark@example.com", "benchmark"
+    )
+    anonymous, staff = Client(), Client()
+    staff.force_login(user)
+
+    results = {}
+    for label, path, needs_login in discover_requests():
+        client = staff if needs_login else anonymous
+        cold_status, _, cold_queries, _ = _fetch(client, path)
+        for _ in range(max(0, warmup - 1)):
+            _fetch(client, path)
+
+        samples = [_fetch(client, path) for _ in range(iterations)]
+        latencies = [ms for _, ms, _, _ in samples]
+        results[label] = {
+            "path": path,
+            "status": samples[-1][0],
+            "p50_ms": round(_percentile(latencies, 0.50), 2),
+            "p95_ms": round(_percentile(latencies, 0.95), 2),
+            "queries": int(median(q for _, _, q, _ in samples)),
+            "cold_queries": cold_queries,
+            "bytes": samples[-1][3],
+        }
+        log(f"{label:40} {results[label]['status']} p50={results[label]['p50_ms']:.1f}ms "
+            f"p95={results[label]['p95_ms']:.1f}ms q={results[label]['queries']} ({cold_queries} cold)")
+    return results
+
+
+def metadata(seed, volumes, iterations):
+    return {
+        "created": timezone.now().isoformat(timespec="seconds"),
+        "seed": seed,
+        "volumes": volumes,
+        "iterations": iterations,
+        "django": django.get_version(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+    }
+
+
+def compare(results, baseline, max_regression=0.25, min_delta_ms=2.0):
+    """Regression messages for ``results`` against ``baseline`` (both {label: metrics})."""
+    problems = []
+    for label, current in results.items():
+        previous = baseline.get(label)
+        if previous is None:
+            continue
+        if current["status"] != previous["status"]:
+            problems.append(f"{label}: status {previous['status']} -> {current['status']}")
+        if current["queries"] > previous["queries"]:
+            problems.append(f"{label}: queries {previous['queries']} -> {current['queries']}")
+        allowed = previous["p95_ms"] * (1 + max_regression)
+        if current["p95_ms"] > allowed and current["p95_ms"] - previous["p95_ms"] >= min_delta_ms:
+            problems.append(
+                f"{label}: p95 {previous['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms "
+                f"(limit {allowed:.1f}ms)"
+            )
+    return problems
+
+
+def check_query_plans():
+    """Messages for PLAN_CHECKS queries whose plan does not mention their index."""
+    problems = []
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # Seeded tables are small enough that a seq scan can win on cost;
+            # we only care that the index is usable.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        for index_name, build in PLAN_CHECKS:
+            plan = build().explain()
+            if index_name not in plan:
+                problems.append(f"{index_name} not used:\n{plan}")
+    return problems
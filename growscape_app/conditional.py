@@ -0,0 +1,60 @@
+"""
+Conditional GET for public pages.
+
+``content_condition("Project", ...)`` wraps a view with Django's
+``condition`` decorator. The ETag is derived from the content generations
+(see content_cache.py) of the models the page reads, plus the request path
+and the deployed templates; Last-Modified is the last time any of those
+models changed. Both come from the cache, so a matching If-None-Match or
+If-Modified-Since is answered with a 304 before the view runs any query or
+renders a template.
+
+Only use it on pages whose HTML depends on nothing but that content: no
+CSRF tokens, flash messages or per-user output. The wrapped view is marked
+with the model names (``surrogate_keys``), which is what makes it eligible
+for the full-page cache in page_cache.py.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.views.decorators.http import condition
+
+from .content_cache import get_generations, last_modified
+
+# Every public page renders the nav (see context_processors.nav_data).
+PAGE_BASE_MODELS = ("Service", "Blog")
+
+
+@lru_cache(maxsize=None)
+def _release():
+    """RELEASE from settings, or the newest template mtime, so a deploy changes every ETag."""
+    release = getattr(settings, "RELEASE", "")
+    if release:
+        return release
+    newest = 0
+    for directory in (d for engine in settings.TEMPLATES for d in engine.get("DIRS", [])):
+        for root, _, files in os.walk(directory):
+            for name in files:
+                newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return str(int(newest))
+
+
+def content_condition(*model_names):
+    names = sorted(set(model_names) | set(PAGE_BASE_MODELS))
+
+    def etag(request, *args, **kwargs):
+        generations = get_generations(names)
+        raw = "|".join([_release(), request.get_full_path()] + [f"{n}={generations[n]}" for n in names])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def modified(request, *args, **kwargs):
+        return last_modified(names)
+
+    def decorator(view):
+        wrapped = condition(etag_func=etag, last_modified_func=modified)(view)
+        wrapped.surrogate_keys = names
+        return wrapped
+
+    return decorator
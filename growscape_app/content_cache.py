@@ -0,0 +1,137 @@
+"""
+Versioned read-through cache for public content.
+
+Each model in CACHED_CONTENT_MODELS has a "generation" number stored in the
+cache. Cached lists are keyed by the generations of every model they read,
+so saving or deleting a row (see signals.py) bumps the generation and all
+lists built from that model are simply never looked up again; they expire
+on their own. Because the generations live in the cache itself, every
+gunicorn worker sharing a backend (e.g. Redis) sees a bump immediately.
+
+A per-process backend (the LocMemCache default) only sees bumps made by its
+own worker, so there generations and lists expire after
+CONTENT_CACHE_TIMEOUT (seconds, see settings) and other workers catch up
+within that window. ``check --deploy`` warns about it.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Tags, Warning, register
+from django.db import models
+
+CACHED_CONTENT_MODELS = ["Service", "Project", "Blog", "Testimonial", "TeamMember", "GalleryImage", "Category"]
+
+GENERATION_KEY = "content:gen:{}"
+MODIFIED_KEY = "content:modified:{}"
+CONTENT_KEY = "content:{}:{}"
+
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def _timeout():
+    return getattr(settings, "CONTENT_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def shared_backend():
+    """Whether the default cache is shared between worker processes."""
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_BACKENDS
+
+
+def _generation_timeout():
+    return None if shared_backend() else _timeout()
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_backend(app_configs, **kwargs):
+    if shared_backend():
+        return []
+    return [Warning(
+        "The default cache is local to each process, so content changes reach other "
+        "workers only after CONTENT_CACHE_TIMEOUT.",
+        hint="Set REDIS_URL to share the cache between workers.",
+        id="growscape_app.W001",
+    )]
+
+
+def _initial_generation():
+    # Seeded from the clock so a flushed cache never hands out a generation
+    # that older entries may still be stored under.
+    return int(time.time() * 1000)
+
+
+def get_generations(model_names):
+    keys = {name: GENERATION_KEY.format(name) for name in model_names}
+    found = cache.get_many(keys.values())
+
+    generations = {}
+    for name, key in keys.items():
+        if key not in found:
+            cache.add(key, _initial_generation(), timeout=_generation_timeout())
+            found[key] = cache.get(key)
+        generations[name] = found[key]
+    return generations
+
+
+def bump_generation(model_name):
+    key = GENERATION_KEY.format(model_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing key: start a fresh generation instead.
+        cache.set(key, _initial_generation(), timeout=_generation_timeout())
+    cache.set(MODIFIED_KEY.format(model_name), time.time(), timeout=_generation_timeout())
+
+
+def _newest_timestamp(model_name):
+    """Newest created/updated/uploaded time stored for the model, as a Unix timestamp."""
+    model = apps.get_model("growscape_app", model_name)
+    fields = [
+        field.name for field in model._meta.get_fields()
+        if isinstance(field, models.DateTimeField) and (field.auto_now or field.auto_now_add)
+    ]
+    if not fields:
+        return None
+    newest = [value for value in model.objects.aggregate(*(models.Max(name) for name in fields)).values() if value]
+    return max(newest).timestamp() if newest else None
+
+
+def last_modified(model_names):
+    """
+    When any of ``model_names`` last changed, as an aware UTC datetime.
+
+    Normally this is the time of the last bump_generation(). After a cache
+    flush it falls back to the newest timestamp column, or to now for
+    models that have none, and remembers that until the next bump.
+    """
+    keys = {name: MODIFIED_KEY.format(name) for name in model_names}
+    found = cache.get_many(keys.values())
+
+    newest = 0
+    for name, key in keys.items():
+        if key not in found:
+            cache.add(key, _newest_timestamp(name) or time.time(), timeout=_generation_timeout())
+            found[key] = cache.get(key)
+        newest = max(newest, found[key] or 0)
+    return datetime.fromtimestamp(newest, tz=timezone.utc)
+
+
+def cached_list(name, model_names, build):
+    """
+    Return ``build()`` evaluated to a list, cached until any of
+    ``model_names`` changes.
+    """
+    generations = get_generations(model_names)
+    version = ".".join(str(generations[m]) for m in sorted(model_names))
+    key = CONTENT_KEY.format(name, version)
+
+    items = cache.get(key)
+    if items is None:
+        items = list(build())
+        cache.set(key, items, timeout=_timeout())
+    return items
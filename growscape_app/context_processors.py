@@ -1,7 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .content_cache import cached_list
 from .models import Service, Blog
 
 def nav_data(request):
+    # Lazy so pages that never render the nav (e.g. the dashboard) skip the cache lookup.
     return {
-        'nav_services': Service.objects.all(),
-        'nav_blogs': Blog.objects.all()[:4],
-    }
\ No newline at end of file
+        'nav_services': SimpleLazyObject(lambda: cached_list("services", ["Service"], Service.objects.for_listing)),
+        'nav_blogs': SimpleLazyObject(lambda: cached_list("nav_blogs", ["Blog"], lambda: Blog.objects.for_listing()[:4])),
+    }
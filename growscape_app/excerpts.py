@@ -0,0 +1,146 @@
+"""
+Sanitized HTML, excerpts and reading stats for rich-text bodies.
+
+Blog, Project and Service descriptions come from CKEditor and used to be
+rendered with ``|safe`` and cut down with ``|striptags|truncatewords`` on
+every request. text_metadata() does that work once on save; the results
+are stored on the model (see models.TextMetadata) and list pages read
+only those columns.
+
+The sanitizer is an allow-list over html.parser: unknown tags are dropped
+but their text kept, script-like elements are dropped with their content,
+and only a few attributes and URL schemes survive.
+"""
+import math
+from html import escape, unescape
+from html.parser import HTMLParser
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+SUMMARY_WORDS = 20
+SUMMARY_SHORT_WORDS = 12
+WORDS_PER_MINUTE = 200
+
+ALLOWED_TAGS = {
+    "a", "b", "blockquote", "br", "code", "div", "em", "figcaption", "figure", "h1", "h2", "h3", "h4",
+    "h5", "h6", "hr", "i", "img", "li", "ol", "p", "pre", "s", "span", "strong", "sub", "sup", "table",
+    "tbody", "td", "tfoot", "th", "thead", "tr", "u", "ul",
+}
+VOID_TAGS = {"br", "hr", "img"}
+DROPPED_WITH_CONTENT = {"script", "style", "iframe", "object", "embed", "template", "noscript", "svg", "math"}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title", "target"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "ol": {"start"},
+}
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"http", "https", "mailto", "tel"}
+
+
+def _safe_url(value):
+    scheme, colon, _ = value.strip().partition(":")
+    if not colon or "/" in scheme or "?" in scheme or "#" in scheme:
+        return True  # relative URL
+    return scheme.lower() in ALLOWED_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_WITH_CONTENT:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _safe_url(value):
+                continue
+            rendered.append(f' {name}="{escape(value)}"')
+        if tag == "a" and any(name == "target" for name, _ in attrs):
+            rendered.append(' rel="noopener noreferrer"')
+        self.parts.append(f"<{tag}{''.join(rendered)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in DROPPED_WITH_CONTENT:
+            return
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_WITH_CONTENT:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            current = self.open_tags.pop()
+            self.parts.append(f"</{current}>")
+            if current == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.parts.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        return "".join(self.parts) + "".join(f"</{tag}>" for tag in reversed(self.open_tags))
+
+
+def sanitize_html(html):
+    parser = _Sanitizer()
+    parser.feed(html or "")
+    return parser.result()
+
+
+def plain_text(html):
+    return " ".join(unescape(strip_tags(html or "")).split())
+
+
+def text_metadata(html):
+    """{field: value} for the TextMetadata columns derived from ``html``."""
+    body_html = sanitize_html(html)
+    text = plain_text(body_html)
+    words = len(text.split())
+    truncator = Truncator(text)
+    return {
+        "body_html": body_html,
+        "summary": truncator.words(SUMMARY_WORDS, truncate=" …"),
+        "summary_short": truncator.words(SUMMARY_SHORT_WORDS, truncate=" …"),
+        "word_count": words,
+        "reading_minutes": max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0,
+    }
+
+
+def backfill(model, source_field, batch_size=500):
+    """Recompute the metadata columns for every ``model`` row. Returns rows updated."""
+    fields = list(text_metadata(""))
+    updated = 0
+    batch = []
+    for obj in model._default_manager.only("pk", source_field).iterator(chunk_size=batch_size):
+        for field, value in text_metadata(getattr(obj, source_field)).items():
+            setattr(obj, field, value)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model._default_manager.bulk_update(batch, fields)
+            updated += len(batch)
+            batch = []
+    if batch:
+        model._default_manager.bulk_update(batch, fields)
+        updated += len(batch)
+    return updated
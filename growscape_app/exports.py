@@ -0,0 +1,247 @@
+"""
+Streaming lead exports (contacts and service inquiries) as CSV, JSON or XLSX.
+
+Rows are read with ``values_list().iterator(chunk_size=...)``, which uses a
+server-side cursor on PostgreSQL, and each format is written as a generator
+of small chunks, so memory stays flat however many rows are exported. The
+service name is joined in the same query. XLSX is produced by a minimal
+streaming writer (inline strings, one sheet) rather than a spreadsheet
+library, because those build the whole workbook before writing it out.
+"""
+import csv
+import json
+import re
+import zipfile
+from datetime import datetime, time, timedelta
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ContactMessage, ServiceInquiry
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "json": ("application/json", "json"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+# kind -> (model, [(header, lookup), ...]); "service" filtering only applies
+# to kinds that have a service_type column.
+EXPORTS = {
+    "contacts": (ContactMessage, [
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+        ("phone", "phone"),
+        ("email", "email"),
+        ("message", "message"),
+    ]),
+    "inquiries": (ServiceInquiry, [
+        ("id", "id"),
+        ("created_at", "created_at"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+        ("phone", "phone"),
+        ("email", "email"),
+        ("service", "service_type__name"),
+        ("preferred_date", "preferred_date"),
+        ("location", "location"),
+        ("message", "message"),
+    ]),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _day_start(day):
+    start = datetime.combine(day, time.min)
+    return timezone.make_aware(start) if settings.USE_TZ else start
+
+
+def export_rows(kind, date_from=None, date_to=None, service_id=None):
+    """
+    Header tuple and a lazy row iterator for ``kind``. ``date_from`` and
+    ``date_to`` are inclusive dates.
+    """
+    if kind not in EXPORTS:
+        raise ExportError(f"Unknown export {kind!r}.")
+    model, columns = EXPORTS[kind]
+
+    rows = model.objects.all()
+    # Range on created_at itself rather than created_at__date, so the
+    # index on the column can be used.
+    if date_from:
+        rows = rows.filter(created_at__gte=_day_start(date_from))
+    if date_to:
+        rows = rows.filter(created_at__lt=_day_start(date_to + timedelta(days=1)))
+    if service_id is not None:
+        if kind != "inquiries":
+            raise ExportError("Only inquiries can be filtered by service.")
+        rows = rows.filter(service_type_id=service_id)
+
+    rows = rows.order_by("created_at", "id").values_list(*(lookup for _, lookup in columns))
+    header = tuple(name for name, _ in columns)
+    return header, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat(timespec="seconds") if timezone.is_aware(value) else value.isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+# ------------------------------------------------------------------
+# CSV
+# ------------------------------------------------------------------
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_safe(value):
+    # Leads come from public forms; keep spreadsheet apps from evaluating
+    # submitted text as a formula.
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_safe(_cell(value)) for value in row])
+
+
+# ------------------------------------------------------------------
+# JSON
+# ------------------------------------------------------------------
+
+def stream_json(header, rows):
+    yield "["
+    separator = "\n"
+    for row in rows:
+        yield separator + json.dumps(dict(zip(header, (_cell(value) for value in row))), ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]\n"
+
+
+# ------------------------------------------------------------------
+# XLSX
+# ------------------------------------------------------------------
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        value = _cell(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_XML_ILLEGAL.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def stream_xlsx(header, rows):
+    buffer = _ChunkBuffer()
+    # The buffer has no tell()/seek(), so zipfile writes data descriptors
+    # after each member and never needs to go back.
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header).encode("utf-8"))
+            for count, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if count % EXPORT_CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(b"</sheetData></worksheet>")
+        yield buffer.drain()
+    yield buffer.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "json": stream_json,
+    "xlsx": stream_xlsx,
+}
+
+
+def stream_export(kind, fmt, **filters):
+    """Iterator of str/bytes chunks for ``kind`` exported as ``fmt``."""
+    if fmt not in STREAMERS:
+        raise ExportError(f"Unknown format {fmt!r}.")
+    header, rows = export_rows(kind, **filters)
+    return STREAMERS[fmt](header, rows)
@@ -0,0 +1,106 @@
+"""
+Background derivative builds.
+
+Bulk uploads only store and verify files on the request; the rows go in
+together with one ImageJob per file. Every other image saved through the
+admin is queued the same way from post_save (see signals.py), once the save
+commits. `manage.py process_image_jobs` builds the derivatives in a process
+pool that lives as long as the command. Until then the original is served
+(see templatetags/responsive_images.py).
+
+Claiming works like the email outbox: a batch is leased in a short
+transaction (status "running", next_attempt_at = now + LEASE_SECONDS) and
+each job records its own outcome, so jobs of a crashed worker are picked up
+again once their lease runs out. Failures retry with exponential backoff.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .content_cache import bump_generation
+from .image_worker import build_field_derivatives
+from .models import ImageJob
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+LEASE_SECONDS = 60 * 10
+
+
+def enqueue_derivatives(model, field_name, names):
+    """
+    Queue a derivative build for each stored ``names`` of ``model.field_name``
+    that is not already pending or running.
+    """
+    label = model._meta.label
+    queued = set(
+        ImageJob.objects.filter(
+            model_label=label, field_name=field_name, name__in=names,
+            status__in=[ImageJob.STATUS_PENDING, ImageJob.STATUS_RUNNING],
+        ).values_list("name", flat=True)
+    )
+    return ImageJob.objects.bulk_create(
+        [
+            ImageJob(model_label=label, field_name=field_name, name=name)
+            for name in dict.fromkeys(names) if name not in queued
+        ],
+        batch_size=500,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def _claim_batch(batch_size):
+    """Lease a batch of due jobs, including running ones whose lease expired."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            ImageJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=[ImageJob.STATUS_PENDING, ImageJob.STATUS_RUNNING], next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        lease_until = now + timedelta(seconds=LEASE_SECONDS)
+        ImageJob.objects.filter(pk__in=[job.pk for job in batch]).update(
+            status=ImageJob.STATUS_RUNNING, next_attempt_at=lease_until,
+        )
+    return batch
+
+
+def process_pending(batch_size=20, pool=None):
+    """
+    Build derivatives for one batch of due jobs, on ``pool`` (an executor)
+    when given. Returns (done, failed) counts for the batch.
+    """
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    args = ([job.model_label for job in batch], [job.field_name for job in batch], [job.name for job in batch])
+    errors = pool.map(build_field_derivatives, *args) if pool is not None else map(build_field_derivatives, *args)
+
+    done = failed = 0
+    finished_models = set()
+    for job, error in zip(batch, errors):
+        job.attempts += 1
+        if error:
+            job.last_error = error
+            if job.attempts >= MAX_ATTEMPTS:
+                job.status = ImageJob.STATUS_FAILED
+            else:
+                job.status = ImageJob.STATUS_PENDING
+                job.next_attempt_at = timezone.now() + retry_delay(job.attempts)
+            failed += 1
+        else:
+            job.status, job.last_error, job.finished_at = ImageJob.STATUS_DONE, "", timezone.now()
+            finished_models.add(job.model_label.rpartition(".")[2])
+            done += 1
+        job.save(update_fields=["attempts", "status", "next_attempt_at", "last_error", "finished_at"])
+
+    # Pages now have variants to offer; let cached copies go.
+    for model_name in finished_models:
+        bump_generation(model_name)
+    return done, failed
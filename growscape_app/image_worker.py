@@ -0,0 +1,37 @@
+"""
+Process-pool entry points for image work.
+
+Pool workers start from a clean interpreter (forkserver/spawn) and unpickle
+these functions before Django is set up, so this module must not import
+models at import time. Starting clean also means workers never share the
+parent's database sockets; they only touch storage.
+"""
+import multiprocessing
+import os
+
+from PIL import Image
+
+
+def pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+def build_field_derivatives(model_label, field_name, name):
+    """Build derivatives for ``name`` stored by ``model_label``'s ``field_name``. Returns an error message or ''."""
+    from django.apps import apps
+
+    from .images import generate_derivatives_for
+
+    storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    try:
+        generate_derivatives_for(storage, name)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as exc:
+        return f"{name}: {exc}"
+    return ""
@@ -0,0 +1,145 @@
+"""
+Responsive image derivatives.
+
+Every uploaded image listed in RESPONSIVE_IMAGE_FIELDS gets a fixed set of
+resized copies written beside the original, e.g.
+
+    projects/villa.jpg -> projects/villa_320w.avif, projects/villa_320w.webp,
+                          projects/villa_320w.jpg, ... up to 1280w
+
+Names are derived from the original, so templates can build srcset URLs
+without touching the database.
+"""
+import os
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+RESPONSIVE_WIDTHS = (320, 640, 960, 1280)
+
+# Order matters: browsers pick the first <source> they support, and the
+# JPEG fallback is always written last (see generate_derivatives).
+RESPONSIVE_FORMATS = ("avif", "webp", "jpeg")
+
+FORMAT_EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+FORMAT_MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+FORMAT_SAVE_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 4},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+}
+
+# (model name, image field) pairs that get derivatives.
+RESPONSIVE_IMAGE_FIELDS = [
+    ("Service", "cover_image"),
+    ("Project", "image"),
+    ("TeamMember", "photo"),
+    ("GalleryImage", "image"),
+    ("Blog", "image"),
+    ("Testimonial", "image"),
+]
+
+
+@lru_cache(maxsize=None)
+def available_formats():
+    """Formats this Pillow build can encode (AVIF needs libavif)."""
+    return tuple(fmt for fmt in RESPONSIVE_FORMATS if fmt == "jpeg" or features.check(fmt))
+
+
+def derivative_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f"{root}_{width}w.{FORMAT_EXTENSIONS[fmt]}"
+
+
+def has_derivatives(fieldfile):
+    """The smallest JPEG is written last, so its presence means the set is complete."""
+    if not fieldfile:
+        return False
+    return fieldfile.storage.exists(derivative_name(fieldfile.name, RESPONSIVE_WIDTHS[0], "jpeg"))
+
+
+def derivative_url(fieldfile, width, fmt="jpeg"):
+    return fieldfile.storage.url(derivative_name(fieldfile.name, width, fmt))
+
+
+def derivative_srcset(fieldfile, fmt):
+    return ", ".join(
+        f"{derivative_url(fieldfile, width, fmt)} {width}w" for width in RESPONSIVE_WIDTHS
+    )
+
+
+def open_image(fh):
+    """Decode an image file object, applying EXIF orientation."""
+    image = Image.open(fh)
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    return image
+
+
+def _open_image(storage, name):
+    with storage.open(name, "rb") as fh:
+        return open_image(fh)
+
+
+def generate_derivatives(fieldfile, overwrite=False):
+    """
+    Write every width/format derivative for ``fieldfile``.
+
+    Widths larger than the original are capped at the original size (never
+    upscaled) but still written, so every name in the srcset exists.
+    Returns the number of files written.
+    """
+    if not fieldfile:
+        return 0
+    return generate_derivatives_for(fieldfile.storage, fieldfile.name, overwrite)
+
+
+def resize_to_width(image, width):
+    """``image`` scaled down to ``width`` (never up)."""
+    if width >= image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def encode(image, fmt):
+    """``image`` encoded as ``fmt`` with the derivative save options."""
+    frame = image.convert("RGB") if fmt == "jpeg" and image.mode != "RGB" else image
+    buffer = BytesIO()
+    frame.save(buffer, format=fmt.upper(), **FORMAT_SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
+
+
+def generate_derivatives_for(storage, name, overwrite=False):
+    """generate_derivatives() for a stored file outside of a model instance."""
+    original = _open_image(storage, name)
+    # ContentAddressedStorage would rename a derivative after its bytes.
+    save = getattr(storage, "save_derivative", storage.save)
+    written = 0
+
+    for width in sorted(RESPONSIVE_WIDTHS, reverse=True):
+        resized = resize_to_width(original, width)
+
+        for fmt in available_formats():
+            derivative = derivative_name(name, width, fmt)
+            if storage.exists(derivative):
+                if not overwrite:
+                    continue
+                storage.delete(derivative)
+
+            save(derivative, ContentFile(encode(resized, fmt)))
+            written += 1
+
+    return written
+
+
+def delete_derivatives(storage, name):
+    for width in RESPONSIVE_WIDTHS:
+        for fmt in RESPONSIVE_FORMATS:
+            derivative = derivative_name(name, width, fmt)
+            if storage.exists(derivative):
+                storage.delete(derivative)
@@ -0,0 +1,359 @@
+"""
+Bulk content import for projects, blogs and gallery images.
+
+A manifest (JSON or CSV) lists the records and an image directory holds the
+files they point at. Service and Category references are resolved from one
+query each, images are copied to storage by a thread pool, and rows are
+written with bulk_create in batches.
+
+Every record has an identity in the manifest: its ``id`` or ``slug`` when
+given, otherwise its image path. Imported identities are kept in
+ImportedRecord, so re-running the same manifest inserts nothing twice, while
+records (or existing rows) that happen to share image bytes are still
+imported; the storage keeps one copy of those bytes.
+
+bulk_create skips model signals, so the importer does their work itself:
+cache generations, dashboard rollups, the search index and (unless
+disabled) responsive image derivatives.
+"""
+import csv
+import json
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import rollups
+from .content_cache import bump_generation
+from .image_worker import build_field_derivatives, init_worker, pool_context
+from .models import Blog, Category, DailyStat, GalleryImage, ImportedRecord, Project, Service
+from .search import index_many
+from .slugs import assign_unique_slugs
+
+IMPORT_BATCH_SIZE = 500
+
+# manifest type -> (model, date field a record may override)
+IMPORT_TYPES = {
+    "projects": (Project, "created_at"),
+    "blogs": (Blog, "created_at"),
+    "gallery": (GalleryImage, "uploaded_at"),
+}
+
+
+class ManifestError(ValueError):
+    pass
+
+
+@dataclass
+class ImportReport:
+    created: Counter = field(default_factory=Counter)
+    skipped: Counter = field(default_factory=Counter)
+    errors: list = field(default_factory=list)
+
+    def error(self, rtype, line, message):
+        self.errors.append(f"{rtype} #{line}: {message}")
+
+
+@dataclass
+class _Pending:
+    line: int
+    record: dict
+    source: Path
+    name: str
+    key: str
+
+
+def record_key(record):
+    """A record's identity in its manifest: ``id:``/``slug:`` when given, else ``image:<path>``."""
+    for field_name in ("id", "slug"):
+        value = str(record.get(field_name, "")).strip()
+        if value:
+            return f"{field_name}:{value}"
+    return f"image:{Path(str(record.get('image', '')).strip()).as_posix()}"
+
+
+def load_manifest(path):
+    """Return {type: [(line, record), ...]} from a JSON or CSV manifest."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as fh:
+            rows = [
+                (line, {k.strip(): (v or "").strip() for k, v in row.items() if k})
+                for line, row in enumerate(csv.DictReader(fh), 2)
+            ]
+    elif path.suffix.lower() == ".json":
+        with path.open(encoding="utf-8") as fh:
+            data = json.load(fh)
+        if isinstance(data, dict):
+            rows = [
+                (line, dict(record, type=rtype))
+                for rtype, records in data.items()
+                for line, record in enumerate(records, 1)
+            ]
+        elif isinstance(data, list):
+            rows = list(enumerate(data, 1))
+        else:
+            raise ManifestError("JSON manifest must be an object keyed by type or a list of records.")
+    else:
+        raise ManifestError("Manifest must be a .json or .csv file.")
+
+    by_type = defaultdict(list)
+    for line, record in rows:
+        rtype = str(record.get("type", "")).strip().lower()
+        if rtype not in IMPORT_TYPES:
+            raise ManifestError(f"Record #{line} has unknown type {rtype!r}; expected one of {sorted(IMPORT_TYPES)}.")
+        by_type[rtype].append((line, record))
+    return by_type
+
+
+def _parse_when(value):
+    if not value:
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        day = parse_date(str(value))
+        if day is None:
+            raise ValueError(f"invalid date {value!r}")
+        parsed = datetime.combine(day, time(12))
+    if settings.USE_TZ and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ContentImporter:
+    def __init__(self, images_dir, workers=8, dry_run=False, build_derivatives=True):
+        self.images_dir = Path(images_dir).resolve()
+        self.workers = workers
+        self.dry_run = dry_run
+        self.build_derivatives = build_derivatives
+        self.report = ImportReport()
+        self._services = None
+        self._categories = None
+
+    # ---- reference lookups (one query each) ----
+
+    def _service_id(self, value):
+        if self._services is None:
+            self._services = {}
+            for pk, name, slug in Service.objects.values_list("id", "name", "slug"):
+                self._services[str(pk)] = pk
+                self._services[name.casefold()] = pk
+                self._services[slug.casefold()] = pk
+        return self._services.get(str(value).strip().casefold())
+
+    def _load_categories(self, names):
+        existing = {name.casefold(): pk for pk, name in Category.objects.values_list("id", "name")}
+        missing = {name.casefold(): name for name in names if name.casefold() not in existing}
+        if missing and not self.dry_run:
+            Category.objects.bulk_create([Category(name=name) for name in missing.values()], ignore_conflicts=True)
+            existing = {name.casefold(): pk for pk, name in Category.objects.values_list("id", "name")}
+        elif missing:
+            existing.update({key: None for key in missing})
+        self._categories = existing
+
+    # ---- images ----
+
+    def _pending(self, rtype, records):
+        model, _ = IMPORT_TYPES[rtype]
+        image_field = model._meta.get_field("image")
+        pending, seen = [], set()
+
+        for line, record in records:
+            image = str(record.get("image", "")).strip()
+            if not image:
+                self.report.error(rtype, line, "missing image")
+                continue
+            key = record_key(record)
+            if key in seen:
+                self.report.skipped[rtype] += 1
+                continue
+            source = (self.images_dir / image).resolve()
+            if not source.is_relative_to(self.images_dir) or not source.is_file():
+                self.report.error(rtype, line, f"image not found: {image}")
+                continue
+            name = image_field.generate_filename(None, Path(image).as_posix())
+            if hasattr(image_field.storage, "content_name"):
+                # Content-addressed storage: copy to where the bytes will land.
+                with source.open("rb") as fh:
+                    name = image_field.storage.content_name(name, File(fh))
+            seen.add(key)
+            pending.append(_Pending(line, record, source, name, key))
+
+        keys = [item.key for item in pending]
+        imported = set()
+        for start in range(0, len(keys), IMPORT_BATCH_SIZE):
+            imported.update(
+                ImportedRecord.objects.filter(rtype=rtype, key__in=keys[start:start + IMPORT_BATCH_SIZE])
+                .values_list("key", flat=True)
+            )
+        self.report.skipped[rtype] += len(imported)
+        return [item for item in pending if item.key not in imported]
+
+    def _copy_images(self, rtype, objects):
+        model, _ = IMPORT_TYPES[rtype]
+        storage = model._meta.get_field("image").storage
+
+        def copy(item):
+            # A file left behind by an interrupted run is reused as is.
+            try:
+                if storage.exists(item.name):
+                    return item.name
+                with item.source.open("rb") as fh:
+                    return storage.save(item.name, File(fh, name=item.name))
+            except OSError as exc:
+                return exc
+
+        # Records sharing bytes share a name; copy each name once.
+        unique = list({item.name: item for item, _, _ in objects}.values())
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = dict(zip((item.name for item in unique), pool.map(copy, unique)))
+
+        copied = []
+        for item, obj, when in objects:
+            result = results[item.name]
+            if isinstance(result, Exception):
+                self.report.error(rtype, item.line, f"copy failed: {result}")
+                continue
+            obj.image = result
+            copied.append((item, obj, when))
+        return copied
+
+    # ---- row building ----
+
+    def _build(self, rtype, item):
+        obj = self._instance(rtype, item)
+        if rtype != "gallery":
+            obj.refresh_text_metadata()
+        return obj
+
+    def _instance(self, rtype, item):
+        record = item.record
+        if rtype == "projects":
+            service = record.get("service")
+            service_id = self._service_id(service) if service else None
+            if service and service_id is None:
+                raise ValueError(f"unknown service {service!r}")
+            return Project(
+                title=str(record.get("title", ""))[:200],
+                service_category_id=service_id,
+                location=str(record.get("location", ""))[:100],
+                description=record.get("description", ""),
+                image=item.name,
+            )
+        if rtype == "blogs":
+            return Blog(
+                title=str(record.get("title", ""))[:200],
+                slug=str(record.get("slug", "")),
+                description=record.get("description", ""),
+                image=item.name,
+            )
+        category = str(record.get("category", "")).strip()
+        if not category:
+            raise ValueError("missing category")
+        return GalleryImage(
+            category_id=self._categories[category.casefold()],
+            title=str(record.get("title", ""))[:150] or None,
+            image=item.name,
+        )
+
+    def _objects(self, rtype, pending):
+        """Validated, unsaved (item, instance, date override) triples."""
+        _, date_field = IMPORT_TYPES[rtype]
+        objects = []
+        for item in pending:
+            try:
+                if rtype != "gallery" and not str(item.record.get("title", "")).strip():
+                    raise ValueError("missing title")
+                obj = self._build(rtype, item)
+                when = _parse_when(item.record.get(date_field) or item.record.get("date"))
+            except ValueError as exc:
+                self.report.error(rtype, item.line, str(exc))
+                continue
+            objects.append((item, obj, when))
+
+        if rtype == "blogs":
+            given = [obj.slug for _, obj, _ in objects if obj.slug]
+            taken = set(Blog.objects.filter(slug__in=given).values_list("slug", flat=True)) if given else set()
+            for item, obj, _ in objects:
+                if obj.slug in taken:
+                    self.report.error(rtype, item.line, f"slug {obj.slug!r} is already in use")
+            objects = [entry for entry in objects if entry[1].slug not in taken]
+            assign_unique_slugs([obj for _, obj, _ in objects], "title", "blog")
+        return objects
+
+    # ---- writing ----
+
+    def _insert(self, rtype, objects):
+        model, date_field = IMPORT_TYPES[rtype]
+        rows = [obj for _, obj, _ in objects]
+        with transaction.atomic():
+            model.objects.bulk_create(rows, batch_size=IMPORT_BATCH_SIZE)
+
+            # auto_now_add overwrites the date on insert; put historical
+            # dates back with one UPDATE per batch.
+            dated = []
+            for _, obj, when in objects:
+                if when is not None:
+                    setattr(obj, date_field, when)
+                    dated.append(obj)
+            if dated:
+                model.objects.bulk_update(dated, [date_field], batch_size=IMPORT_BATCH_SIZE)
+
+            if rtype == "projects":
+                for key, count in Counter(rollups.instance_key(DailyStat.ENTITY_PROJECT, obj) for obj in rows).items():
+                    rollups.adjust(DailyStat.ENTITY_PROJECT, key, count)
+            if rtype in ("projects", "blogs"):
+                index_many(rows)
+            ImportedRecord.objects.bulk_create(
+                [ImportedRecord(rtype=rtype, key=item.key, object_id=obj.pk) for item, obj, _ in objects],
+                batch_size=IMPORT_BATCH_SIZE,
+            )
+            transaction.on_commit(lambda: bump_generation(model.__name__))
+        self.report.created[rtype] += len(rows)
+
+    def _derivatives(self, model, names):
+        if not names:
+            return
+        label = model._meta.label
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=pool_context(),
+            initializer=init_worker,
+            initargs=(settings.SETTINGS_MODULE,),
+        ) as pool:
+            for error in pool.map(build_field_derivatives, [label] * len(names), ["image"] * len(names), names):
+                if error:
+                    self.report.errors.append(f"derivatives: {error}")
+
+    def run(self, manifest):
+        by_type = load_manifest(manifest)
+        if "gallery" in by_type:
+            self._load_categories({
+                str(record.get("category", "")).strip()
+                for _, record in by_type["gallery"] if str(record.get("category", "")).strip()
+            })
+
+        for rtype in IMPORT_TYPES:
+            if rtype not in by_type:
+                continue
+            model, _ = IMPORT_TYPES[rtype]
+            pending = self._pending(rtype, by_type[rtype])
+            objects = self._objects(rtype, pending)
+            if self.dry_run:
+                self.report.created[rtype] += len(objects)
+                continue
+            objects = self._copy_images(rtype, objects)
+            if not objects:
+                continue
+            self._insert(rtype, objects)
+            if self.build_derivatives:
+                self._derivatives(model, list(dict.fromkeys(obj.image.name for _, obj, _ in objects)))
+        return self.report
+
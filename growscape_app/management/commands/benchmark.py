@@ -0,0 +1,101 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from growscape_app import benchmark
+from growscape_app.seeding import DEFAULT_VOLUMES, seed_content
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with a deterministic dataset, request every URL through the "
+        "test client and record p50/p95 latency, query counts and response size per URL. With a "
+        "baseline file present, exit non-zero when a URL regresses beyond the thresholds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--scale", type=float, default=1.0,
+            help="Multiply the default dataset volumes (e.g. 10 for a heavier run).",
+        )
+        parser.add_argument("--output", default="benchmark-results.json", help="Where to write this run's JSON.")
+        parser.add_argument(
+            "--baseline", default=str(Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"),
+            help="Baseline JSON to compare against (skipped if missing).",
+        )
+        parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline.")
+        parser.add_argument(
+            "--max-regression", type=float, default=0.25,
+            help="Allowed relative p95 growth per URL (0.25 = 25%%).",
+        )
+        parser.add_argument(
+            "--min-delta-ms", type=float, default=2.0,
+            help="Ignore p95 changes smaller than this many milliseconds.",
+        )
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database between runs.")
+        parser.add_argument(
+            "--check-plans", action="store_true",
+            help="Also fail when a hot list query's plan does not use its index.",
+        )
+
+    def handle(self, *args, **options):
+        volumes = {key: max(1, int(value * options["scale"])) for key, value in DEFAULT_VOLUMES.items()}
+        log = self.stdout.write if options["verbosity"] > 1 else None
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                MEDIA_ROOT=media_root,
+                CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                QUERY_PROFILER_ENABLED=False,
+                # Measure rendering, not page cache hits.
+                PAGE_CACHE_ENABLED=False,
+            ):
+                self.stdout.write(f"Seeding benchmark dataset (seed {options['seed']})...")
+                seed_content(volumes, seed=options["seed"], log=log)
+                self.stdout.write(f"Benchmarking with {options['iterations']} iterations per URL...")
+                results = benchmark.run(options["iterations"], options["warmup"], log=self.stdout.write)
+                plan_problems = benchmark.check_query_plans() if options["check_plans"] else []
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        report = {"meta": benchmark.metadata(options["seed"], volumes, options["iterations"]), "results": results}
+        Path(options["output"]).write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"Wrote {options['output']} ({len(results)} URLs).")
+
+        failed = [label for label, result in results.items() if result["status"] >= 500]
+        if failed:
+            raise CommandError(f"Server errors on: {', '.join(failed)}")
+        if plan_problems:
+            for problem in plan_problems:
+                self.stderr.write(problem)
+            raise CommandError(f"{len(plan_problems)} query plan(s) skip their index.")
+
+        baseline_path = Path(options["baseline"])
+        if options["update_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Baseline updated: {baseline_path}"))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f"No baseline at {baseline_path}; run with --update-baseline to create one."))
+            return
+
+        baseline = json.loads(baseline_path.read_text())["results"]
+        problems = benchmark.compare(results, baseline, options["max_regression"], options["min_delta_ms"])
+        if problems:
+            for problem in problems:
+                self.stderr.write(problem)
+            raise CommandError(f"{len(problems)} regression(s) against {baseline_path}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}."))
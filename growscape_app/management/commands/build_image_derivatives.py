@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from growscape_app.images import RESPONSIVE_IMAGE_FIELDS, generate_derivatives, has_derivatives
+
+
+class Command(BaseCommand):
+    help = "Generate responsive image derivatives for existing uploads in MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model", action="append", dest="models",
+            help="Only process this model (repeatable), e.g. --model Project",
+        )
+        parser.add_argument(
+            "--overwrite", action="store_true",
+            help="Regenerate derivatives that already exist.",
+        )
+
+    def handle(self, *args, **options):
+        selected = options["models"]
+        overwrite = options["overwrite"]
+        total_files = 0
+
+        for model_name, field_name in RESPONSIVE_IMAGE_FIELDS:
+            if selected and model_name not in selected:
+                continue
+
+            model = apps.get_model("growscape_app", model_name)
+            rows = (
+                model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .only("pk", field_name)
+            )
+            processed = 0
+            for obj in rows.iterator(chunk_size=500):
+                fieldfile = getattr(obj, field_name)
+                if not overwrite and has_derivatives(fieldfile):
+                    continue
+                try:
+                    total_files += generate_derivatives(fieldfile, overwrite=overwrite)
+                    processed += 1
+                except (OSError, ValueError) as exc:
+                    self.stderr.write(f"{model_name} #{obj.pk} ({fieldfile.name}): {exc}")
+
+            self.stdout.write(f"{model_name}: {processed} image(s) processed")
+
+        self.stdout.write(self.style.SUCCESS(f"Done. {total_files} derivative file(s) written."))
@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from growscape_app.exports import EXPORTS, STREAMERS, ExportError, stream_export
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Stream contacts or service inquiries to a CSV, JSON or XLSX file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--format", dest="fmt", choices=sorted(STREAMERS), default="csv")
+        parser.add_argument("--from", dest="date_from", type=_date, help="First day to include (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=_date, help="Last day to include (YYYY-MM-DD).")
+        parser.add_argument("--service", dest="service_id", type=int, help="Only inquiries for this service id.")
+        parser.add_argument("-o", "--output", help="File to write; defaults to stdout.")
+
+    def handle(self, *args, **options):
+        fmt = options["fmt"]
+        if fmt == "xlsx" and not options["output"]:
+            raise CommandError("XLSX output needs --output.")
+        try:
+            chunks = stream_export(
+                options["kind"], fmt,
+                date_from=options["date_from"],
+                date_to=options["date_to"],
+                service_id=options["service_id"],
+            )
+        except ExportError as exc:
+            raise CommandError(exc)
+
+        if options["output"]:
+            with open(options["output"], "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
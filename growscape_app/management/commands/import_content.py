@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from growscape_app.importer import IMPORT_TYPES, ContentImporter, ManifestError
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import projects, blogs and gallery images from a JSON or CSV manifest. "
+        "Records are keyed by their \"id\" or \"slug\" when given, otherwise by their image path, "
+        "so re-running a manifest only adds what is new. "
+        "JSON manifests are either {\"projects\": [...], \"blogs\": [...], \"gallery\": [...]} or a "
+        "list of records with a \"type\" field; CSV manifests need a \"type\" column."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("manifest", help="Path to a .json or .csv manifest.")
+        parser.add_argument("--images", required=True, help="Directory that the manifest's image paths are relative to.")
+        parser.add_argument("--workers", type=int, default=8, help="Parallel image copies / derivative builds.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing anything.")
+        parser.add_argument(
+            "--skip-derivatives", action="store_true",
+            help="Do not build responsive image sizes now (run build_image_derivatives later).",
+        )
+
+    def handle(self, *args, **options):
+        importer = ContentImporter(
+            options["images"],
+            workers=max(1, options["workers"]),
+            dry_run=options["dry_run"],
+            build_derivatives=not options["skip_derivatives"],
+        )
+        try:
+            report = importer.run(options["manifest"])
+        except (ManifestError, OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        for error in report.errors:
+            self.stderr.write(self.style.WARNING(error))
+        verb = "Would import" if options["dry_run"] else "Imported"
+        for rtype in IMPORT_TYPES:
+            if report.created[rtype] or report.skipped[rtype]:
+                self.stdout.write(
+                    f"{verb} {report.created[rtype]} {rtype}, "
+                    f"skipped {report.skipped[rtype]} already imported."
+                )
+        status = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(status(f"Done with {len(report.errors)} error(s)."))
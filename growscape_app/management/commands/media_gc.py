@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from growscape_app.storage import find_orphans
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete media files that no FileField/ImageField row references, including the "
+        "responsive derivatives of those files. Files younger than --min-age are kept so "
+        "in-flight uploads are never collected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="List orphans without deleting them.")
+        parser.add_argument(
+            "--min-age", type=float, default=1.0,
+            help="Only collect files last modified at least this many hours ago.",
+        )
+
+    def handle(self, *args, **options):
+        min_age = timedelta(hours=options["min_age"])
+        cutoff = timezone.now() - min_age
+        orphans = find_orphans(default_storage, min_age=min_age)
+        freed = 0
+        for name in list(orphans):
+            # A dedup hit since the scan touched the file for a new reference.
+            if default_storage.get_modified_time(name) >= cutoff:
+                orphans.remove(name)
+                continue
+            size = default_storage.size(name)
+            if options["verbosity"] > 1 or options["dry_run"]:
+                self.stdout.write(name)
+            if not options["dry_run"]:
+                default_storage.delete(name)
+            freed += size
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(orphans)} orphaned file(s), {freed / (1024 * 1024):.1f} MB."
+        ))
@@ -0,0 +1,59 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from growscape_app.image_jobs import process_pending
+from growscape_app.image_worker import init_worker, pool_context
+
+
+class Command(BaseCommand):
+    help = (
+        "Build responsive derivatives queued by bulk uploads. Run with --loop under a process "
+        "manager, or from cron without it. One process pool is kept for the whole run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Pool size (default GALLERY_UPLOAD_WORKERS, else min(4, CPU count)); 1 runs in-process.",
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep polling for new jobs instead of exiting when the queue is drained.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0,
+            help="Seconds to sleep between polls in --loop mode.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = (
+            options["workers"] or getattr(settings, "GALLERY_UPLOAD_WORKERS", None) or min(4, os.cpu_count() or 1)
+        )
+
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=pool_context(),
+                initializer=init_worker,
+                initargs=(settings.SETTINGS_MODULE,),
+            )
+        try:
+            while True:
+                done, failed = process_pending(batch_size, pool)
+                if done or failed:
+                    self.stdout.write(f"Built {done}, failed {failed}")
+
+                if done + failed < batch_size:
+                    if not options["loop"]:
+                        break
+                    time.sleep(options["interval"])
+        finally:
+            if pool is not None:
+                pool.shutdown()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from growscape_app.rollups import ROLLUP_SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard's daily rollup table from projects, contacts and inquiries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entity", action="append", dest="entities", choices=sorted(ROLLUP_SOURCES),
+            help="Only rebuild this entity (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild(options["entities"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt dashboard stats ({written} row(s))."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from growscape_app.content_cache import bump_generation
+from growscape_app.excerpts import backfill
+from growscape_app.models import Blog, Project, Service
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute sanitized HTML, summaries and reading time for blogs, projects and services. "
+        "Run after changing the sanitizer or summary lengths in excerpts.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in (Blog, Project, Service):
+            count = backfill(model, model.text_source, batch_size=max(1, options["batch_size"]))
+            bump_generation(model.__name__)
+            self.stdout.write(f"{model.__name__}: {count} row(s) updated")
+        self.stdout.write(self.style.SUCCESS("Done."))
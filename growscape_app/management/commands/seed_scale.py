@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from growscape_app.models import Service
+from growscape_app.seeding import SCALE_VOLUMES, seed_content
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a large, deterministic synthetic dataset for load testing. "
+        "Rows are bulk-inserted and share a small pool of Pillow-generated images. The same "
+        "--seed and volumes always produce the same content; slugs and category names carry the "
+        "seed, so use a fresh database or a new seed for each run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--scale", type=float, default=1.0,
+            help="Multiply every target volume (e.g. 0.01 for a quick smoke run).",
+        )
+        for key, default in SCALE_VOLUMES.items():
+            parser.add_argument(
+                f"--{key}", type=int, default=None,
+                help=f"Number of {key} to create (default {default:,} x --scale).",
+            )
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk insert.")
+        parser.add_argument("--image-pool", type=int, default=12, help="Distinct images generated per model.")
+        parser.add_argument(
+            "--skip-derivatives", action="store_true",
+            help="Do not build responsive image sizes for the image pool.",
+        )
+
+    def handle(self, *args, **options):
+        volumes = {}
+        for key, default in SCALE_VOLUMES.items():
+            value = options[key]
+            volumes[key] = max(0, value if value is not None else int(default * options["scale"]))
+
+        suffix = f"-s{options['seed']}"
+        if Service.objects.filter(slug__endswith=suffix).exists():
+            raise CommandError(f"Seed {options['seed']} has already been loaded; pick another --seed or flush first.")
+
+        started = time.monotonic()
+        written = seed_content(
+            volumes,
+            seed=options["seed"],
+            batch_size=max(1, options["batch_size"]),
+            image_pool=max(1, options["image_pool"]),
+            derivatives=not options["skip_derivatives"],
+            log=self.stdout.write,
+        )
+        for key, count in written.items():
+            self.stdout.write(f"{key}: {count:,}")
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Seeded {sum(written.values()):,} rows in {elapsed:.0f}s."))
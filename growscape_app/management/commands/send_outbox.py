@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from growscape_app.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver pending outbox emails. Run with --loop under a process manager, "
+        "or from cron without it. For local testing point EMAIL_HOST/EMAIL_PORT at a "
+        "debugging server, e.g. `python -m aiosmtpd -n -l localhost:1025`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep polling for new emails instead of exiting when the outbox is drained.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0,
+            help="Seconds to sleep between polls in --loop mode.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        while True:
+            sent, failed = deliver_pending(batch_size)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+
+            if sent + failed < batch_size:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
@@ -0,0 +1,144 @@
+"""
+Production media serving.
+
+With ``MEDIA_SERVE_MODE`` set, ``/media/<path>`` is routed to serve_media()
+even when DEBUG is off. The view only resolves the path, answers
+conditional requests and sets cache headers; the bytes are sent by:
+
+* ``"accel"``: nginx, via ``X-Accel-Redirect`` to ``MEDIA_ACCEL_PREFIX``,
+  which must be an internal location aliased to MEDIA_ROOT::
+
+      location /protected-media/ { internal; alias /srv/growscape/media/; }
+
+* ``"sendfile"``: Apache mod_xsendfile / lighttpd, via ``X-Sendfile`` with
+  the absolute file path.
+* ``"python"``: the worker itself, with single-range ``Range`` support.
+  Meant for setups without a capable proxy in front.
+
+Files under the content-addressed root (see storage.py), derivatives
+included, never change under the same name and are cached as immutable.
+Anything else gets MEDIA_CACHE_MAX_AGE.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import CONTENT_ROOT
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _is_immutable(path):
+    return path.startswith(f"{CONTENT_ROOT}/")
+
+
+def _etag(path, stat):
+    if _is_immutable(path):
+        # The name already is the content hash (or derived from it).
+        return '"%s"' % os.path.splitext(os.path.basename(path))[0]
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to send everything, or False if unsatisfiable."""
+    match = _RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None  # malformed or multi-range: ignore and send the whole file
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(0, size - int(last)), size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _read_range(full_path, start, length):
+    with open(full_path, "rb") as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _python_response(request, full_path, stat, etag, last_modified):
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header:
+        if_range = request.headers.get("If-Range")
+        if if_range is None or if_range == etag or parse_http_date_safe(if_range) == int(stat.st_mtime):
+            byte_range = _byte_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(_read_range(full_path, start, end - start + 1))
+    response["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Media file not found.")
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("Media file not found.")
+    if not os.path.isfile(full_path):
+        raise Http404("Media file not found.")
+
+    etag = _etag(path, stat)
+    last_modified = int(stat.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        response = not_modified
+    else:
+        mode = settings.MEDIA_SERVE_MODE
+        if mode == "accel":
+            response = HttpResponse()
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + quote(path)
+        elif mode == "sendfile":
+            response = HttpResponse()
+            response["X-Sendfile"] = full_path
+        else:
+            response = _python_response(request, full_path, stat, etag, last_modified)
+        content_type, encoding = mimetypes.guess_type(full_path)
+        response["Content-Type"] = content_type or "application/octet-stream"
+        if encoding:
+            response["Content-Encoding"] = encoding
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if _is_immutable(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0004_remove_serviceinquiry_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('from_email', models.CharField(max_length=255)),
+                ('to', models.TextField(help_text='Comma-separated recipient addresses')),
+                ('body_text', models.TextField()),
+                ('body_html', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['next_attempt_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='growscape_a_status_8dd7a9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0005_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('project', 'Projects'), ('contact', 'Contact messages'), ('inquiry', 'Service inquiries')], max_length=20)),
+                ('date', models.DateField()),
+                ('service_key', models.PositiveBigIntegerField(default=0, help_text='Service id, 0 when none.')),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('entity', 'date', 'service_key'), name='unique_daily_stat')],
+            },
+        ),
+    ]
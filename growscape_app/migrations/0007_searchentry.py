@@ -0,0 +1,122 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:05
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+from django.utils.html import strip_tags
+
+POSTGRES_INDEX_SQL = [
+    """
+    ALTER TABLE growscape_app_searchentry ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX growscape_app_searchentry_vector_gin ON growscape_app_searchentry USING gin (search_vector)",
+]
+
+SQLITE_INDEX_SQL = [
+    """
+    CREATE VIRTUAL TABLE growscape_app_searchentry_fts USING fts5(
+        title, body, content='growscape_app_searchentry', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER growscape_app_searchentry_ai AFTER INSERT ON growscape_app_searchentry BEGIN
+        INSERT INTO growscape_app_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER growscape_app_searchentry_ad AFTER DELETE ON growscape_app_searchentry BEGIN
+        INSERT INTO growscape_app_searchentry_fts(growscape_app_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER growscape_app_searchentry_au AFTER UPDATE ON growscape_app_searchentry BEGIN
+        INSERT INTO growscape_app_searchentry_fts(growscape_app_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO growscape_app_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_INDEX_SQL:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        try:
+            for sql in SQLITE_INDEX_SQL:
+                schema_editor.execute(sql)
+        except OperationalError:
+            # SQLite built without FTS5: search.py falls back to LIKE queries.
+            pass
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS growscape_app_searchentry_vector_gin")
+        schema_editor.execute("ALTER TABLE growscape_app_searchentry DROP COLUMN IF EXISTS search_vector")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS growscape_app_searchentry_fts")
+
+
+def search_documents(apps):
+    # Frozen copy of search._document as of this migration, with the URL
+    # patterns spelled out.
+    Blog = apps.get_model('growscape_app', 'Blog')
+    Service = apps.get_model('growscape_app', 'Service')
+    Project = apps.get_model('growscape_app', 'Project')
+    for blog in Blog.objects.iterator(chunk_size=500):
+        yield 'blog', blog.pk, blog.title, strip_tags(blog.description), f'/blogs/{blog.slug}/'
+    for service in Service.objects.iterator(chunk_size=500):
+        body = f'{strip_tags(service.full_description)}\n{service.features_list}'
+        yield 'service', service.pk, service.name, body, f'/services/{service.slug}/'
+    for project in Project.objects.iterator(chunk_size=500):
+        body = f'{strip_tags(project.description)}\n{project.location}'
+        yield 'project', project.pk, project.title, body, f'/projects/{project.pk}/'
+
+
+def backfill_search_entries(apps, schema_editor):
+    SearchEntry = apps.get_model('growscape_app', 'SearchEntry')
+    batch = []
+    for kind, object_id, title, body, url in search_documents(apps):
+        batch.append(SearchEntry(kind=kind, object_id=object_id, title=title[:255], body=body, url=url))
+        if len(batch) == 500:
+            SearchEntry.objects.bulk_create(batch)
+            batch = []
+    SearchEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0006_dailystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('blog', 'Blog'), ('service', 'Service'), ('project', 'Project')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('url', models.CharField(max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Search entries',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        # After the index, so the FTS5 triggers pick up the backfilled rows.
+        migrations.RunPython(backfill_search_entries, migrations.RunPython.noop),
+    ]
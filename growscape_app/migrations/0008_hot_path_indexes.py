@@ -0,0 +1,72 @@
+# Generated by Django 6.0.2 on 2026-10-17 18:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex that builds with CREATE INDEX CONCURRENTLY on Postgres, so the
+    large tables stay writable while the index is built. Other backends get
+    a plain CREATE INDEX. (django.contrib.postgres has the Postgres-only
+    version of this operation.)
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('growscape_app', '0007_searchentry'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(fields=['-created_at', '-id'], name='project_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='blog',
+            index=models.Index(fields=['-created_at', '-id'], name='blog_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at', '-id'], name='contact_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='serviceinquiry',
+            index=models.Index(fields=['-created_at', '-id'], name='inquiry_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='galleryimage',
+            index=models.Index(fields=['category', '-uploaded_at', '-id'], name='gallery_cat_uploaded_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='galleryimage',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='gallery_uploaded_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='category',
+            index=models.Index(fields=['-created_at'], name='category_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='testimonial',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='testimonial_name_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+def parse_features(raw):
+    # Frozen copy of models.parse_features as of this migration.
+    raw = raw or ''
+    if ',' in raw:
+        return [f.strip() for f in raw.split(',') if f.strip()]
+    return [f.strip() for f in raw.splitlines() if f.strip()]
+
+
+def backfill_features(apps, schema_editor):
+    Service = apps.get_model('growscape_app', 'Service')
+    services = list(Service.objects.only('id', 'features_list'))
+    for service in services:
+        service.features = parse_features(service.features_list)
+    Service.objects.bulk_update(services, ['features'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='features',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='features_list parsed into a list on save.'),
+        ),
+        migrations.RunPython(backfill_features, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,173 @@
+# Generated by Django 6.0.2 on 2026-10-17 19:40
+
+import math
+from html import escape, unescape
+from html.parser import HTMLParser
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Frozen copy of growscape_app.excerpts as of this migration, so later
+# changes to the sanitizer or the excerpt lengths don't rewrite history.
+
+SUMMARY_WORDS = 20
+SUMMARY_SHORT_WORDS = 12
+WORDS_PER_MINUTE = 200
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span', 'strong', 'sub', 'sup', 'table',
+    'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+DROPPED_WITH_CONTENT = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'svg', 'math'}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'ol': {'start'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'http', 'https', 'mailto', 'tel'}
+
+TEXT_SOURCES = [('blog', 'description'), ('project', 'description'), ('service', 'full_description')]
+
+
+def _safe_url(value):
+    scheme, colon, _ = value.strip().partition(':')
+    if not colon or '/' in scheme or '?' in scheme or '#' in scheme:
+        return True
+    return scheme.lower() in ALLOWED_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_WITH_CONTENT:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _safe_url(value):
+                continue
+            rendered.append(f' {name}="{escape(value)}"')
+        if tag == 'a' and any(name == 'target' for name, _ in attrs):
+            rendered.append(' rel="noopener noreferrer"')
+        self.parts.append(f"<{tag}{''.join(rendered)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in DROPPED_WITH_CONTENT:
+            return
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_WITH_CONTENT:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            current = self.open_tags.pop()
+            self.parts.append(f'</{current}>')
+            if current == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.parts.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        return ''.join(self.parts) + ''.join(f'</{tag}>' for tag in reversed(self.open_tags))
+
+
+def text_metadata(html):
+    parser = _Sanitizer()
+    parser.feed(html or '')
+    body_html = parser.result()
+    text = ' '.join(unescape(strip_tags(body_html)).split())
+    words = len(text.split())
+    truncator = Truncator(text)
+    return {
+        'body_html': body_html,
+        'summary': truncator.words(SUMMARY_WORDS, truncate=' …'),
+        'summary_short': truncator.words(SUMMARY_SHORT_WORDS, truncate=' …'),
+        'word_count': words,
+        'reading_minutes': max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0,
+    }
+
+
+def backfill_text_metadata(apps, schema_editor):
+    fields = list(text_metadata(''))
+    for model_name, source_field in TEXT_SOURCES:
+        model = apps.get_model('growscape_app', model_name)
+        batch = []
+        for obj in model.objects.only('pk', source_field).iterator(chunk_size=500):
+            for field, value in text_metadata(getattr(obj, source_field)).items():
+                setattr(obj, field, value)
+            batch.append(obj)
+            if len(batch) >= 500:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, fields)
+
+
+def text_metadata_fields(model_name):
+    return [
+        migrations.AddField(
+            model_name=model_name,
+            name='body_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='summary_short',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0009_service_features'),
+    ]
+
+    operations = [
+        *text_metadata_fields('blog'),
+        *text_metadata_fields('project'),
+        *text_metadata_fields('service'),
+        migrations.RunPython(backfill_text_metadata, migrations.RunPython.noop),
+    ]
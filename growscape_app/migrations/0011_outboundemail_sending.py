@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0010_text_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+    ]
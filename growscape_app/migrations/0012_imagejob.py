@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-17 21:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0011_outboundemail_sending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='e.g. growscape_app.GalleryImage', max_length=100)),
+                ('field_name', models.CharField(max_length=100)),
+                ('name', models.CharField(help_text='Stored file name', max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['next_attempt_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='growscape_a_status_2a2921_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 6.0.2 on 2026-10-17 21:40
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Frozen copy of rollups.ROLLUP_SOURCES as of this migration.
+ROLLUP_SOURCES = {
+    'project': ('Project', 'service_category_id'),
+    'contact': ('ContactMessage', None),
+    'inquiry': ('ServiceInquiry', 'service_type_id'),
+}
+
+
+def rebuild_daily_stats(apps, schema_editor):
+    # Frozen copy of rollups.rebuild: rows saved before 0006 were never counted.
+    DailyStat = apps.get_model('growscape_app', 'DailyStat')
+    for entity, (model_name, service_field) in ROLLUP_SOURCES.items():
+        model = apps.get_model('growscape_app', model_name)
+        group_by = ['day', service_field] if service_field else ['day']
+        grouped = (
+            model.objects
+            .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+            .values(*group_by)
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        DailyStat.objects.filter(entity=entity).delete()
+        DailyStat.objects.bulk_create(
+            [
+                DailyStat(
+                    entity=entity,
+                    date=row['day'],
+                    service_key=(row[service_field] or 0) if service_field else 0,
+                    count=row['total'],
+                )
+                for row in grouped.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0012_imagejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('growscape_app', '0013_backfill_dailystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rtype', models.CharField(help_text='Manifest type, e.g. projects', max_length=20)),
+                ('key', models.CharField(help_text='id:<id>, slug:<slug> or image:<path>', max_length=255)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('rtype', 'key'), name='unique_imported_record')],
+            },
+        ),
+    ]
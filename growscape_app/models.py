@@ -1,33 +1,87 @@
 from django.db import models
-from django.utils.text import slugify
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .excerpts import text_metadata
+from .slugs import save_with_unique_slug
+
+def parse_features(raw):
+    """Split a features_list on commas, or on new lines when it has no commas."""
+    raw = raw or ''
+    if ',' in raw:
+        return [f.strip() for f in raw.split(',') if f.strip()]
+    return [f.strip() for f in raw.splitlines() if f.strip()]
+
+
+TEXT_METADATA_FIELDS = ["body_html", "summary", "summary_short", "word_count", "reading_minutes"]
+
+
+class TextMetadataQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Skip the raw and sanitized bodies; list pages only need the summaries."""
+        return self.defer(self.model.text_source, "body_html")
+
+
+class TextMetadata(models.Model):
+    """
+    Sanitized HTML, plain-text summaries and reading stats derived from the
+    ``text_source`` field on every save, so pages never process the raw body.
+    Rebuild with `manage.py rebuild_text_metadata`.
+    """
+    text_source = "description"
+
+    body_html = models.TextField(blank=True, editable=False)
+    summary = models.TextField(blank=True, editable=False)
+    summary_short = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_minutes = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = TextMetadataQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def refresh_text_metadata(self):
+        for field, value in text_metadata(getattr(self, self.text_source)).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_text_metadata()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and self.text_source in update_fields:
+            kwargs["update_fields"] = {*update_fields, *TEXT_METADATA_FIELDS}
+        super().save(*args, **kwargs)
+
 
 # --- 1. SERVICE MODEL ---
-class Service(models.Model):
+class Service(TextMetadata):
     name = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True)
     full_description = models.TextField(blank=True, help_text="Detailed explanation of the service.")
     features_list = models.TextField(
         help_text="Enter the bullet points from the brochure here, separated by commas or new lines."
     )
+    features = models.JSONField(
+        default=list, blank=True, editable=False,
+        help_text="features_list parsed into a list on save.",
+    )
     cover_image = models.ImageField(upload_to='services/', blank=True, null=True)
 
+    text_source = "full_description"
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.name, allow_unicode=True) or "service"
-            slug = base_slug[:40]
-            counter = 1
-            while Service.objects.filter(slug=slug).exists():
-                slug = f"{base_slug[:40]}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        self.features = parse_features(self.features_list)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "features_list" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "features"}
+        save_with_unique_slug(self, "name", "service", super().save, *args, **kwargs)
 
     def __str__(self):
         return self.name
 
 
 # --- 2. PROJECT MODEL ---
-class Project(models.Model):
+class Project(TextMetadata):
     title = models.CharField(max_length=200)
     service_category = models.ForeignKey(
         Service, 
@@ -42,6 +96,9 @@ class Project(models.Model):
     description = models.TextField(blank=True, help_text="Description of work done.")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["-created_at", "-id"], name="project_created_id_idx")]
+
     def __str__(self):
         return self.title
     
@@ -60,6 +117,7 @@ class Category(models.Model):
 
     class Meta:
         verbose_name_plural = "Categories"
+        indexes = [models.Index(fields=["-created_at"], name="category_created_idx")]
 
     def __str__(self):
         return self.name
@@ -73,11 +131,16 @@ class GalleryImage(models.Model):
     image = models.ImageField(upload_to="gallery/")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["category", "-uploaded_at", "-id"], name="gallery_cat_uploaded_idx"),
+            models.Index(fields=["-uploaded_at", "-id"], name="gallery_uploaded_idx"),
+        ]
 
     def __str__(self):
         return self.title if self.title else f"Image {self.id}"
 
-class Blog(models.Model):
+class Blog(TextMetadata):
     image = models.ImageField(upload_to="blogs/", help_text="Blog cover image")
     slug = models.SlugField(unique=True, blank=True)
     title = models.CharField(max_length=200)
@@ -86,20 +149,13 @@ class Blog(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="blog_created_id_idx")]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title, allow_unicode=True) or "blog"
-            slug = base_slug[:40]
-            counter = 1
-            while Blog.objects.filter(slug=slug).exists():
-                slug = f"{base_slug[:40]}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, "title", "blog", super().save, *args, **kwargs)
     
 class Testimonial(models.Model):
     name = models.CharField(
@@ -119,6 +175,7 @@ class Testimonial(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Testimonial"
         verbose_name_plural = "Testimonials"
+        indexes = [models.Index(Lower("name"), name="testimonial_name_lower_idx")]
 
     def __str__(self):
         return self.name
@@ -131,6 +188,9 @@ class ContactMessage(models.Model):
     message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["-created_at", "-id"], name="contact_created_id_idx")]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.phone}"
 
@@ -156,7 +216,167 @@ class ServiceInquiry(models.Model):
     class Meta:
         verbose_name_plural = "Service Inquiries"
         ordering = ['-created_at']
+        indexes = [models.Index(fields=["-created_at", "-id"], name="inquiry_created_id_idx")]
 
     def __str__(self):
         service_name = self.service_type.name if self.service_type else "General"
-        return f"{self.first_name} - {service_name}"
\ No newline at end of file
+        return f"{self.first_name} - {service_name}"
+
+class OutboundEmail(models.Model):
+    """
+    Outbox row for a notification email. Written in the same transaction as
+    the record that triggers it and delivered later by `manage.py send_outbox`.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to = models.TextField(help_text="Comma-separated recipient addresses")
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
+
+    @property
+    def recipients(self):
+        return [address.strip() for address in self.to.split(",") if address.strip()]
+
+
+class ImageJob(models.Model):
+    """
+    Pending derivative build for a stored upload. Written in the same
+    transaction as the rows that use the file and processed by
+    `manage.py process_image_jobs` (see image_jobs.py).
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    model_label = models.CharField(max_length=100, help_text="e.g. growscape_app.GalleryImage")
+    field_name = models.CharField(max_length=100)
+    name = models.CharField(max_length=255, help_text="Stored file name")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.model_label}.{self.field_name} {self.name} ({self.status})"
+
+
+class ImportedRecord(models.Model):
+    """
+    A manifest record that `manage.py import_content` has already written,
+    keyed by its identity in the manifest (see importer.py), so re-runs skip
+    it however many other rows share its image.
+    """
+    rtype = models.CharField(max_length=20, help_text="Manifest type, e.g. projects")
+    key = models.CharField(max_length=255, help_text="id:<id>, slug:<slug> or image:<path>")
+    object_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["rtype", "key"], name="unique_imported_record"),
+        ]
+
+    def __str__(self):
+        return f"{self.rtype} {self.key} -> {self.object_id}"
+
+
+class DailyStat(models.Model):
+    """
+    Rows created per day for the dashboard, broken down by service.
+    Maintained by signals (see rollups.py); rebuild with
+    `manage.py rebuild_dashboard_stats`.
+    """
+    ENTITY_PROJECT = "project"
+    ENTITY_CONTACT = "contact"
+    ENTITY_INQUIRY = "inquiry"
+    ENTITY_CHOICES = [
+        (ENTITY_PROJECT, "Projects"),
+        (ENTITY_CONTACT, "Contact messages"),
+        (ENTITY_INQUIRY, "Service inquiries"),
+    ]
+
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    date = models.DateField()
+    # Plain id rather than a FK: deleting a service must not merge or drop history.
+    service_key = models.PositiveBigIntegerField(default=0, help_text="Service id, 0 when none.")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["entity", "date", "service_key"], name="unique_daily_stat"),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.date} service={self.service_key}: {self.count}"
+
+
+class SearchEntry(models.Model):
+    """
+    Denormalized search document for a Blog, Service or Project, kept in
+    sync by signals (see search.py). The full-text index itself lives
+    outside the ORM: a generated tsvector column with a GIN index on
+    Postgres, an FTS5 table on SQLite (migration 0007).
+    """
+    KIND_BLOG = "blog"
+    KIND_SERVICE = "service"
+    KIND_PROJECT = "project"
+    KIND_CHOICES = [
+        (KIND_BLOG, "Blog"),
+        (KIND_SERVICE, "Service"),
+        (KIND_PROJECT, "Project"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Search entries"
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="unique_search_entry"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
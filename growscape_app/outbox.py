@@ -0,0 +1,161 @@
+"""
+Durable email outbox.
+
+Views call enqueue_email() inside their transaction; `manage.py send_outbox`
+delivers pending rows over a single SMTP connection per batch, retrying
+failures with exponential backoff.
+
+A batch is claimed in its own short transaction: the rows are marked
+"sending" with a lease (next_attempt_at = now + the lease) and committed
+before any SMTP traffic. The lease covers the worst case for the whole batch,
+every SMTP call running into EMAIL_TIMEOUT, so a slow batch is not claimed
+again while it is still being sent. Each message then records its outcome in
+its own write, so a crash mid-batch never rolls back a "sent" status; rows
+whose lease runs out without an outcome are claimed again.
+
+An outcome is only written while the row still carries this worker's lease.
+If the lease was lost anyway, the outcome is logged and left to the worker
+that holds the row now.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60 * 6
+LEASE_SECONDS = 60 * 5
+# Per SMTP call when EMAIL_TIMEOUT is unset (smtplib would then wait forever).
+SEND_TIMEOUT_SECONDS = 60
+
+
+def enqueue_email(subject, template_name, context, to, from_email=None):
+    """Render ``template_name`` (through the cached template loader) and store it for delivery."""
+    body_html = render_to_string(template_name, context)
+    return OutboundEmail.objects.create(
+        subject=subject,
+        from_email=from_email or settings.EMAIL_HOST_USER,
+        to=", ".join(to),
+        body_text=strip_tags(body_html),
+        body_html=body_html,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def lease_duration(batch_size):
+    """How long a batch stays claimed: LEASE_SECONDS plus one timeout per message and one for connecting."""
+    timeout = getattr(settings, "EMAIL_TIMEOUT", None) or SEND_TIMEOUT_SECONDS
+    return timedelta(seconds=LEASE_SECONDS + (batch_size + 1) * timeout)
+
+
+def _claim_batch(batch_size):
+    """
+    Lease a batch of due rows, including "sending" rows whose lease expired.
+    skip_locked lets several workers claim in parallel on Postgres.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                status__in=[OutboundEmail.STATUS_PENDING, OutboundEmail.STATUS_SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        lease_until = now + lease_duration(batch_size)
+        OutboundEmail.objects.filter(pk__in=[outbound.pk for outbound in batch]).update(
+            status=OutboundEmail.STATUS_SENDING, next_attempt_at=lease_until,
+        )
+    for outbound in batch:
+        outbound.status, outbound.next_attempt_at = OutboundEmail.STATUS_SENDING, lease_until
+    return batch
+
+
+def _finish(outbound, **fields):
+    """
+    Record an outcome, but only while ``outbound`` still holds the lease it was
+    claimed with. Returns whether the row was updated.
+    """
+    updated = OutboundEmail.objects.filter(
+        pk=outbound.pk, status=OutboundEmail.STATUS_SENDING, next_attempt_at=outbound.next_attempt_at,
+    ).update(**fields)
+    if not updated:
+        logger.warning("Lease on outbound email %s expired before its outcome was recorded", outbound.pk)
+    return bool(updated)
+
+
+def _build_message(outbound, connection):
+    message = EmailMultiAlternatives(
+        outbound.subject,
+        outbound.body_text,
+        outbound.from_email,
+        outbound.recipients,
+        connection=connection,
+    )
+    if outbound.body_html:
+        message.attach_alternative(outbound.body_html, "text/html")
+    return message
+
+
+def deliver_pending(batch_size=50):
+    """
+    Send one batch of due emails. Returns (sent, failed) counts for the batch;
+    rows whose lease was lost in the meantime count as neither.
+    """
+    sent = failed = 0
+
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return sent, failed
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Server unreachable: the whole batch backs off together.
+        return sent, sum(_record_failure(outbound, exc) for outbound in batch)
+
+    try:
+        for outbound in batch:
+            try:
+                _build_message(outbound, connection).send()
+            except Exception as exc:
+                failed += _record_failure(outbound, exc)
+            else:
+                sent += _finish(
+                    outbound,
+                    status=OutboundEmail.STATUS_SENT,
+                    attempts=outbound.attempts + 1,
+                    sent_at=timezone.now(),
+                    last_error="",
+                )
+    finally:
+        connection.close()
+
+    return sent, failed
+
+
+def _record_failure(outbound, exc):
+    attempts = outbound.attempts + 1
+    fields = {"attempts": attempts, "last_error": f"{type(exc).__name__}: {exc}"}
+    if attempts >= MAX_ATTEMPTS:
+        fields["status"] = OutboundEmail.STATUS_FAILED
+    else:
+        fields["status"] = OutboundEmail.STATUS_PENDING
+        fields["next_attempt_at"] = timezone.now() + retry_delay(attempts)
+    return _finish(outbound, **fields)
@@ -0,0 +1,176 @@
+"""
+Full-page cache for anonymous visitors.
+
+PageCacheMiddleware stores the rendered response of every view wrapped in
+``content_condition`` (see conditional.py). Those views are marked with the
+models they read, and the page is cached under the content generations of
+exactly those models (content_cache.py) plus the path and the release:
+
+    page:<sha1(release | /portfolio/?page=2 | Project=.. Service=.. Blog=..)>
+
+Saving a Project bumps its generation, so every page tagged with Project
+misses from then on while the others keep being served. The same model
+names go out in a ``Surrogate-Key`` header for a CDN that can purge by tag.
+
+Only cookie-less GET/HEAD requests are served from the cache: a session or
+messages cookie means the visitor may see per-user output. Only plain 200
+responses that set no cookies are stored.
+
+Concurrent misses for the same page are collapsed: the first request takes
+a short lock (``cache.add``) and renders, the others poll for its result
+for up to PAGE_CACHE_LOCK_WAIT seconds before rendering themselves.
+
+Every stored page is also kept under a key without the generations, for
+PAGE_CACHE_STALE_TIMEOUT. If the view fails with a database error (e.g.
+Postgres is unreachable), that last good copy is served instead of a 500,
+marked uncacheable so nothing downstream holds on to it.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, InterfaceError
+from django.http import HttpResponse
+from django.utils.cache import add_never_cache_headers, get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .conditional import _release
+from .content_cache import get_generations
+
+PAGE_KEY = "page:{}"
+STALE_KEY = "page:stale:{}"
+LOCK_KEY = "page:lock:{}"
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _digest(*parts):
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def _anonymous(request):
+    return request.method in ("GET", "HEAD") and not (
+        settings.SESSION_COOKIE_NAME in request.COOKIES
+        or CookieStorage.cookie_name in request.COOKIES
+    )
+
+
+def _storable(request, response):
+    return (
+        request.method == "GET"
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and "private" not in response.get("Cache-Control", "")
+        and "no-store" not in response.get("Cache-Control", "")
+    )
+
+
+def _freeze(response):
+    return {"status": response.status_code, "content": response.content, "headers": list(response.items())}
+
+
+def _thaw(entry):
+    response = HttpResponse(entry["content"], status=entry["status"])
+    for name, value in entry["headers"]:
+        response[name] = value
+    return response
+
+
+class _Page:
+    """Cache keys for one request to a tagged view."""
+
+    def __init__(self, request, surrogate_keys):
+        path = request.get_full_path()
+        generations = get_generations(surrogate_keys)
+        self.surrogate_keys = surrogate_keys
+        self.key = PAGE_KEY.format(_digest(_release(), path, *(f"{n}={generations[n]}" for n in surrogate_keys)))
+        self.stale_key = STALE_KEY.format(_digest(path))
+        self.lock_key = LOCK_KEY.format(self.key)
+        self.locked = False
+
+    def store(self, response):
+        response["Surrogate-Key"] = " ".join(self.surrogate_keys)
+        entry = _freeze(response)
+        cache.set(self.key, entry, timeout=_setting("PAGE_CACHE_TIMEOUT", 60 * 60))
+        cache.set(self.stale_key, entry, timeout=_setting("PAGE_CACHE_STALE_TIMEOUT", 60 * 60 * 24 * 7))
+
+    def wait(self):
+        """The entry stored by whoever holds the lock, or None if it did not appear in time."""
+        deadline = time.monotonic() + _setting("PAGE_CACHE_LOCK_WAIT", 3)
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(self.key)
+            if entry is not None or cache.get(self.lock_key) is None:
+                return entry
+        return None
+
+    def release(self):
+        if self.locked:
+            cache.delete(self.lock_key)
+            self.locked = False
+
+
+class PageCacheMiddleware:
+    def __init__(self, get_response):
+        if not _setting("PAGE_CACHE_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+            page = getattr(request, "_page_cache", None)
+            if page is not None and _storable(request, response):
+                page.store(response)
+                response["X-Page-Cache"] = "MISS"
+            return response
+        finally:
+            # Released after storing, so waiters find either the entry or a free lock.
+            page = getattr(request, "_page_cache", None)
+            if page is not None:
+                page.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        surrogate_keys = getattr(view_func, "surrogate_keys", None)
+        if surrogate_keys is None or not _anonymous(request):
+            return None
+
+        page = _Page(request, surrogate_keys)
+        entry = cache.get(page.key)
+        if entry is None:
+            page.locked = cache.add(page.lock_key, 1, timeout=_setting("PAGE_CACHE_LOCK_TIMEOUT", 30))
+            if not page.locked:
+                entry = page.wait()
+        if entry is None:
+            request._page_cache = page
+            return None
+        return self._hit(request, entry)
+
+    def process_exception(self, request, exception):
+        page = getattr(request, "_page_cache", None)
+        if page is None or not isinstance(exception, (DatabaseError, InterfaceError)):
+            return None
+        entry = cache.get(page.stale_key)
+        if entry is None:
+            return None
+        response = _thaw(entry)
+        add_never_cache_headers(response)
+        response["X-Page-Cache"] = "STALE"
+        return response
+
+    def _hit(self, request, entry):
+        response = _thaw(entry)
+        response["X-Page-Cache"] = "HIT"
+        return get_conditional_response(
+            request,
+            etag=response.get("ETag"),
+            last_modified=parse_http_date_safe(response.get("Last-Modified", "")),
+            response=response,
+        )
@@ -0,0 +1,165 @@
+"""
+Keyset (cursor) pagination for the append-heavy admin lists.
+
+Rows are ordered newest first by (created_at, id). A page is fetched with a
+seek predicate on the last row seen instead of OFFSET, and no COUNT(*) is
+run, so deep pages cost the same as the first one. Cursors are opaque
+url-safe tokens carrying the boundary row and the direction.
+
+grouped_pages() is the other shape: one numbered page per group (e.g. per
+gallery category) from a single ROW_NUMBER() query, with the counts taken
+from an aggregate the caller already has.
+"""
+import base64
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connection
+from django.db.models import Case, F, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+
+APPROXIMATE_COUNT_TIMEOUT = 60 * 5
+
+
+class CursorPage:
+    def __init__(self, items, next_cursor, previous_cursor, approximate_total=None):
+        self.object_list = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.approximate_total = approximate_total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(row, direction, field="created_at"):
+    raw = f"{direction}|{getattr(row, field).isoformat()}|{row.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (direction, value, pk) or None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        direction, value, pk = raw.split("|")
+        if direction not in ("next", "prev"):
+            return None
+        return direction, datetime.fromisoformat(value), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def approximate_count(model):
+    """
+    Row estimate for an unfiltered table. Uses the planner statistics on
+    Postgres; elsewhere a real COUNT(*) cached for a few minutes.
+    """
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+
+    key = f"approximate_count:{table}"
+    total = cache.get(key)
+    if total is None:
+        total = model.objects.count()
+        cache.set(key, total, timeout=APPROXIMATE_COUNT_TIMEOUT)
+    return total
+
+
+def cursor_paginate(queryset, cursor, per_page, field="created_at", with_total=False):
+    """
+    One newest-first page of ``queryset`` after/before ``cursor``.
+    """
+    decoded = decode_cursor(cursor)
+    if decoded is None:
+        direction, rows = "next", queryset.order_by(f"-{field}", "-pk")
+    else:
+        direction, value, pk = decoded
+        if direction == "next":
+            rows = queryset.filter(
+                Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk})
+            ).order_by(f"-{field}", "-pk")
+        else:
+            rows = queryset.filter(
+                Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+            ).order_by(field, "pk")
+
+    items = list(rows[:per_page + 1])
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if direction == "prev":
+        items.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, decoded is not None
+
+    next_cursor = encode_cursor(items[-1], "next", field) if has_next and items else None
+    previous_cursor = encode_cursor(items[0], "prev", field) if has_previous and items else None
+    total = approximate_count(queryset.model) if with_total else None
+    return CursorPage(items, next_cursor, previous_cursor, total)
+
+
+class CountedPaginator(Paginator):
+    """Paginator over a row count that is already known; it never queries."""
+
+    def __init__(self, count, per_page, **kwargs):
+        super().__init__((), per_page, **kwargs)
+        self.count = count
+
+
+def grouped_pages(queryset, group_field, counts, requested, per_page, order_by):
+    """
+    {group: Page} with the requested page of ``queryset`` for every group in
+    ``counts`` ({group value: row count}). ``requested`` maps groups to raw
+    page numbers; invalid ones fall back to the first page and out-of-range
+    ones to the last, like Paginator.page(). All pages come from one query.
+    """
+    numbers, starts = {}, {}
+    for group, count in counts.items():
+        paginator = CountedPaginator(count, per_page)
+        try:
+            number = paginator.validate_number(requested.get(group, 1))
+        except PageNotAnInteger:
+            number = 1
+        except EmptyPage:
+            number = paginator.num_pages
+        numbers[group] = (paginator, number)
+        starts[group] = (number - 1) * per_page
+
+    rows = {group: [] for group in counts}
+    non_empty = [group for group, count in counts.items() if count]
+    if non_empty:
+        offsets = [When(**{group_field: group}, then=Value(start)) for group, start in starts.items() if start]
+        window = (
+            queryset.filter(**{f"{group_field}__in": non_empty})
+            .annotate(
+                group_row=Window(RowNumber(), partition_by=F(group_field), order_by=order_by),
+                group_start=Case(*offsets, default=Value(0)) if offsets else Value(0),
+            )
+            .filter(group_row__gt=F("group_start"), group_row__lte=F("group_start") + per_page)
+            .order_by(group_field, "group_row")
+        )
+        for obj in window:
+            rows[getattr(obj, group_field)].append(obj)
+
+    return {group: Page(rows[group], number, paginator) for group, (paginator, number) in numbers.items()}
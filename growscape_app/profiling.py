@@ -0,0 +1,149 @@
+"""
+Opt-in per-request query profiler.
+
+With QUERY_PROFILER_ENABLED on, QueryProfilerMiddleware wraps every database
+call of a request (``connection.execute_wrapper``) and records the query
+count, total DB time and how often each query shape ran. A shape repeated
+QUERY_PROFILER_N_PLUS_ONE times in one request is flagged as a likely N+1,
+and SELECTs slower than QUERY_PROFILER_SLOW_MS get their EXPLAIN captured
+once the response is built. Per-view summaries are kept in the cache and
+listed worst-first on the staff-only dashboard panel (``query_profile``).
+Responses also carry a Server-Timing header with the request's DB time.
+
+The summaries are updated with a plain get/set, so concurrent requests can
+occasionally drop a sample; this is a diagnostics aid, not an audit log.
+"""
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+
+PROFILE_KEY = "query_profiler:views"
+MAX_VIEWS = 200
+MAX_SAMPLES = 5
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Query shape: parameters are already placeholders; collapse IN lists and whitespace."""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", sql).strip())
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class _Recorder:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[fingerprint(sql)] += 1
+            if elapsed_ms >= _setting("QUERY_PROFILER_SLOW_MS", 100) and not many:
+                self.slow.append((context["connection"].alias, sql, params, elapsed_ms))
+
+
+def _explain(alias, sql, params):
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return ""
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f"EXPLAIN failed: {exc}"
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, get_response):
+        if not _setting("QUERY_PROFILER_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith((settings.STATIC_URL, settings.MEDIA_URL)):
+            return self.get_response(request)
+
+        recorder = _Recorder()
+        wrappers = [connections[alias].execute_wrapper(recorder) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else request.path
+        if view != "query_profile":
+            self._store(view, request.get_full_path(), recorder)
+        response["Server-Timing"] = f'db;dur={recorder.total_ms:.1f};desc="{recorder.count} queries"'
+        return response
+
+    def _store(self, view, path, recorder):
+        threshold = _setting("QUERY_PROFILER_N_PLUS_ONE", 5)
+        repeated = [(sql, n) for sql, n in recorder.shapes.most_common(MAX_SAMPLES) if n >= threshold]
+        slow = [
+            {"sql": sql, "ms": round(ms, 1), "explain": _explain(alias, sql, params)}
+            for alias, sql, params, ms in sorted(recorder.slow, key=lambda item: -item[3])[:MAX_SAMPLES]
+        ]
+
+        profiles = cache.get(PROFILE_KEY) or {}
+        entry = profiles.get(view) or {
+            "view": view, "requests": 0, "queries": 0, "db_ms": 0.0,
+            "max_queries": 0, "max_path": "", "n_plus_one": {}, "slow": [],
+        }
+        entry["requests"] += 1
+        entry["queries"] += recorder.count
+        entry["db_ms"] += recorder.total_ms
+        if recorder.count >= entry["max_queries"]:
+            entry["max_queries"], entry["max_path"] = recorder.count, path
+        for sql, n in repeated:
+            entry["n_plus_one"][sql] = max(n, entry["n_plus_one"].get(sql, 0))
+        entry["n_plus_one"] = dict(sorted(entry["n_plus_one"].items(), key=lambda item: -item[1])[:MAX_SAMPLES])
+        entry["slow"] = sorted(entry["slow"] + slow, key=lambda item: -item["ms"])[:MAX_SAMPLES]
+        entry["updated"] = time.time()
+
+        profiles[view] = entry
+        if len(profiles) > MAX_VIEWS:
+            oldest = sorted(profiles, key=lambda name: profiles[name]["updated"])[:len(profiles) - MAX_VIEWS]
+            for name in oldest:
+                del profiles[name]
+        cache.set(PROFILE_KEY, profiles, timeout=None)
+
+
+def worst_offenders():
+    """Profiled views, N+1 suspects first, then by average query count."""
+    rows = []
+    for entry in (cache.get(PROFILE_KEY) or {}).values():
+        rows.append(dict(
+            entry,
+            avg_queries=entry["queries"] / entry["requests"],
+            avg_db_ms=entry["db_ms"] / entry["requests"],
+            n_plus_one=sorted(entry["n_plus_one"].items(), key=lambda item: -item[1]),
+        ))
+    rows.sort(key=lambda row: (not row["n_plus_one"], -row["avg_queries"], -row["avg_db_ms"]))
+    return rows
+
+
+def reset():
+    cache.delete(PROFILE_KEY)
@@ -0,0 +1,304 @@
+"""
+reCAPTCHA verification with a keep-alive HTTP client, a strict latency
+budget and a circuit breaker.
+
+Each worker thread keeps one persistent connection to the verify endpoint,
+so a submission costs a single request/response instead of a fresh TCP and
+TLS handshake. RECAPTCHA_TIMEOUT bounds the whole call (connect, send and
+read together), not each socket operation. When the provider keeps failing,
+the breaker opens and submissions are decided by RECAPTCHA_DEGRADED_POLICY
+without waiting on the network until RECAPTCHA_BREAKER_RESET seconds have
+passed.
+
+Every RECAPTCHA_METRICS_LOG_INTERVAL seconds each worker logs its request,
+failure and latency counters at INFO on this module's logger.
+
+Point RECAPTCHA_VERIFY_URL at a local stub (plain http is supported) to
+test without Google.
+"""
+import http.client
+import json
+import logging
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+POLICY_ALLOW = "allow"
+POLICY_REJECT = "reject"
+
+
+class VerifyError(Exception):
+    pass
+
+
+class _Watchdog:
+    """
+    Shuts the connection's socket down once the deadline passes, waking a send
+    or read that is still blocked. Socket timeouts alone only bound each
+    operation, so a provider trickling bytes could hold a request far longer.
+    """
+
+    def __init__(self, conn, seconds):
+        self.conn = conn
+        self.expired = False
+        self._timer = threading.Timer(seconds, self._expire)
+        self._timer.daemon = True
+
+    def __enter__(self):
+        self._timer.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._timer.cancel()
+
+    def _expire(self):
+        self.expired = True
+        sock = self.conn.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class KeepAliveClient:
+    """Minimal POST client holding one persistent connection per thread."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ssl_context = ssl.create_default_context() if self.https else None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.https:
+                conn = http.client.HTTPSConnection(
+                    self.host, self.port, timeout=self.timeout, context=self._ssl_context
+                )
+            else:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _discard(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def post_form(self, payload):
+        body = urlencode(payload).encode("utf-8")
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        deadline = time.monotonic() + self.timeout
+
+        # A kept-alive connection may have been closed by the server while
+        # idle; that shows up on first use, so retry once on a new one.
+        for attempt in (1, 2):
+            conn = self._connection()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._discard()
+                raise VerifyError("latency budget exhausted")
+            conn.timeout = remaining
+            if conn.sock is not None:
+                conn.sock.settimeout(remaining)
+
+            watchdog = _Watchdog(conn, remaining)
+            try:
+                with watchdog:
+                    conn.request("POST", self.path, body=body, headers=headers)
+                    response = conn.getresponse()
+                    data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._discard()
+                if watchdog.expired:
+                    raise VerifyError("latency budget exhausted")
+                if attempt == 2:
+                    raise
+                continue
+            except Exception:
+                self._discard()
+                if watchdog.expired:
+                    raise VerifyError("latency budget exhausted")
+                raise
+
+            # Also drop the connection if the watchdog fired just after the
+            # read finished: its socket has been shut down.
+            if response.will_close or watchdog.expired:
+                self._discard()
+            if response.status != 200:
+                raise VerifyError(f"HTTP {response.status}")
+            return json.loads(data.decode("utf-8"))
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures, half-opens after ``reset_after`` seconds."""
+
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Half-open: let one probe through, then wait again if it fails.
+            if time.monotonic() - self.opened_at >= self.reset_after:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class VerifyMetrics:
+    """In-process counters and a rolling latency window for this worker."""
+
+    def __init__(self, window=500):
+        self.latencies_ms = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self._logged_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms, ok):
+        with self._lock:
+            self.requests += 1
+            self.latencies_ms.append(latency_ms)
+            if not ok:
+                self.failures += 1
+
+    def record_short_circuit(self):
+        with self._lock:
+            self.short_circuits += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self.latencies_ms)
+            requests, failures, short_circuits = self.requests, self.failures, self.short_circuits
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        return {
+            "requests": requests,
+            "failures": failures,
+            "short_circuits": short_circuits,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "breaker_open": _breaker.is_open if _breaker else False,
+        }
+
+    def log_if_due(self):
+        """Log a snapshot at most once per RECAPTCHA_METRICS_LOG_INTERVAL seconds (0 turns it off)."""
+        interval = getattr(settings, "RECAPTCHA_METRICS_LOG_INTERVAL", 300)
+        with self._lock:
+            now = time.monotonic()
+            if not interval or now - self._logged_at < interval:
+                return
+            self._logged_at = now
+        logger.info("reCAPTCHA verify metrics: %s", json.dumps(self.snapshot(), sort_keys=True))
+
+
+metrics = VerifyMetrics()
+_client = None
+_breaker = None
+_init_lock = threading.Lock()
+
+
+def _get_client_and_breaker():
+    global _client, _breaker
+    if _client is None:
+        with _init_lock:
+            if _client is None:
+                _breaker = CircuitBreaker(
+                    threshold=getattr(settings, "RECAPTCHA_BREAKER_THRESHOLD", 5),
+                    reset_after=getattr(settings, "RECAPTCHA_BREAKER_RESET", 30),
+                )
+                _client = KeepAliveClient(
+                    getattr(settings, "RECAPTCHA_VERIFY_URL", DEFAULT_VERIFY_URL),
+                    timeout=getattr(settings, "RECAPTCHA_TIMEOUT", 2.0),
+                )
+    return _client, _breaker
+
+
+def reset():
+    """Drop the client, breaker and counters so the next call reads settings again."""
+    global _client, _breaker, metrics
+    with _init_lock:
+        _client = _breaker = None
+        metrics = VerifyMetrics()
+
+
+def _degraded_result():
+    return getattr(settings, "RECAPTCHA_DEGRADED_POLICY", POLICY_REJECT) == POLICY_ALLOW
+
+
+def verify_recaptcha(token, user_ip=None):
+    recaptcha_secret = getattr(settings, "RECAPTCHA_SECRET_KEY", "")
+    if not recaptcha_secret:
+        return False
+
+    payload = {
+        "secret": recaptcha_secret,
+        "response": token or "",
+    }
+    if user_ip:
+        payload["remoteip"] = user_ip
+
+    client, breaker = _get_client_and_breaker()
+    if not breaker.allow_request():
+        metrics.record_short_circuit()
+        metrics.log_if_due()
+        return _degraded_result()
+
+    started = time.monotonic()
+    try:
+        response_data = client.post_form(payload)
+    except (OSError, http.client.HTTPException, ValueError, VerifyError) as exc:
+        latency_ms = (time.monotonic() - started) * 1000
+        breaker.record_failure()
+        metrics.record(latency_ms, ok=False)
+        logger.warning("reCAPTCHA verify failed after %.0fms: %s", latency_ms, exc)
+        metrics.log_if_due()
+        return _degraded_result()
+
+    latency_ms = (time.monotonic() - started) * 1000
+    breaker.record_success()
+    metrics.record(latency_ms, ok=True)
+    logger.debug("reCAPTCHA verify took %.0fms", latency_ms)
+    metrics.log_if_due()
+    return bool(response_data.get("success"))
@@ -0,0 +1,75 @@
+"""
+Incrementally maintained daily counts behind the admin dashboard.
+
+Saving or deleting a Project, ContactMessage or ServiceInquiry adjusts one
+DailyStat row in the same transaction, so the dashboard reads small
+pre-aggregated rows instead of counting and grouping the source tables.
+"""
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyStat
+
+# entity -> (model name, service FK attname or None)
+ROLLUP_SOURCES = {
+    DailyStat.ENTITY_PROJECT: ("Project", "service_category_id"),
+    DailyStat.ENTITY_CONTACT: ("ContactMessage", None),
+    DailyStat.ENTITY_INQUIRY: ("ServiceInquiry", "service_type_id"),
+}
+
+
+def rollup_key(created_at, service_id):
+    return (timezone.localdate(created_at), service_id or 0)
+
+
+def instance_key(entity, instance):
+    _, service_field = ROLLUP_SOURCES[entity]
+    service_id = getattr(instance, service_field) if service_field else None
+    return rollup_key(instance.created_at, service_id)
+
+
+def adjust(entity, key, delta):
+    day, service_key = key
+    rows = DailyStat.objects.filter(entity=entity, date=day, service_key=service_key)
+    if rows.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            DailyStat.objects.create(entity=entity, date=day, service_key=service_key, count=delta)
+    except IntegrityError:
+        # Another transaction created the row first.
+        rows.update(count=F("count") + delta)
+
+
+def rebuild(entities=None):
+    """Recompute DailyStat from the source tables. Returns rows written."""
+    written = 0
+    with transaction.atomic():
+        for entity, (model_name, service_field) in ROLLUP_SOURCES.items():
+            if entities and entity not in entities:
+                continue
+            model = apps.get_model("growscape_app", model_name)
+            group_by = ["day", service_field] if service_field else ["day"]
+            grouped = (
+                model.objects
+                .annotate(day=TruncDate("created_at", tzinfo=timezone.get_current_timezone()))
+                .values(*group_by)
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            DailyStat.objects.filter(entity=entity).delete()
+            rows = [
+                DailyStat(
+                    entity=entity,
+                    date=row["day"],
+                    service_key=(row[service_field] or 0) if service_field else 0,
+                    count=row["total"],
+                )
+                for row in grouped.iterator()
+            ]
+            DailyStat.objects.bulk_create(rows, batch_size=1000)
+            written += len(rows)
+    return written
@@ -0,0 +1,186 @@
+"""
+Full-text search over blogs, services and projects.
+
+SearchEntry rows are upserted from save/delete signals. Queries go to the
+generated tsvector column (GIN-indexed) on Postgres and to the FTS5 table
+on SQLite; any other backend, or SQLite without FTS5, falls back to LIKE.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.utils import DatabaseError
+from django.urls import reverse
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+from .models import Blog, Project, SearchEntry, Service
+
+# Private-use markers survive escaping and are swapped for <mark> afterwards.
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_STOP = "\x03"
+SNIPPET_WORDS = 30
+
+
+def _document(instance):
+    """(kind, title, body, url) for an indexed model instance."""
+    if isinstance(instance, Blog):
+        return (
+            SearchEntry.KIND_BLOG, instance.title, strip_tags(instance.description),
+            reverse("blog_detail", kwargs={"slug": instance.slug}),
+        )
+    if isinstance(instance, Service):
+        return (
+            SearchEntry.KIND_SERVICE, instance.name,
+            f"{strip_tags(instance.full_description)}\n{instance.features_list}",
+            reverse("service_detail", kwargs={"slug": instance.slug}),
+        )
+    if isinstance(instance, Project):
+        return (
+            SearchEntry.KIND_PROJECT, instance.title,
+            f"{strip_tags(instance.description)}\n{instance.location}",
+            reverse("project_detail", kwargs={"pk": instance.pk}),
+        )
+    raise TypeError(f"{type(instance).__name__} is not searchable")
+
+
+def _entry(instance):
+    kind, title, body, url = _document(instance)
+    return SearchEntry(kind=kind, object_id=instance.pk, title=title[:255], body=body, url=url)
+
+
+def index_instance(instance):
+    kind, title, body, url = _document(instance)
+    SearchEntry.objects.update_or_create(
+        kind=kind, object_id=instance.pk,
+        defaults={"title": title[:255], "body": body, "url": url},
+    )
+
+
+def index_many(instances):
+    """index_instance() for rows written with bulk_create, which skips the signals."""
+    SearchEntry.objects.bulk_create(
+        [_entry(instance) for instance in instances],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=["title", "body", "url"],
+    )
+
+
+def remove_instance(instance):
+    kind = _document(instance)[0]
+    SearchEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild_index(batch_size=500):
+    """
+    Re-create every SearchEntry from the source tables. Returns the entry count.
+
+    Rows are read and written ``batch_size`` at a time, so memory stays flat
+    however many documents there are.
+    """
+    count = 0
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        for model in (Blog, Service, Project):
+            batch = []
+            for instance in model.objects.all().iterator(chunk_size=batch_size):
+                batch.append(_entry(instance))
+                if len(batch) == batch_size:
+                    SearchEntry.objects.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+            SearchEntry.objects.bulk_create(batch)
+            count += len(batch)
+    return count
+
+
+def _highlight(snippet):
+    html = escape(snippet).replace(_HIGHLIGHT_START, "<mark>").replace(_HIGHLIGHT_STOP, "</mark>")
+    return mark_safe(html)
+
+
+def _postgres_search(query, limit, kinds):
+    sql = f"""
+        SELECT id, kind, title, url,
+               ts_rank_cd(search_vector, q) AS rank,
+               ts_headline('english', body, q, %s)
+        FROM growscape_app_searchentry, websearch_to_tsquery('english', %s) AS q
+        WHERE search_vector @@ q {"AND kind = ANY(%s)" if kinds else ""}
+        ORDER BY rank DESC, id DESC
+        LIMIT %s
+    """
+    headline_options = (
+        f"StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=10"
+    )
+    params = [headline_options, query] + ([list(kinds)] if kinds else []) + [limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _fts5_query(query):
+    # Quote each term so user input can't inject FTS5 syntax; prefix-match the terms.
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _sqlite_search(query, limit, kinds):
+    match = _fts5_query(query)
+    if not match:
+        return []
+    kind_filter = f"AND e.kind IN ({', '.join('%s' for _ in kinds)})" if kinds else ""
+    sql = f"""
+        SELECT e.id, e.kind, e.title, e.url,
+               -bm25(growscape_app_searchentry_fts, 10.0, 1.0) AS rank,
+               snippet(growscape_app_searchentry_fts, 1, '{_HIGHLIGHT_START}', '{_HIGHLIGHT_STOP}', '…', {SNIPPET_WORDS})
+        FROM growscape_app_searchentry_fts
+        JOIN growscape_app_searchentry e ON e.id = growscape_app_searchentry_fts.rowid
+        WHERE growscape_app_searchentry_fts MATCH %s {kind_filter}
+        ORDER BY rank DESC
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, *kinds, limit])
+        return cursor.fetchall()
+
+
+def _fallback_search(query, limit, kinds):
+    entries = SearchEntry.objects.filter(title__icontains=query) | SearchEntry.objects.filter(body__icontains=query)
+    if kinds:
+        entries = entries.filter(kind__in=kinds)
+    rows = []
+    for entry in entries.order_by("-updated_at")[:limit]:
+        words = entry.body.split()
+        rows.append((entry.id, entry.kind, entry.title, entry.url, 0.0, " ".join(words[:SNIPPET_WORDS])))
+    return rows
+
+
+def search(query, limit=20, kinds=None):
+    """
+    Ranked results for ``query`` as dicts with kind, title, url, rank and
+    an HTML-safe snippet with matches wrapped in <mark>.
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+    kinds = [k for k in (kinds or []) if k in dict(SearchEntry.KIND_CHOICES)]
+
+    vendor = connection.vendor
+    try:
+        if vendor == "postgresql":
+            rows = _postgres_search(query, limit, kinds)
+        elif vendor == "sqlite":
+            rows = _sqlite_search(query, limit, kinds)
+        else:
+            rows = _fallback_search(query, limit, kinds)
+    except DatabaseError:
+        if vendor != "sqlite":
+            raise
+        # SQLite without the FTS5 table (see migration 0007).
+        rows = _fallback_search(query, limit, kinds)
+
+    return [
+        {"kind": kind, "title": title, "url": url, "rank": float(rank or 0), "snippet": _highlight(snippet or "")}
+        for _, kind, title, url, rank, snippet in rows
+    ]
@@ -0,0 +1,303 @@
+"""
+Deterministic synthetic content for benchmarks and load tests.
+
+seed_content() fills every public model from a seeded RNG with bulk inserts.
+The same seed and volumes always produce the same rows relative to the
+reference day. Rows share a small pool of generated images, so volume does
+not cost disk space. bulk_create skips signals, so rollups, the search index
+and the content cache are rebuilt once at the end.
+"""
+import random
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from PIL import Image, ImageDraw
+
+from . import rollups, search
+from .content_cache import CACHED_CONTENT_MODELS, bump_generation
+from .images import generate_derivatives_for
+from .models import (
+    Blog, Category, ContactMessage, GalleryImage, Project, Service, ServiceInquiry, TeamMember, Testimonial,
+    TextMetadata,
+)
+
+DEFAULT_VOLUMES = {
+    "services": 12,
+    "categories": 8,
+    "team": 12,
+    "testimonials": 15,
+    "projects": 300,
+    "blogs": 120,
+    "gallery": 480,
+    "contacts": 2000,
+    "inquiries": 2000,
+}
+
+# Load-test volumes for seed_scale.
+SCALE_VOLUMES = {
+    "services": 500,
+    "categories": 40,
+    "team": 40,
+    "testimonials": 200,
+    "projects": 50_000,
+    "blogs": 10_000,
+    "gallery": 100_000,
+    "contacts": 1_000_000,
+    "inquiries": 1_000_000,
+}
+
+HISTORY_DAYS = 730
+
+_SERVICE_WORDS = [
+    "Garden", "Lawn", "Landscape", "Irrigation", "Pool", "Hardscape", "Tree", "Pest", "Turf", "Pergola",
+    "Lighting", "Fountain", "Rooftop", "Villa", "Palm", "Paving", "Planting", "Vertical", "Desert", "Drip",
+]
+_SERVICE_KINDS = ["Maintenance", "Design", "Installation", "Care", "Renovation", "Cleaning", "Consulting", "Repair"]
+_LOCATIONS = [
+    "Dubai Hills", "Arabian Ranches", "Emirates Hills", "Jumeirah", "Palm Jumeirah", "Al Barsha", "Mirdif",
+    "Damac Hills", "The Springs", "The Meadows", "Al Furjan", "Abu Dhabi", "Sharjah", "Al Ain",
+]
+_FIRST_NAMES = ["Aisha", "Omar", "Fatima", "John", "Priya", "Ravi", "Sara", "Ahmed", "Maria", "Chen", "Layla", "Yusuf"]
+_LAST_NAMES = ["Khan", "Smith", "Al Mansoori", "Patel", "Nair", "Haddad", "Garcia", "Wang", "Rahman", "Fernandes"]
+_SENTENCES = [
+    "We redesigned the outdoor space around the family's daily routine.",
+    "Drip irrigation cut water use by almost a third over the summer.",
+    "Native, heat-tolerant planting keeps the garden green with little upkeep.",
+    "The pool deck was relaid with anti-slip porcelain and new lighting.",
+    "Shade structures make the terrace usable through the warmer months.",
+    "Our maintenance crew visits weekly for pruning, feeding and cleanup.",
+    "Soil was tested and amended before any turf was laid.",
+    "Lighting was zoned so paths, trees and water features dim independently.",
+]
+
+
+def _text(rng, sentences):
+    return " ".join(rng.choice(_SENTENCES) for _ in range(sentences))
+
+
+def _phone(rng):
+    return f"+9715{rng.randrange(10_000_000, 99_999_999)}"
+
+
+class Seeder:
+    def __init__(self, seed=0, batch_size=2000, image_pool=12, derivatives=True, log=None):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.image_pool = image_pool
+        self.derivatives = derivatives
+        self.log = log or (lambda message: None)
+        self.now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.images = {}
+
+    # ---- shared image pool ----
+
+    def _image_names(self, model, field_name="image"):
+        """Store ``image_pool`` generated images for ``model`` once and return their names."""
+        label = model._meta.label
+        if label in self.images:
+            return self.images[label]
+
+        field = model._meta.get_field(field_name)
+        storage = field.storage
+        rng = random.Random(f"{self.seed}:{label}")
+        names = []
+        for index in range(self.image_pool):
+            name = field.generate_filename(None, f"seed-{self.seed}-{index}.jpg")
+            if not storage.exists(name):
+                image = Image.new("RGB", (1280, 853), tuple(rng.randrange(40, 200) for _ in range(3)))
+                draw = ImageDraw.Draw(image)
+                for _ in range(12):
+                    x, y = rng.randrange(1280), rng.randrange(853)
+                    radius = rng.randrange(40, 260)
+                    draw.ellipse(
+                        (x - radius, y - radius, x + radius, y + radius),
+                        fill=tuple(rng.randrange(256) for _ in range(3)),
+                    )
+                buffer = BytesIO()
+                image.save(buffer, format="JPEG", quality=80)
+                name = storage.save(name, ContentFile(buffer.getvalue()))
+            if self.derivatives:
+                generate_derivatives_for(storage, name)
+            names.append(name)
+        self.images[label] = names
+        return names
+
+    def _when(self):
+        return self.now - timedelta(seconds=self.rng.randrange(HISTORY_DAYS * 86400))
+
+    def _bulk(self, model, rows, total):
+        """bulk_create an iterator of unsaved rows in batches, logging progress."""
+        batch, written = [], 0
+        for row in rows:
+            if isinstance(row, TextMetadata):
+                row.refresh_text_metadata()
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._write(model, batch)
+                written += len(batch)
+                batch = []
+                if written % (self.batch_size * 25) == 0:
+                    self.log(f"  {model.__name__}: {written}/{total}")
+        if batch:
+            self._write(model, batch)
+            written += len(batch)
+        return written
+
+    def _write(self, model, batch):
+        """bulk_create one batch, keeping the historical dates the generators set."""
+        fields = [f.attname for f in model._meta.concrete_fields if getattr(f, "auto_now_add", False)]
+        dates = [[getattr(row, name) for name in fields] for row in batch]
+        model.objects.bulk_create(batch)
+        if not fields:
+            return
+        # auto_now_add overwrites the date on insert; put historical
+        # dates back with one UPDATE per batch.
+        for row, values in zip(batch, dates):
+            for name, value in zip(fields, values):
+                if value is not None:
+                    setattr(row, name, value)
+        model.objects.bulk_update(batch, fields, batch_size=self.batch_size)
+
+    # ---- generators ----
+
+    def _services(self, count):
+        images = self._image_names(Service, "cover_image")
+        for index in range(count):
+            name = f"{_SERVICE_WORDS[index % len(_SERVICE_WORDS)]} {_SERVICE_KINDS[index // len(_SERVICE_WORDS) % len(_SERVICE_KINDS)]}"
+            if index >= len(_SERVICE_WORDS) * len(_SERVICE_KINDS):
+                name = f"{name} {index}"
+            description = _text(self.rng, 6)
+            features = self.rng.sample(_SENTENCES, 4)
+            yield Service(
+                name=name,
+                slug=f"{slugify(name)}-s{self.seed}",
+                full_description=description,
+                features_list="\n".join(features),
+                features=features,
+                cover_image=self.rng.choice(images),
+            )
+
+    def _projects(self, count, service_ids):
+        images = self._image_names(Project)
+        for index in range(count):
+            yield Project(
+                title=f"{self.rng.choice(_SERVICE_WORDS)} project in {self.rng.choice(_LOCATIONS)} #{index}",
+                service_category_id=self.rng.choice(service_ids) if service_ids else None,
+                image=self.rng.choice(images),
+                location=self.rng.choice(_LOCATIONS),
+                description=_text(self.rng, 4),
+                created_at=self._when(),
+            )
+
+    def _blogs(self, count):
+        images = self._image_names(Blog)
+        for index in range(count):
+            title = f"{self.rng.choice(_SERVICE_WORDS)} {self.rng.choice(_SERVICE_KINDS).lower()} tips #{index}"
+            yield Blog(
+                title=title,
+                slug=f"{slugify(title)}-s{self.seed}",
+                image=self.rng.choice(images),
+                description="".join(f"<p>{_text(self.rng, 5)}</p>" for _ in range(6)),
+                created_at=self._when(),
+            )
+
+    def _categories(self, count):
+        for index in range(count):
+            yield Category(name=f"{_LOCATIONS[index % len(_LOCATIONS)]} {index} (seed {self.seed})", created_at=self._when())
+
+    def _gallery(self, count, category_ids):
+        images = self._image_names(GalleryImage)
+        for index in range(count):
+            yield GalleryImage(
+                category_id=self.rng.choice(category_ids),
+                title=f"Gallery image {index}",
+                image=self.rng.choice(images),
+                uploaded_at=self._when(),
+            )
+
+    def _team(self, count):
+        images = self._image_names(TeamMember, "photo")
+        for index in range(count):
+            yield TeamMember(
+                name=f"{self.rng.choice(_FIRST_NAMES)} {self.rng.choice(_LAST_NAMES)}",
+                position=self.rng.choice(["Landscape Architect", "Site Supervisor", "Horticulturist", "Designer"]),
+                photo=self.rng.choice(images),
+                bio=_text(self.rng, 2),
+            )
+
+    def _testimonials(self, count):
+        images = self._image_names(Testimonial)
+        for index in range(count):
+            yield Testimonial(
+                name=f"{self.rng.choice(_FIRST_NAMES)} {self.rng.choice(_LAST_NAMES)}",
+                image=self.rng.choice(images),
+                review=_text(self.rng, 3),
+                created_at=self._when(),
+            )
+
+    def _contacts(self, count):
+        for _ in range(count):
+            first, last = self.rng.choice(_FIRST_NAMES), self.rng.choice(_LAST_NAMES)
+            yield ContactMessage(
+                first_name=first, last_name=last, phone=_phone(self.rng),
+                email=f"{first}.{last}@example.com".lower().replace(" ", ""),
+                message=_text(self.rng, 2), created_at=self._when(),
+            )
+
+    def _inquiries(self, count, service_ids):
+        for _ in range(count):
+            first, last = self.rng.choice(_FIRST_NAMES), self.rng.choice(_LAST_NAMES)
+            created = self._when()
+            yield ServiceInquiry(
+                first_name=first, last_name=last, phone=_phone(self.rng),
+                email=f"{first}.{last}@example.com".lower().replace(" ", ""),
+                service_type_id=self.rng.choice(service_ids) if service_ids else None,
+                preferred_date=(created + timedelta(days=self.rng.randrange(1, 30))).date(),
+                location=self.rng.choice(_LOCATIONS), message=_text(self.rng, 2), created_at=created,
+            )
+
+    # ---- entry point ----
+
+    def run(self, volumes):
+        volumes = {**DEFAULT_VOLUMES, **volumes}
+        written = {}
+        with transaction.atomic():
+            written["services"] = self._bulk(Service, self._services(volumes["services"]), volumes["services"])
+            written["categories"] = self._bulk(Category, self._categories(volumes["categories"]), volumes["categories"])
+        service_ids = list(Service.objects.order_by("pk").values_list("pk", flat=True))
+        category_ids = list(Category.objects.order_by("pk").values_list("pk", flat=True))
+
+        plan = [
+            ("team", TeamMember, lambda n: self._team(n)),
+            ("testimonials", Testimonial, lambda n: self._testimonials(n)),
+            ("projects", Project, lambda n: self._projects(n, service_ids)),
+            ("blogs", Blog, lambda n: self._blogs(n)),
+            ("gallery", GalleryImage, lambda n: self._gallery(n, category_ids)),
+            ("contacts", ContactMessage, lambda n: self._contacts(n)),
+            ("inquiries", ServiceInquiry, lambda n: self._inquiries(n, service_ids)),
+        ]
+        for key, model, rows in plan:
+            count = volumes[key]
+            if not count or (key == "gallery" and not category_ids):
+                written[key] = 0
+                continue
+            self.log(f"Seeding {count} {key}...")
+            with transaction.atomic():
+                written[key] = self._bulk(model, rows(count), count)
+
+        self.log("Rebuilding dashboard rollups and search index...")
+        rollups.rebuild()
+        search.rebuild_index()
+        for model_name in CACHED_CONTENT_MODELS:
+            bump_generation(model_name)
+        return written
+
+
+def seed_content(volumes=None, seed=0, **options):
+    """Insert synthetic content; returns {volume key: rows written}."""
+    return Seeder(seed=seed, **options).run(volumes or {})
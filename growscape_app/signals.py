@@ -0,0 +1,97 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .content_cache import CACHED_CONTENT_MODELS, bump_generation
+from .image_jobs import enqueue_derivatives
+from .images import RESPONSIVE_IMAGE_FIELDS, has_derivatives
+from . import rollups, search
+
+_image_field_by_model = dict(RESPONSIVE_IMAGE_FIELDS)
+
+
+def _queue_image_derivatives(sender, instance, **kwargs):
+    field_name = _image_field_by_model[sender.__name__]
+    fieldfile = getattr(instance, field_name)
+    if not fieldfile or has_derivatives(fieldfile):
+        return
+    # Encoded by process_image_jobs, off the request. Queued after commit so a
+    # rolled-back save leaves no job behind; the original is served until then.
+    transaction.on_commit(partial(enqueue_derivatives, sender, field_name, [fieldfile.name]))
+
+
+def _bump_content_generation(sender, **kwargs):
+    # After commit, so a concurrent request can't re-cache pre-commit rows
+    # under the new generation.
+    transaction.on_commit(partial(bump_generation, sender.__name__))
+
+
+_rollup_entity_by_model = {model_name: entity for entity, (model_name, _) in rollups.ROLLUP_SOURCES.items()}
+
+
+def _remember_rollup_key(sender, instance, update_fields=None, **kwargs):
+    # Updates can move a row to another day or service; remember where it was
+    # counted. New rows and saves that leave those fields alone skip the lookup.
+    instance._rollup_previous_key = None
+    if instance._state.adding:
+        return
+    entity = _rollup_entity_by_model[sender.__name__]
+    _, service_field = rollups.ROLLUP_SOURCES[entity]
+    fields = ["created_at", service_field] if service_field else ["created_at"]
+    watched = {name.removesuffix("_id") for name in fields}
+    if update_fields is not None and watched.isdisjoint(name.removesuffix("_id") for name in update_fields):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+    if previous is not None:
+        instance._rollup_previous_key = rollups.rollup_key(previous[0], previous[1] if service_field else None)
+
+
+def _update_rollup_on_save(sender, instance, created, **kwargs):
+    entity = _rollup_entity_by_model[sender.__name__]
+    key = rollups.instance_key(entity, instance)
+    previous_key = getattr(instance, "_rollup_previous_key", None)
+    if created:
+        rollups.adjust(entity, key, 1)
+    elif previous_key is not None and previous_key != key:
+        rollups.adjust(entity, previous_key, -1)
+        rollups.adjust(entity, key, 1)
+
+
+def _update_rollup_on_delete(sender, instance, **kwargs):
+    entity = _rollup_entity_by_model[sender.__name__]
+    rollups.adjust(entity, rollups.instance_key(entity, instance), -1)
+
+
+def _index_for_search(sender, instance, **kwargs):
+    search.index_instance(instance)
+
+
+def _remove_from_search(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+def connect_signals():
+    for model_name in ("Blog", "Service", "Project"):
+        model = apps.get_model("growscape_app", model_name)
+        post_save.connect(_index_for_search, sender=model, dispatch_uid=f"search_save_{model_name}")
+        post_delete.connect(_remove_from_search, sender=model, dispatch_uid=f"search_delete_{model_name}")
+
+    for model_name in _rollup_entity_by_model:
+        model = apps.get_model("growscape_app", model_name)
+        pre_save.connect(_remember_rollup_key, sender=model, dispatch_uid=f"rollup_pre_save_{model_name}")
+        post_save.connect(_update_rollup_on_save, sender=model, dispatch_uid=f"rollup_save_{model_name}")
+        post_delete.connect(_update_rollup_on_delete, sender=model, dispatch_uid=f"rollup_delete_{model_name}")
+
+    for model_name in CACHED_CONTENT_MODELS:
+        model = apps.get_model("growscape_app", model_name)
+        post_save.connect(_bump_content_generation, sender=model, dispatch_uid=f"content_cache_save_{model_name}")
+        post_delete.connect(_bump_content_generation, sender=model, dispatch_uid=f"content_cache_delete_{model_name}")
+
+    for model_name, _ in RESPONSIVE_IMAGE_FIELDS:
+        post_save.connect(
+            _queue_image_derivatives,
+            sender=apps.get_model("growscape_app", model_name),
+            dispatch_uid=f"responsive_images_{model_name}",
+        )
@@ -1,5 +1,14 @@
+import hashlib
+
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import parse_http_date_safe
+
+from .content_cache import get_generations
 from .models import Blog, Service, Project
 
 
@@ -19,33 +28,117 @@ class StaticViewSitemap(Sitemap):
 
 
 class BlogSitemap(Sitemap):
+    protocol = "https"
     priority = 0.8
     changefreq = "weekly"
+    limit = 5000
 
     def items(self):
-        return Blog.objects.all()
+        return Blog.objects.only("slug", "created_at").order_by("-created_at", "-id")
 
     def location(self, obj):
         return reverse('blog_detail', kwargs={'slug': obj.slug})
 
+    def lastmod(self, obj):
+        return obj.created_at
+
 
 class ServiceSitemap(Sitemap):
+    protocol = "https"
     priority = 0.9
     changefreq = "monthly"
+    limit = 5000
 
     def items(self):
-        return Service.objects.all()
+        return Service.objects.only("slug").order_by("id")
 
     def location(self, obj):
         return reverse('service_detail', kwargs={'slug': obj.slug})
 
 
 class ProjectSitemap(Sitemap):
+    protocol = "https"
     priority = 0.7
     changefreq = "monthly"
+    limit = 5000
 
     def items(self):
-        return Project.objects.all()
+        return Project.objects.only("id", "created_at").order_by("-created_at", "-id")
 
     def location(self, obj):
-        return reverse('project_detail', kwargs={'pk': obj.pk})
\ No newline at end of file
+        return reverse('project_detail', kwargs={'pk': obj.pk})
+
+    def lastmod(self, obj):
+        return obj.created_at
+
+
+SITEMAPS = {
+    'static': StaticViewSitemap,
+    'blog': BlogSitemap,
+    'service': ServiceSitemap,
+    'project': ProjectSitemap,
+}
+
+# Content models whose saves invalidate the rendered sitemaps.
+SITEMAP_MODELS = ["Blog", "Service", "Project"]
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cached_sitemap(request, cache_name, render):
+    """
+    Serve a rendered sitemap from cache, keyed by the content generations
+    of the sitemap models, and answer If-None-Match / If-Modified-Since
+    with a 304 before any database work.
+    """
+    generations = get_generations(SITEMAP_MODELS)
+    version = ".".join(str(generations[m]) for m in SITEMAP_MODELS)
+    etag = '"%s"' % hashlib.md5(f"{cache_name}:{version}".encode()).hexdigest()
+    key = f"sitemap:{cache_name}:{version}"
+
+    cached = cache.get(key)
+    if cached is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+        response.render()
+        cached = (response.content, response.get("X-Robots-Tag"), response.get("Last-Modified"))
+        cache.set(key, cached, timeout=SITEMAP_CACHE_TIMEOUT)
+
+    content, robots_tag, last_modified = cached
+    not_modified = get_conditional_response(
+        request, etag=etag,
+        last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(content, content_type="application/xml")
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = last_modified
+    if robots_tag:
+        response["X-Robots-Tag"] = robots_tag
+    patch_cache_control(response, public=True, max_age=60 * 60)
+    return response
+
+
+def sitemap_index(request):
+    return _cached_sitemap(
+        request, "index",
+        lambda: sitemap_views.index(request, SITEMAPS, sitemap_url_name="sitemap_section"),
+    )
+
+
+def sitemap_section(request, section):
+    # Normalised before it becomes part of the cache key: ?p=01 shares the
+    # entry of ?p=1, and junk is rejected before any database work.
+    try:
+        page = int(request.GET.get("p", "1"))
+    except ValueError:
+        raise Http404("Invalid sitemap page")
+    if page < 1:
+        raise Http404("Invalid sitemap page")
+    return _cached_sitemap(
+        request, f"{section}:{page}",
+        lambda: sitemap_views.sitemap(request, SITEMAPS, section=section),
+    )
@@ -0,0 +1,95 @@
+"""
+Unique slug allocation for Service and Blog.
+
+The next free suffix is found from a single prefix query instead of probing
+``slug``, ``slug-1``, ``slug-2``... one query at a time. Two concurrent saves
+can still pick the same slug, so the insert runs in a savepoint and is retried
+with a fresh allocation when the unique constraint rejects it.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SLUG_BASE_LENGTH = 40
+SAVE_ATTEMPTS = 5
+
+
+def slug_base(text, fallback):
+    return (slugify(text or "", allow_unicode=True) or fallback)[:SLUG_BASE_LENGTH].strip("-") or fallback
+
+
+def _taken_slugs(model, bases, exclude_pk=None):
+    """Every existing slug equal to one of ``bases`` or of the form ``base-<n>``."""
+    query = Q()
+    for base in bases:
+        query |= Q(slug=base) | Q(slug__startswith=f"{base}-")
+    rows = model._default_manager.filter(query)
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+    return set(rows.values_list("slug", flat=True))
+
+
+def _free_slugs(base, taken, count):
+    """The first ``count`` of ``base``, ``base-1``, ``base-2``... not in ``taken``."""
+    pattern = re.compile(rf"^{re.escape(base)}-(\d+)$")
+    used = {int(m.group(1)) for m in map(pattern.match, taken) if m}
+    found = []
+    if base not in taken:
+        found.append(base)
+    counter = 1
+    while len(found) < count:
+        if counter not in used:
+            found.append(f"{base}-{counter}")
+        counter += 1
+    return found
+
+
+def allocate_slug(model, text, fallback, exclude_pk=None):
+    base = slug_base(text, fallback)
+    return _free_slugs(base, _taken_slugs(model, [base], exclude_pk), 1)[0]
+
+
+def assign_unique_slugs(instances, source_field, fallback):
+    """
+    Fill in ``slug`` on unsaved ``instances`` (all of one model) that lack
+    one, ready for bulk_create. One query covers the whole batch and
+    duplicates within the batch get their own suffixes.
+    """
+    pending = [obj for obj in instances if not obj.slug]
+    if not pending:
+        return instances
+
+    by_base = {}
+    for obj in pending:
+        by_base.setdefault(slug_base(getattr(obj, source_field), fallback), []).append(obj)
+
+    model = type(pending[0])
+    taken = _taken_slugs(model, by_base)
+    taken.update(obj.slug for obj in instances if obj.slug)
+    for base, objs in by_base.items():
+        for obj, slug in zip(objs, _free_slugs(base, taken, len(objs))):
+            obj.slug = slug
+    return instances
+
+
+def save_with_unique_slug(instance, source_field, fallback, save, *args, **kwargs):
+    """
+    Run ``save`` (the model's ``super().save``), allocating a slug first if
+    the instance has none and retrying if a concurrent writer claims it.
+    """
+    if instance.slug:
+        return save(*args, **kwargs)
+
+    model = type(instance)
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        instance.slug = allocate_slug(model, getattr(instance, source_field), fallback, instance.pk)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            clash = model._default_manager.filter(slug=instance.slug).exclude(pk=instance.pk).exists()
+            instance.slug = ""
+            if not clash or attempt == SAVE_ATTEMPTS:
+                raise
@@ -0,0 +1,131 @@
+"""
+Responsive variants of static images, built at collectstatic time.
+
+ResponsiveStaticFilesStorage extends WhiteNoise's manifest storage: after
+the usual hashing and compression, every JPEG/PNG/WebP under
+RESPONSIVE_STATIC_PREFIXES is resized to RESPONSIVE_STATIC_WIDTHS (never
+upscaled, plus the original width) and encoded as AVIF and WebP, e.g.
+
+    images/new/slider11.jpg -> images/new/slider11_960w.webp, ..._1920w.avif
+
+The variants are hashed and added to the manifest like any other static
+file. Their intrinsic sizes go to RESPONSIVE_STATIC_MANIFEST, which the
+``{% responsive_static %}`` tag reads to emit srcset, width and height.
+Unchanged sources are recognised by hash and not re-encoded.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .images import available_formats, derivative_name, encode, open_image, resize_to_width
+
+logger = logging.getLogger(__name__)
+
+RESPONSIVE_STATIC_PREFIXES = ("images/",)
+RESPONSIVE_STATIC_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+RESPONSIVE_STATIC_WIDTHS = (480, 960, 1440, 1920)
+RESPONSIVE_STATIC_FORMATS = ("avif", "webp")
+RESPONSIVE_STATIC_MANIFEST = "responsive-static.json"
+
+_VARIANT_RE = re.compile(r"_\d+w\.(?:avif|webp|jpg)$")
+
+
+def variant_widths(width):
+    """Srcset widths for an image ``width`` pixels wide."""
+    return [w for w in RESPONSIVE_STATIC_WIDTHS if w < width] + [width]
+
+
+def is_responsive_source(path):
+    return (
+        path.startswith(RESPONSIVE_STATIC_PREFIXES)
+        and os.path.splitext(path)[1].lower() in RESPONSIVE_STATIC_EXTENSIONS
+        and not _VARIANT_RE.search(path)
+    )
+
+
+def _render_variants(source_bytes, path):
+    """(metadata entry, {variant name: bytes}) for one source image."""
+    image = open_image(BytesIO(source_bytes))
+    formats = [fmt for fmt in RESPONSIVE_STATIC_FORMATS if fmt in available_formats()]
+    widths = variant_widths(image.width)
+    files = {}
+    for width in widths:
+        resized = resize_to_width(image, width)
+        for fmt in formats:
+            files[derivative_name(path, width, fmt)] = encode(resized, fmt)
+    entry = {
+        "source": hashlib.md5(source_bytes).hexdigest(),
+        "width": image.width,
+        "height": image.height,
+        "widths": widths,
+        "formats": formats,
+    }
+    return entry, files
+
+
+class ResponsiveStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        previous = self.load_responsive_manifest()
+        sources = {}
+        for path in sorted(paths):
+            if is_responsive_source(path):
+                source_storage, source_path = paths[path]
+                with source_storage.open(source_path) as fh:
+                    sources[path] = fh.read()
+
+        def build(path):
+            source_bytes = sources[path]
+            entry = previous.get(path)
+            if entry and entry["source"] == hashlib.md5(source_bytes).hexdigest() and all(
+                self.exists(hashed) for hashed in entry["files"].values()
+            ):
+                return path, entry, None
+            try:
+                return (path, *_render_variants(source_bytes, path))
+            except (OSError, ValueError, SyntaxError) as exc:
+                return path, None, exc
+
+        manifest = {}
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            for path, entry, result in pool.map(build, sources):
+                if entry is None:
+                    # The original is still collected and served; the tag falls back to a plain <img>.
+                    logger.warning("Could not build responsive variants for %s: %s", path, result)
+                    continue
+                if result is not None:
+                    entry["files"] = {}
+                    for name, data in result.items():
+                        hashed = self.hashed_name(name, ContentFile(data))
+                        for target in (name, hashed):
+                            if self.exists(target):
+                                self.delete(target)
+                            self._save(target, ContentFile(data))
+                        entry["files"][name] = hashed
+                        yield name, hashed, True
+                for name, hashed in entry["files"].items():
+                    self.hashed_files[self.hash_key(self.clean_name(name))] = hashed
+                manifest[path] = entry
+
+        self.save_manifest()
+        if self.exists(RESPONSIVE_STATIC_MANIFEST):
+            self.delete(RESPONSIVE_STATIC_MANIFEST)
+        self._save(RESPONSIVE_STATIC_MANIFEST, ContentFile(json.dumps(manifest, indent=1).encode()))
+
+    def load_responsive_manifest(self):
+        """{source path: entry} from the last build, or {} before the first one."""
+        try:
+            with self.open(RESPONSIVE_STATIC_MANIFEST) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
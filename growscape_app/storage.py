@@ -0,0 +1,162 @@
+"""
+Content-addressed media storage and orphan collection.
+
+ContentAddressedStorage stores every upload under the SHA-256 of its bytes,
+
+    projects/villa.jpg -> content/3f/a2/3fa2...9c.jpg
+
+so the same photo uploaded for a project, a gallery image and a blog is
+written once and shared. Names already under ``content/`` are stored as
+given. Responsive derivatives (``<root>_<width>w.<ext>``, see images.py) are
+written through save_derivative(), which keeps their name, so derivatives
+of files with legacy names such as ``projects/villa.jpg`` land next to them
+where has_derivatives() looks. An upload that merely looks like a
+derivative (``photo_800w.jpg``) is content-addressed like any other.
+Deleting a row never deletes its file, since other rows may point at the
+same bytes.
+
+Unreferenced files are reclaimed by ``manage.py media_gc``: find_orphans()
+counts references from every FileField/ImageField of every installed model
+and returns the stored files (and their derivatives) that nothing uses.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+
+from .images import FORMAT_EXTENSIONS
+
+CONTENT_ROOT = "content"
+TEMP_PREFIX = ".tmp-"
+
+_DERIVATIVE_RE = re.compile(
+    r"^(?P<root>.+)_\d+w\.(?:%s)$" % "|".join(re.escape(ext) for ext in set(FORMAT_EXTENSIONS.values()))
+)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def content_name(self, name, content):
+        """The content-addressed name ``content`` would be stored under."""
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        return f"{CONTENT_ROOT}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{extension}"
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        if name.startswith(f"{CONTENT_ROOT}/"):
+            return super().save(name, content, max_length=max_length)
+
+        name = self.content_name(name, content)
+        try:
+            # Already stored: refresh the mtime so media_gc's --min-age grace
+            # period covers the row about to reference it.
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            self._write_atomic(name, content)
+        return name
+
+    def save_derivative(self, name, content):
+        """Store a derivative under ``name`` as given, next to its original."""
+        return super().save(name, content)
+
+    def _write_atomic(self, name, content):
+        # Concurrent uploads of the same bytes race for the same name; each
+        # writes a private temp file and the last rename wins with identical data.
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in content.chunks():
+                    fh.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def file_fields():
+    """(model, field) for every FileField/ImageField of every installed model."""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def reference_counts():
+    """Counter of stored name -> number of rows pointing at it, across all file fields."""
+    counts = Counter()
+    for model, field in file_fields():
+        names = (
+            model._default_manager.exclude(**{field.name: ""})
+            .exclude(**{f"{field.name}__isnull": True})
+            .values_list(field.name, flat=True)
+        )
+        counts.update(names.iterator(chunk_size=2000))
+    return counts
+
+
+def _media_roots():
+    """Top-level directories owned by file fields; nothing else in MEDIA_ROOT is touched."""
+    roots = {CONTENT_ROOT}
+    for _, field in file_fields():
+        if isinstance(field.upload_to, str) and field.upload_to.strip("/"):
+            roots.add(field.upload_to.strip("/").split("/")[0])
+    return sorted(roots)
+
+
+def _walk(storage, directory):
+    if not storage.exists(directory):
+        return
+    subdirectories, files = storage.listdir(directory)
+    for filename in files:
+        yield f"{directory}/{filename}"
+    for subdirectory in subdirectories:
+        yield from _walk(storage, f"{directory}/{subdirectory}")
+
+
+def find_orphans(storage, min_age=timedelta(hours=1)):
+    """
+    Stored files under the media roots that no row references. Files newer
+    than ``min_age`` are skipped so uploads whose row is not committed yet
+    survive. Files are listed before references are read, so anything
+    referenced by the time we look is kept.
+    """
+    cutoff = timezone.now() - min_age
+    candidates = [
+        name for root in _media_roots() for name in _walk(storage, root)
+        if storage.get_modified_time(name) < cutoff
+    ]
+
+    referenced = reference_counts()
+    referenced_roots = {os.path.splitext(name)[0] for name in referenced}
+    orphans = []
+    for name in candidates:
+        if name in referenced:
+            continue
+        match = _DERIVATIVE_RE.match(name)
+        if match and match.group("root") in referenced_roots:
+            continue
+        orphans.append(name)
+    return orphans
@@ -0,0 +1,133 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from PIL import Image
+
+from ..images import (
+    FORMAT_MIME_TYPES,
+    available_formats,
+    derivative_name,
+    derivative_srcset,
+    derivative_url,
+    has_derivatives,
+)
+
+register = template.Library()
+
+DEFAULT_SIZES = "(max-width: 767px) 100vw, (max-width: 1199px) 50vw, 33vw"
+
+
+@register.simple_tag
+def responsive_image(fieldfile, alt="", sizes=DEFAULT_SIZES, **attrs):
+    """
+    Render ``fieldfile`` as a <picture> with AVIF/WebP sources and a JPEG
+    srcset fallback. Extra keyword arguments become <img> attributes.
+
+    Usage: {% responsive_image project.image alt=project.title class="img-fluid" %}
+    """
+    if not fieldfile:
+        return ""
+
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+
+    if not has_derivatives(fieldfile):
+        return format_html('<img src="{}" alt="{}"{}>', fieldfile.url, alt, flatatt(attrs))
+
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMAT_MIME_TYPES[fmt], derivative_srcset(fieldfile, fmt), sizes)
+            for fmt in available_formats()
+            if fmt != "jpeg"
+        ),
+    )
+    return format_html(
+        '<picture class="responsive-image">{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        sources,
+        derivative_url(fieldfile, 640),
+        derivative_srcset(fieldfile, "jpeg"),
+        sizes,
+        alt,
+        flatatt(attrs),
+    )
+
+
+@register.filter
+def thumbnail_url(fieldfile, width=320):
+    """JPEG derivative URL for small fixed-size thumbnails, e.g. admin lists."""
+    if not fieldfile:
+        return ""
+    if not has_derivatives(fieldfile):
+        return fieldfile.url
+    return derivative_url(fieldfile, int(width))
+
+
+@lru_cache(maxsize=None)
+def _responsive_static_manifest():
+    """Variant metadata written by collectstatic (see staticfiles.py); empty in DEBUG."""
+    if settings.DEBUG or not hasattr(staticfiles_storage, "load_responsive_manifest"):
+        return {}
+    return staticfiles_storage.load_responsive_manifest()
+
+
+@lru_cache(maxsize=None)
+def _static_image_size(path):
+    source = finders.find(path)
+    if not source:
+        return None
+    try:
+        with Image.open(source) as image:
+            return image.size
+    except (OSError, ValueError):
+        return None
+
+
+@register.simple_tag
+def responsive_static(path, alt="", sizes="100vw", **attrs):
+    """
+    Render the static image ``path`` as a <picture> with the AVIF/WebP
+    variants built by collectstatic, the original as the <img> fallback and
+    its intrinsic width/height. Without variants (DEBUG, or before the first
+    collectstatic) a plain <img> is rendered.
+
+    Usage: {% responsive_static 'images/new/slider11.jpg' alt="..." loading="eager" %}
+    """
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+
+    entry = _responsive_static_manifest().get(path)
+    size = (entry["width"], entry["height"]) if entry else _static_image_size(path)
+    if size:
+        attrs.setdefault("width", size[0])
+        attrs.setdefault("height", size[1])
+
+    if not entry:
+        return format_html('<img src="{}" alt="{}"{}>', static(path), alt, flatatt(attrs))
+
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (
+                FORMAT_MIME_TYPES[fmt],
+                ", ".join(f"{static(derivative_name(path, width, fmt))} {width}w" for width in entry["widths"]),
+                sizes,
+            )
+            for fmt in entry["formats"]
+        ),
+    )
+    return format_html(
+        '<picture class="responsive-image">{}<img src="{}" alt="{}"{}></picture>',
+        sources,
+        static(path),
+        alt,
+        flatatt(attrs),
+    )
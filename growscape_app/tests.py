@@ -1,3 +1,1442 @@
-from django.test import TestCase
+import importlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.http import Http404
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import (
+    benchmark, content_cache, excerpts, exports, image_jobs, outbox, pagination, profiling, recaptcha, search, slugs,
+)
+from .images import RESPONSIVE_WIDTHS, available_formats, derivative_name, generate_derivatives_for, has_derivatives
+from .importer import ContentImporter
+from .templatetags import responsive_images
+from .media import IMMUTABLE_MAX_AGE, serve_media
+from .models import (
+    Blog, Category, ContactMessage, DailyStat, GalleryImage, ImageJob, ImportedRecord, OutboundEmail, Project,
+    SearchEntry, Service, ServiceInquiry, parse_features,
+)
+from .seeding import DEFAULT_VOLUMES, seed_content
+from .staticfiles import RESPONSIVE_STATIC_MANIFEST, variant_widths
+from .storage import ContentAddressedStorage
+from .uploads import bulk_upload_gallery_images
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: every accepted message is kept on the server."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply("220 localhost test SMTP")
+        data = None
+        for raw in self.rfile:
+            line = raw.decode().rstrip("\r\n")
+            if data is not None:
+                if line == ".":
+                    server.messages.append("\n".join(data))
+                    data = None
+                    self.reply("250 OK")
+                else:
+                    data.append(line)
+                continue
+            verb = line[:4].upper()
+            if verb == "MAIL":
+                self.reply(server.mail_reply)
+            elif verb == "DATA":
+                data = []
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 localhost")
+
+
+class SMTPDebugServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.mail_reply = "250 OK"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def _unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _smtp_settings(port):
+    return override_settings(
+        EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+        EMAIL_HOST="127.0.0.1",
+        EMAIL_PORT=port,
+        EMAIL_USE_TLS=False,
+        EMAIL_HOST_USER="",
+        EMAIL_HOST_PASSWORD="",
+        EMAIL_TIMEOUT=5,
+    )
+
+
+def _queue(count=1, **fields):
+    return [
+        OutboundEmail.objects.create(
+            subject=f"Inquiry {n}", from_email="site@example.com", to="info@example.com",
+            body_text="Hello", body_html="<p>Hello</p>", **fields,
+        )
+        for n in range(count)
+    ]
+
+
+class OutboxDeliveryTests(TestCase):
+    def setUp(self):
+        self.server = SMTPDebugServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        settings_override = _smtp_settings(self.server.server_address[1])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_batch_is_sent_over_one_connection(self):
+        rows = _queue(3)
+
+        self.assertEqual(outbox.deliver_pending(), (3, 0))
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 3)
+        for row in rows:
+            row.refresh_from_db()
+            self.assertEqual(row.status, OutboundEmail.STATUS_SENT)
+            self.assertEqual(row.attempts, 1)
+            self.assertIsNotNone(row.sent_at)
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+    def test_rejected_message_backs_off_exponentially(self):
+        self.server.mail_reply = "451 Try again later"
+        [row] = _queue()
+
+        before = timezone.now()
+        self.assertEqual(outbox.deliver_pending(), (0, 1))
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertIn("451", row.last_error)
+        self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=outbox.RETRY_BASE_SECONDS))
+
+        # Not due yet, so nothing is retried.
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+        OutboundEmail.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+        before = timezone.now()
+        outbox.deliver_pending()
+        row.refresh_from_db()
+        self.assertEqual(row.attempts, 2)
+        self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=2 * outbox.RETRY_BASE_SECONDS))
+
+        self.server.mail_reply = "250 OK"
+        OutboundEmail.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.deliver_pending(), (1, 0))
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(row.last_error, "")
+
+    def test_gives_up_after_max_attempts(self):
+        self.server.mail_reply = "451 Try again later"
+        [row] = _queue(attempts=outbox.MAX_ATTEMPTS - 1)
+
+        outbox.deliver_pending()
+
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.STATUS_FAILED)
+        self.assertEqual(row.attempts, outbox.MAX_ATTEMPTS)
+
+    def test_unreachable_server_backs_off_whole_batch(self):
+        rows = _queue(2)
+
+        with _smtp_settings(_unused_port()):
+            self.assertEqual(outbox.deliver_pending(), (0, 2))
+
+        for row in rows:
+            row.refresh_from_db()
+            self.assertEqual(row.status, OutboundEmail.STATUS_PENDING)
+            self.assertEqual(row.attempts, 1)
+            self.assertGreater(row.next_attempt_at, timezone.now())
+
+    def test_expired_lease_is_claimed_again(self):
+        [expired] = _queue(status=OutboundEmail.STATUS_SENDING, next_attempt_at=timezone.now() - timedelta(seconds=1))
+        [leased] = _queue(
+            status=OutboundEmail.STATUS_SENDING, next_attempt_at=timezone.now() + timedelta(seconds=outbox.LEASE_SECONDS),
+        )
+
+        self.assertEqual(outbox.deliver_pending(), (1, 0))
+
+        expired.refresh_from_db()
+        leased.refresh_from_db()
+        self.assertEqual(expired.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(leased.status, OutboundEmail.STATUS_SENDING)
+
+    def test_lease_covers_a_batch_of_timeouts(self):
+        # EMAIL_TIMEOUT is 5 here: connecting plus 50 sends, on top of LEASE_SECONDS.
+        self.assertEqual(outbox.lease_duration(50), timedelta(seconds=outbox.LEASE_SECONDS + 51 * 5))
+
+        rows = _queue(2)
+        before = timezone.now()
+        batch = outbox._claim_batch(2)
+
+        self.assertEqual([row.pk for row in batch], [row.pk for row in rows])
+        self.assertGreaterEqual(batch[0].next_attempt_at, before + outbox.lease_duration(2))
+
+    def test_outcome_is_dropped_when_the_lease_was_lost(self):
+        [row] = _queue()
+        [claimed] = outbox._claim_batch(1)
+        # Another worker reclaimed the row after the lease ran out.
+        OutboundEmail.objects.filter(pk=row.pk).update(next_attempt_at=claimed.next_attempt_at + timedelta(minutes=1))
+
+        with self.assertLogs("growscape_app.outbox", "WARNING"):
+            self.assertFalse(outbox._finish(claimed, status=OutboundEmail.STATUS_SENT))
+        with self.assertLogs("growscape_app.outbox", "WARNING"):
+            self.assertFalse(outbox._record_failure(claimed, OSError("reset")))
+
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.STATUS_SENDING)
+        self.assertEqual(row.attempts, 0)
+
+
+class _VerifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        body = json.dumps({"success": True}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not self.server.drip:
+            self.wfile.write(body)
+            return
+        try:
+            for byte in body:
+                self.wfile.write(bytes([byte]))
+                self.wfile.flush()
+                time.sleep(self.server.drip)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up, as it should
+
+    def log_message(self, format, *args):
+        pass
+
+
+class VerifyStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _VerifyHandler)
+        self.connections = 0
+        self.requests = 0
+        self.delay = 0
+        self.drip = 0
+        self.status = 200
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/siteverify" % self.server_address[1]
+
+
+@override_settings(
+    RECAPTCHA_SECRET_KEY="test-secret",
+    RECAPTCHA_TIMEOUT=0.5,
+    RECAPTCHA_BREAKER_THRESHOLD=2,
+    RECAPTCHA_BREAKER_RESET=0.2,
+    RECAPTCHA_DEGRADED_POLICY=recaptcha.POLICY_REJECT,
+)
+class RecaptchaVerifyTests(TestCase):
+    def setUp(self):
+        self.server = VerifyStubServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        settings_override = override_settings(RECAPTCHA_VERIFY_URL=self.server.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        recaptcha.reset()
+        self.addCleanup(recaptcha.reset)
+
+    def test_connection_is_kept_alive(self):
+        for _ in range(3):
+            self.assertTrue(recaptcha.verify_recaptcha("token", "127.0.0.1"))
+
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_slow_provider_is_cut_off_at_the_latency_budget(self):
+        self.server.delay = 1.5
+
+        started = time.monotonic()
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(recaptcha.metrics.snapshot()["failures"], 1)
+
+    def test_trickled_response_is_cut_off_at_the_latency_budget(self):
+        # Each byte arrives well within the timeout; the whole body does not.
+        self.server.drip = 0.1
+
+        started = time.monotonic()
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(recaptcha.metrics.snapshot()["failures"], 1)
+
+    @override_settings(RECAPTCHA_METRICS_LOG_INTERVAL=0.1)
+    def test_metrics_are_logged_at_most_once_per_interval(self):
+        with self.assertLogs("growscape_app.recaptcha", "INFO") as logs:
+            time.sleep(0.15)
+            for _ in range(3):
+                recaptcha.verify_recaptcha("token")
+
+        [line] = [message for message in logs.output if "metrics" in message]
+        self.assertIn('"requests": 1', line)
+
+    def test_breaker_opens_then_closes_after_a_good_probe(self):
+        self.server.status = 500
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+        self.assertTrue(recaptcha.metrics.snapshot()["breaker_open"])
+
+        # Open: decided locally without calling the provider.
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(recaptcha.metrics.snapshot()["short_circuits"], 1)
+
+        time.sleep(0.25)
+        self.server.status = 200
+        self.assertTrue(recaptcha.verify_recaptcha("token"))
+        self.assertEqual(self.server.requests, 3)
+        self.assertFalse(recaptcha.metrics.snapshot()["breaker_open"])
+
+    def test_failed_probe_keeps_breaker_open(self):
+        self.server.status = 500
+        recaptcha.verify_recaptcha("token")
+        recaptcha.verify_recaptcha("token")
+
+        time.sleep(0.25)
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+        self.assertEqual(self.server.requests, 3)
+        self.assertFalse(recaptcha.verify_recaptcha("token"))
+        self.assertEqual(self.server.requests, 3)
+
+    @override_settings(RECAPTCHA_DEGRADED_POLICY=recaptcha.POLICY_ALLOW)
+    def test_degraded_policy_allow_accepts_while_open(self):
+        self.server.status = 500
+        recaptcha.verify_recaptcha("token")
+        recaptcha.verify_recaptcha("token")
+
+        self.assertTrue(recaptcha.verify_recaptcha("token"))
+        self.assertEqual(self.server.requests, 2)
+
+
+def _png(name, size=(64, 48)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "green").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def _temporary_media(testcase):
+    """Point MEDIA_ROOT at a directory that lives as long as ``testcase``."""
+    media_root = tempfile.TemporaryDirectory()
+    testcase.addCleanup(media_root.cleanup)
+    settings_override = override_settings(MEDIA_ROOT=media_root.name)
+    settings_override.enable()
+    testcase.addCleanup(settings_override.disable)
+    return media_root.name
+
+
+def _render(source, **context):
+    return Template(source).render(Context(context))
+
+
+class ResponsiveImageTests(TestCase):
+    def setUp(self):
+        _temporary_media(self)
+        self.name = default_storage.save("projects/villa.png", _png("villa.png", size=(700, 350)))
+
+    def test_derivatives_cover_every_width_without_upscaling(self):
+        generate_derivatives_for(default_storage, self.name)
+
+        for width in RESPONSIVE_WIDTHS:
+            for fmt in available_formats():
+                self.assertTrue(default_storage.exists(derivative_name(self.name, width, fmt)), (width, fmt))
+        with default_storage.open(derivative_name(self.name, 320, "jpeg")) as fh:
+            self.assertEqual(Image.open(fh).size, (320, 160))
+        with default_storage.open(derivative_name(self.name, 1280, "jpeg")) as fh:
+            self.assertEqual(Image.open(fh).size, (700, 350))
+
+    def test_tag_renders_picture_once_derivatives_exist(self):
+        image = GalleryImage(image=self.name).image
+        source = "{% load responsive_images %}{% responsive_image image alt='Villa' %}"
+
+        fallback = _render(source, image=image)
+        self.assertNotIn("<picture", fallback)
+        self.assertIn(f'src="{image.url}"', fallback)
+
+        generate_derivatives_for(default_storage, self.name)
+        html = _render(source, image=image)
+        self.assertIn('<picture class="responsive-image">', html)
+        self.assertIn(derivative_name(image.url, 320, "jpeg") + " 320w", html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('alt="Villa"', html)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.storage = ContentAddressedStorage(location=media_root.name)
+
+    def test_uploads_are_stored_once_by_hash(self):
+        first = self.storage.save("projects/villa.png", _png("villa.png"))
+        second = self.storage.save("gallery/copy.png", _png("copy.png"))
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("content/"))
+
+    def test_dedup_hit_refreshes_mtime(self):
+        name = self.storage.save("projects/villa.png", _png("villa.png"))
+        os.utime(self.storage.path(name), (0, 0))
+
+        self.storage.save("gallery/copy.png", _png("copy.png"))
+
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), 0)
+
+    def test_derivatives_of_legacy_names_are_stored_beside_them(self):
+        legacy = "projects/villa.png"
+        os.makedirs(self.storage.path("projects"))
+        with open(self.storage.path(legacy), "wb") as fh:
+            fh.write(_png("villa.png").read())
+
+        generate_derivatives_for(self.storage, legacy)
+
+        self.assertTrue(self.storage.exists("projects/villa_320w.jpg"))
+        self.assertFalse(self.storage.exists("content"))
+
+    def test_uploads_named_like_derivatives_are_still_content_addressed(self):
+        name = self.storage.save("gallery/photo_800w.jpg", _png("photo_800w.jpg"))
+
+        self.assertTrue(name.startswith("content/"))
+        self.assertFalse(self.storage.exists("gallery/photo_800w.jpg"))
+
+    def test_derivatives_fall_back_to_save_on_other_storages(self):
+        storage = FileSystemStorage(location=self.storage.location)
+        storage.save("projects/villa.png", _png("villa.png"))
+
+        generate_derivatives_for(storage, "projects/villa.png")
+
+        self.assertTrue(storage.exists("projects/villa_320w.jpg"))
+
+
+class BulkUploadTests(TestCase):
+    def setUp(self):
+        _temporary_media(self)
+        self.category = Category.objects.create(name="Gardens")
+
+    def test_upload_queues_derivatives_instead_of_building_them(self):
+        uploads = [
+            _png("a.png"),
+            _png("b.png", size=(80, 60)),
+            SimpleUploadedFile("broken.png", b"not an image", content_type="image/png"),
+            SimpleUploadedFile("notes.txt", b"text"),
+        ]
+
+        results = bulk_upload_gallery_images(self.category, uploads)
+
+        self.assertEqual([result.ok for result in results], [True, True, False, False])
+        images = list(GalleryImage.objects.order_by("id"))
+        self.assertEqual(len(images), 2)
+        self.assertFalse(any(has_derivatives(image.image) for image in images))
+        self.assertEqual(ImageJob.objects.filter(status=ImageJob.STATUS_PENDING).count(), 2)
+
+        self.assertEqual(image_jobs.process_pending(), (2, 0))
+
+        self.assertTrue(all(has_derivatives(image.image) for image in images))
+        self.assertEqual(ImageJob.objects.filter(status=ImageJob.STATUS_DONE).count(), 2)
+        self.assertEqual(image_jobs.process_pending(), (0, 0))
+
+    def test_failed_build_is_retried_later(self):
+        [job] = image_jobs.enqueue_derivatives(GalleryImage, "image", ["gallery/missing.png"])
+
+        self.assertEqual(image_jobs.process_pending(), (0, 1))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.STATUS_PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        self.assertIn("missing.png", job.last_error)
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        media_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media_root.cleanup)
+        with override_settings(MEDIA_ROOT=media_root.name):
+            seed_content(
+                {key: min(value, 30) for key, value in DEFAULT_VOLUMES.items()}, seed=1, image_pool=2, derivatives=False,
+            )
+
+    def test_hot_list_queries_use_their_indexes(self):
+        self.assertEqual(benchmark.check_query_plans(), [])
+
+
+class SeedContentTests(TestCase):
+    def test_rows_keep_historical_dates_without_patching_auto_now_add(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            seed_content(
+                {key: min(value, 10) for key, value in DEFAULT_VOLUMES.items()}, seed=1, image_pool=1,
+                derivatives=False, batch_size=4,
+            )
+
+        recent = timezone.now() - timedelta(minutes=5)
+        for model, field in ((Project, "created_at"), (GalleryImage, "uploaded_at"), (ContactMessage, "created_at")):
+            dates = list(model.objects.values_list(field, flat=True))
+            self.assertEqual(len(dates), 10)
+            self.assertTrue(all(when < recent for when in dates), model.__name__)
+            self.assertTrue(model._meta.get_field(field).auto_now_add)
+
+
+GALLERY_ITEM = 'class="col-lg-4 col-md-6 work-item-box'
+
+
+class GalleryPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gardens = Category.objects.create(name="Gardens")
+        cls.pools = Category.objects.create(name="Pools")
+        GalleryImage.objects.bulk_create(
+            [GalleryImage(category=cls.gardens, title=f"Garden {n}", image=f"gallery/g{n}.jpg") for n in range(30)]
+            + [GalleryImage(category=cls.pools, title=f"Pool {n}", image=f"gallery/p{n}.jpg") for n in range(3)]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_page_links_the_fragment_for_the_next(self):
+        response = self.client.get(reverse("gallery"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().count(GALLERY_ITEM), 24)
+        self.assertContains(response, f'data-fragment-url="{reverse("gallery_fragment")}?page=2"')
+
+    def test_fragment_returns_the_last_page(self):
+        data = self.client.get(reverse("gallery_fragment"), {"page": 2}).json()
+
+        self.assertEqual(data["page"], 2)
+        self.assertEqual(data["html"].count(GALLERY_ITEM), 9)
+        self.assertFalse(data["has_next"])
+        self.assertIsNone(data["next_url"])
+
+    def test_category_filter_limits_items_and_keeps_the_filter(self):
+        response = self.client.get(reverse("gallery"), {"category": self.pools.pk})
+
+        self.assertEqual(response.content.decode().count(f"{GALLERY_ITEM} cat-{self.pools.pk}"), 3)
+        self.assertEqual(response.content.decode().count(GALLERY_ITEM), 3)
+        self.assertNotContains(response, "data-fragment-url=")
+        data = self.client.get(reverse("gallery_fragment"), {"category": self.gardens.pk}).json()
+        self.assertTrue(data["has_next"])
+        self.assertIn(f"category={self.gardens.pk}", data["next_url"])
+
+
+class ContentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_list_is_rebuilt_after_a_save_commits(self):
+        Category.objects.create(name="Gardens")
+
+        def build():
+            return Category.objects.values_list("name", flat=True)
+
+        self.assertEqual(content_cache.cached_list("categories", ["Category"], build), ["Gardens"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Pools")
+            # Until the transaction commits the old generation still serves the old list.
+            self.assertEqual(content_cache.cached_list("categories", ["Category"], build), ["Gardens"])
+
+        self.assertCountEqual(content_cache.cached_list("categories", ["Category"], build), ["Gardens", "Pools"])
+
+    def test_bump_only_invalidates_lists_of_that_model(self):
+        before = content_cache.get_generations(["Category", "Service"])
+        content_cache.bump_generation("Category")
+        after = content_cache.get_generations(["Category", "Service"])
+
+        self.assertEqual(after["Category"], before["Category"] + 1)
+        self.assertEqual(after["Service"], before["Service"])
+
+    @override_settings(CONTENT_CACHE_TIMEOUT=30)
+    def test_local_cache_expires_generations_and_warns_on_deploy(self):
+        self.assertFalse(content_cache.shared_backend())
+        self.assertEqual(content_cache._generation_timeout(), 30)
+        self.assertEqual([w.id for w in content_cache.check_shared_backend(None)], ["growscape_app.W001"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}})
+    def test_shared_cache_keeps_generations(self):
+        self.assertTrue(content_cache.shared_backend())
+        self.assertIsNone(content_cache._generation_timeout())
+        self.assertEqual(content_cache.check_shared_backend(None), [])
+
+
+def _daily_counts(entity):
+    return {
+        (row.date, row.service_key): row.count
+        for row in DailyStat.objects.filter(entity=entity).exclude(count=0)
+    }
+
+
+class DailyStatRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pools = Service.objects.create(name="Pools", slug="pools", features_list="Design")
+        cls.gardens = Service.objects.create(name="Gardens", slug="gardens", features_list="Design")
+
+    def _inquiry(self, service):
+        return ServiceInquiry.objects.create(first_name="A", last_name="B", phone="1", service_type=service)
+
+    def test_saves_and_deletes_keep_counts_per_day_and_service(self):
+        first = self._inquiry(self.pools)
+        self._inquiry(self.pools)
+        today = timezone.localdate()
+
+        self.assertEqual(_daily_counts(DailyStat.ENTITY_INQUIRY), {(today, self.pools.pk): 2})
+
+        first.service_type = self.gardens
+        first.save()
+        self.assertEqual(
+            _daily_counts(DailyStat.ENTITY_INQUIRY), {(today, self.pools.pk): 1, (today, self.gardens.pk): 1},
+        )
+
+        first.delete()
+        self.assertEqual(_daily_counts(DailyStat.ENTITY_INQUIRY), {(today, self.pools.pk): 1})
+
+    def test_saves_that_leave_day_and_service_alone_skip_the_lookup(self):
+        inquiry = self._inquiry(self.pools)
+        inquiry.message = "Call after five"
+
+        with self.assertNumQueries(1):
+            inquiry.save(update_fields=["message"])
+
+        inquiry.service_type = self.gardens
+        inquiry.save(update_fields=["service_type"])
+        self.assertEqual(
+            _daily_counts(DailyStat.ENTITY_INQUIRY), {(timezone.localdate(), self.gardens.pk): 1},
+        )
+
+    def test_backfill_migration_counts_rows_saved_before_the_signals(self):
+        self._inquiry(self.pools)
+        self._inquiry(None)
+        DailyStat.objects.all().delete()
+
+        importlib.import_module("growscape_app.migrations.0013_backfill_dailystat").rebuild_daily_stats(apps, None)
+
+        today = timezone.localdate()
+        self.assertEqual(_daily_counts(DailyStat.ENTITY_INQUIRY), {(today, self.pools.pk): 1, (today, 0): 1})
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalid_page_is_not_found(self):
+        for page in ("abc", "0", "-1", "1.5"):
+            with self.subTest(page=page):
+                response = self.client.get(reverse("sitemap_section", args=["blog"]), {"p": page})
+                self.assertEqual(response.status_code, 404)
+
+    def test_equivalent_pages_share_one_cache_entry(self):
+        first = self.client.get(reverse("sitemap_section", args=["blog"]), {"p": "1"})
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(reverse("sitemap_section", args=["blog"]), {"p": "01"})
+        self.assertEqual(again["ETag"], first["ETag"])
+
+
+def _fts5_available():
+    return connection.vendor == "sqlite" and "growscape_app_searchentry_fts" in connection.introspection.table_names()
+
+
+class SearchIndexTests(TestCase):
+    def _service(self, name, description):
+        return Service.objects.create(name=name, full_description=description, features_list="Design, Build")
+
+    def test_rebuild_streams_every_document_in_batches(self):
+        for n in range(5):
+            self._service(f"Service {n}", "Garden work")
+        SearchEntry.objects.all().delete()
+
+        self.assertEqual(search.rebuild_index(batch_size=2), 5)
+        self.assertEqual(SearchEntry.objects.filter(kind=SearchEntry.KIND_SERVICE).count(), 5)
+
+    def test_backfill_migration_indexes_existing_rows(self):
+        service = self._service("Irrigation", "<p>Drip lines</p>")
+        SearchEntry.objects.all().delete()
+
+        importlib.import_module("growscape_app.migrations.0007_searchentry").backfill_search_entries(apps, None)
+
+        entry = SearchEntry.objects.get()
+        self.assertEqual((entry.kind, entry.object_id), (SearchEntry.KIND_SERVICE, service.pk))
+        self.assertEqual(entry.body, "Drip lines\nDesign, Build")
+        self.assertEqual(entry.url, reverse("service_detail", kwargs={"slug": service.slug}))
+
+    def test_fts5_triggers_follow_inserts_updates_and_deletes(self):
+        if not _fts5_available():
+            self.skipTest("SQLite FTS5 index not installed")
+        service = self._service("Pool construction", "Infinity pools with mosaic tiles")
+
+        [result] = search.search("mosaic")
+        self.assertEqual(result["title"], "Pool construction")
+        self.assertIn("<mark>mosaic</mark>", result["snippet"])
+
+        service.full_description = "Overflow pools with stone coping"
+        service.save()
+        self.assertEqual(search.search("mosaic"), [])
+        self.assertEqual(len(search.search("coping")), 1)
+
+        service.delete()
+        self.assertEqual(search.search("coping"), [])
+
+    def test_postgres_tsvector_ranks_and_highlights(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Postgres only")
+        self._service("Pergolas", "Shade pergolas in teak")
+        self._service("Lighting", "Garden lighting, pergolas lit at night")
+
+        results = search.search("teak pergolas")
+
+        self.assertEqual([r["title"] for r in results], ["Pergolas"])
+        self.assertGreater(results[0]["rank"], 0)
+        self.assertIn("<mark>", results[0]["snippet"])
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ContactMessage.objects.bulk_create(
+            [ContactMessage(first_name=f"Visitor {n}", last_name="X", phone=str(n)) for n in range(25)]
+        )
+        # Ties on created_at are broken by id.
+        ContactMessage.objects.filter(pk__lte=12).update(created_at=timezone.now() - timedelta(days=1))
+        cls.newest_first = list(ContactMessage.objects.order_by("-created_at", "-pk").values_list("pk", flat=True))
+
+    def _page(self, cursor=None):
+        return pagination.cursor_paginate(ContactMessage.objects.all(), cursor, 10)
+
+    def test_walks_forward_and_back_over_every_row_once(self):
+        pages = [self._page()]
+        while pages[-1].has_next():
+            pages.append(self._page(pages[-1].next_cursor))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([row.pk for page in pages for row in page], self.newest_first)
+        self.assertFalse(pages[0].has_previous())
+
+        back = self._page(pages[2].previous_cursor)
+        self.assertEqual([row.pk for row in back], [row.pk for row in pages[1]])
+        self.assertTrue(back.has_next())
+        self.assertEqual([row.pk for row in self._page(back.previous_cursor)], [row.pk for row in pages[0]])
+
+    def test_each_page_is_one_query_without_a_count(self):
+        first = self._page()
+        with self.assertNumQueries(1):
+            self._page(first.next_cursor)
+
+    def test_malformed_cursor_falls_back_to_the_first_page(self):
+        for cursor in ("not-base64!", pagination.encode_cursor(ContactMessage(pk=1, created_at=timezone.now()), "up")):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([row.pk for row in self._page(cursor)], self.newest_first[:10])
+
+
+class QueuedDerivativeTests(TestCase):
+    def setUp(self):
+        _temporary_media(self)
+
+    def test_admin_save_queues_one_job_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            service = Service.objects.create(
+                name="Pools", features_list="Design", cover_image=_png("pool.png", size=(400, 200)),
+            )
+            self.assertFalse(ImageJob.objects.exists())
+        self.assertEqual(len(callbacks), 2)  # the job and the content generation bump
+        self.assertFalse(has_derivatives(service.cover_image))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service.save()
+
+        job = ImageJob.objects.get()
+        self.assertEqual(
+            (job.model_label, job.field_name, job.name), ("growscape_app.Service", "cover_image", service.cover_image.name),
+        )
+
+        self.assertEqual(image_jobs.process_pending(), (1, 0))
+        self.assertTrue(has_derivatives(service.cover_image))
+        with self.captureOnCommitCallbacks(execute=True):
+            service.save()
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+
+class UniqueSlugTests(TestCase):
+    def _service(self, name, **fields):
+        return Service.objects.create(name=name, features_list="Design", **fields)
+
+    def test_suffixes_fill_the_first_gap(self):
+        created = [self._service("Garden Care").slug for _ in range(3)]
+        self.assertEqual(created, ["garden-care", "garden-care-1", "garden-care-2"])
+
+        Service.objects.filter(slug="garden-care-1").delete()
+        self.assertEqual(self._service("Garden Care").slug, "garden-care-1")
+
+    def test_batch_assignment_gives_duplicates_their_own_suffix(self):
+        self._service("Pools")
+        batch = [Service(name="Pools"), Service(name="Pools"), Service(name="Lighting", slug="pools-2")]
+
+        slugs.assign_unique_slugs(batch, "name", "service")
+
+        self.assertEqual([obj.slug for obj in batch], ["pools-1", "pools-3", "pools-2"])
+
+    def test_save_retries_when_a_concurrent_writer_takes_the_slug(self):
+        self._service("Pools")
+        real_allocate = slugs.allocate_slug
+        # The first allocation loses the race: "pools" is already taken by the time it inserts.
+        allocations = iter(["pools"])
+
+        def allocate(*args, **kwargs):
+            return next(allocations, None) or real_allocate(*args, **kwargs)
+
+        with mock.patch.object(slugs, "allocate_slug", side_effect=allocate) as allocate_slug:
+            service = self._service("Pools")
+
+        self.assertEqual(service.slug, "pools-1")
+        self.assertEqual(allocate_slug.call_count, 2)
+
+
+def _streamed(response):
+    return b"".join(
+        chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in response.streaming_content
+    )
+
+
+FORMULA = '=HYPERLINK("http://x")'
+
+
+class LeadExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("staff", password="pw")
+        cls.pools = Service.objects.create(name="Pools", features_list="Design")
+        cls.gardens = Service.objects.create(name="Gardens", features_list="Design")
+        ServiceInquiry.objects.create(
+            first_name=FORMULA, last_name="Doe", phone="+971 50", service_type=cls.pools,
+        )
+        ServiceInquiry.objects.create(first_name="Sara", last_name="Ali", phone="1", service_type=cls.gardens)
+        old = ServiceInquiry.objects.create(first_name="Old", last_name="Lead", phone="2", service_type=cls.pools)
+        ServiceInquiry.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _export(self, **params):
+        return self.client.get(reverse("export_inquiries"), params)
+
+    def test_csv_escapes_formulas_and_filters_by_service(self):
+        response = self._export(format="csv", service=self.pools.pk)
+
+        self.assertEqual(response["Content-Type"], exports.EXPORT_FORMATS["csv"][0])
+        self.assertEqual(response["Cache-Control"], "no-store")
+        lines = _streamed(response).decode("utf-8-sig").splitlines()
+        self.assertTrue(lines[0].startswith("id,created_at,first_name"))
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"\'=HYPERLINK(""http://x"")"', lines[1] + lines[2])
+        self.assertIn("'+971 50", lines[1] + lines[2])
+        self.assertNotIn("Sara", "".join(lines))
+
+    def test_json_respects_the_date_range(self):
+        since = (timezone.localdate() - timedelta(days=1)).isoformat()
+        rows = json.loads(_streamed(self._export(format="json", date_from=since)))
+
+        self.assertEqual(sorted(row["first_name"] for row in rows), [FORMULA, "Sara"])
+        self.assertEqual({row["service"] for row in rows}, {"Pools", "Gardens"})
+
+    def test_xlsx_is_a_workbook_with_literal_text_cells(self):
+        response = self._export(format="xlsx")
+
+        with zipfile.ZipFile(BytesIO(_streamed(response))) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn('<t xml:space="preserve">=HYPERLINK("http://x")</t>', sheet)
+        self.assertNotIn("<f>", sheet)
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self._export(format="pdf").status_code, 400)
+        self.assertEqual(self._export(date_from="yesterday").status_code, 400)
+        response = self.client.get(reverse("export_contacts"), {"service": self.pools.pk})
+        self.assertEqual(response.status_code, 400)
+
+
+class ContentImportTests(TestCase):
+    def setUp(self):
+        _temporary_media(self)
+        source = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        self.images = source.name
+        # Two paths, same bytes.
+        for filename in ("villa.png", "copy-of-villa.png"):
+            with open(os.path.join(self.images, filename), "wb") as fh:
+                fh.write(_png(filename).read())
+        self.manifest = os.path.join(self.images, "manifest.json")
+
+    def _run(self, records):
+        with open(self.manifest, "w") as fh:
+            json.dump({"projects": records}, fh)
+        return ContentImporter(self.images, workers=2, build_derivatives=False).run(self.manifest)
+
+    def test_records_sharing_image_bytes_are_all_imported_once(self):
+        records = [
+            {"title": "Villa", "image": "villa.png"},
+            {"title": "Villa again", "image": "copy-of-villa.png"},
+            {"id": "p-3", "title": "Villa, third", "image": "villa.png"},
+        ]
+
+        report = self._run(records)
+
+        self.assertEqual((report.created["projects"], report.skipped["projects"], report.errors), (3, 0, []))
+        self.assertEqual(len(set(Project.objects.values_list("image", flat=True))), 1)
+        self.assertEqual(
+            set(ImportedRecord.objects.values_list("key", flat=True)),
+            {"image:villa.png", "image:copy-of-villa.png", "id:p-3"},
+        )
+
+        rerun = self._run(records + [{"id": "p-4", "title": "New", "image": "villa.png"}])
+        self.assertEqual((rerun.created["projects"], rerun.skipped["projects"]), (1, 3))
+        self.assertEqual(Project.objects.count(), 4)
+
+    def test_existing_row_with_the_same_image_does_not_block_the_import(self):
+        name = default_storage.save("projects/villa.png", _png("villa.png"))
+        Project.objects.create(title="Added in the admin", image=name)
+
+        report = self._run([{"title": "Imported", "image": "villa.png"}])
+
+        self.assertEqual(report.created["projects"], 1)
+        self.assertEqual(set(Project.objects.values_list("image", flat=True)), {name})
+
+    def test_duplicate_identity_in_one_manifest_is_skipped(self):
+        report = self._run([
+            {"id": "p-1", "title": "Villa", "image": "villa.png"},
+            {"id": "p-1", "title": "Villa (edited)", "image": "copy-of-villa.png"},
+        ])
+
+        self.assertEqual((report.created["projects"], report.skipped["projects"]), (1, 1))
+        self.assertEqual(Project.objects.get().title, "Villa")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_matching_etag_is_answered_without_queries(self):
+        first = self.client.get(reverse("portfolio"))
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        with self.assertNumQueries(0):
+            again = self.client.get(reverse("portfolio"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        since = self.client.get(reverse("portfolio"), HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(since.status_code, 304)
+
+    def test_etag_changes_only_with_the_models_the_page_reads(self):
+        etag = self.client.get(reverse("portfolio"))["ETag"]
+
+        content_cache.bump_generation("GalleryImage")
+        self.assertEqual(self.client.get(reverse("portfolio"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        content_cache.bump_generation("Project")
+        changed = self.client.get(reverse("portfolio"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_etag_is_per_path(self):
+        first = self.client.get(reverse("gallery"))["ETag"]
+        second = self.client.get(reverse("gallery"), {"category": 1})["ETag"]
+        self.assertNotEqual(first, second)
+
+
+@override_settings(QUERY_PROFILER_ENABLED=True, QUERY_PROFILER_N_PLUS_ONE=2)
+class QueryProfilerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        cls.editor = User.objects.create_user("editor", password="pw")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_panel_is_staff_only(self):
+        url = reverse("query_profile")
+        self.assertRedirects(
+            self.client.get(url), f"{reverse('admin_login')}?next={url}", fetch_redirect_response=False,
+        )
+
+        self.client.force_login(self.editor)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_requests_are_profiled_and_staff_can_clear_them(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("view_contacts"))
+
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries"$')
+        [profile] = profiling.worst_offenders()
+        self.assertEqual((profile["view"], profile["requests"]), ("view_contacts", 1))
+        self.assertContains(self.client.get(reverse("query_profile")), "view_contacts")
+
+        self.client.post(reverse("query_profile"))
+        self.assertEqual(profiling.worst_offenders(), [])
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        media_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media_root.cleanup)
+        cls.media = override_settings(MEDIA_ROOT=media_root.name)
+        with cls.media:
+            seed_content(
+                {key: min(value, 5) for key, value in DEFAULT_VOLUMES.items()}, seed=1, image_pool=1, derivatives=False,
+            )
+
+    def test_every_route_is_requested_and_none_fails(self):
+        with self.media:
+            results = benchmark.run(iterations=1, warmup=1)
+
+        labels = {label for label, _, _ in benchmark.discover_requests()}
+        self.assertEqual(set(results), labels)
+        self.assertIn("project_detail", results)
+        self.assertIn("gallery_fragment?page=2", results)
+        self.assertEqual({label: r["status"] for label, r in results.items() if r["status"] >= 500}, {})
+        self.assertEqual(results["admin_dashboard"]["status"], 200)
+
+    def test_compare_flags_status_query_and_latency_regressions(self):
+        baseline = {
+            "home": {"status": 200, "queries": 5, "p95_ms": 10.0},
+            "blog": {"status": 200, "queries": 5, "p95_ms": 1.0},
+            "gone": {"status": 200, "queries": 5, "p95_ms": 10.0},
+        }
+        results = {
+            "home": {"status": 500, "queries": 6, "p95_ms": 14.0},
+            # +100% but under the 2ms floor.
+            "blog": {"status": 200, "queries": 4, "p95_ms": 2.0},
+            "new": {"status": 200, "queries": 50, "p95_ms": 100.0},
+        }
+
+        problems = benchmark.compare(results, baseline)
+
+        self.assertEqual(len(problems), 3)
+        self.assertTrue(all(problem.startswith("home: ") for problem in problems))
+        self.assertIn("home: queries 5 -> 6", problems)
+
+
+class ServiceFeaturesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_features_prefers_commas_then_new_lines(self):
+        self.assertEqual(parse_features("Pruning, Planting,, Design "), ["Pruning", "Planting", "Design"])
+        self.assertEqual(parse_features("Pruning\r\n\nPlanting, trees\n"), ["Pruning\r\n\nPlanting", "trees"])
+        self.assertEqual(parse_features(" Pruning\n\n Planting \n"), ["Pruning", "Planting"])
+        self.assertEqual(parse_features(None), [])
+
+    def test_save_keeps_features_in_step_with_features_list(self):
+        service = Service.objects.create(name="Lawn care", features_list="Mowing\nEdging")
+        self.assertEqual(Service.objects.get(pk=service.pk).features, ["Mowing", "Edging"])
+
+        service.features_list = "Mowing, Feeding"
+        service.save(update_fields=["features_list"])
+        self.assertEqual(Service.objects.get(pk=service.pk).features, ["Mowing", "Feeding"])
+
+    def test_detail_page_lists_the_stored_features(self):
+        service = Service.objects.create(name="Irrigation", features_list="Drip lines, Smart timers")
+
+        response = self.client.get(reverse("service_detail", args=[service.slug]))
+
+        self.assertContains(response, "<li>Drip lines</li>", html=True)
+        self.assertContains(response, "<li>Smart timers</li>", html=True)
+
+    def test_migration_backfills_existing_services(self):
+        service = Service.objects.create(name="Paving", features_list="Patios\nPaths")
+        Service.objects.filter(pk=service.pk).update(features=[])
+
+        importlib.import_module("growscape_app.migrations.0009_service_features").backfill_features(apps, None)
+
+        self.assertEqual(Service.objects.get(pk=service.pk).features, ["Patios", "Paths"])
+
+
+class TextMetadataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sanitizer_keeps_allowed_markup_and_drops_the_rest(self):
+        html = (
+            '<p onclick="x()">Hi <b>there</b><script>alert(1)</script></p>'
+            '<a href="javascript:alert(1)" target="_blank">bad</a><a href="/ok" title="t">ok</a>'
+            '<marquee>kept text</marquee><img src="data:x" alt="a &quot;b&quot;"><ul><li>open'
+        )
+
+        self.assertEqual(
+            excerpts.sanitize_html(html),
+            '<p>Hi <b>there</b></p><a target="_blank" rel="noopener noreferrer">bad</a><a href="/ok" title="t">ok</a>'
+            'kept text<img alt="a &quot;b&quot;"><ul><li>open</li></ul>',
+        )
+
+    def test_text_metadata_counts_words_and_cuts_summaries(self):
+        data = excerpts.text_metadata("<p>" + " ".join(f"w{n}" for n in range(250)) + " &amp; more</p>")
+
+        self.assertEqual(data["word_count"], 252)
+        self.assertEqual(data["reading_minutes"], 2)
+        self.assertEqual(data["summary"], " ".join(f"w{n}" for n in range(20)) + " …")
+        self.assertEqual(data["summary_short"], " ".join(f"w{n}" for n in range(12)) + " …")
+        self.assertEqual(excerpts.text_metadata("<script>x</script>")["reading_minutes"], 0)
+
+    def test_save_stores_metadata_and_listings_skip_the_bodies(self):
+        blog = Blog.objects.create(title="Soil", description="<p>Good <em>soil</em> matters.</p>", image="blogs/s.jpg")
+
+        stored = Blog.objects.for_listing().get(pk=blog.pk)
+        self.assertEqual(stored.summary, "Good soil matters.")
+        self.assertEqual(stored.get_deferred_fields(), {"description", "body_html"})
+
+        blog.description = "<p>Mulch first.</p>"
+        blog.save(update_fields=["description"])
+        self.assertEqual(Blog.objects.get(pk=blog.pk).body_html, "<p>Mulch first.</p>")
+
+    def test_home_page_project_excerpt_keeps_fifteen_words(self):
+        Project.objects.create(
+            title="Villa", image="projects/v.jpg", description=" ".join(f"word{n}" for n in range(30)),
+        )
+
+        response = self.client.get(reverse("home"))
+
+        self.assertContains(response, "word14 …")
+        self.assertNotContains(response, "word15")
+
+    def test_migration_backfill_uses_its_frozen_sanitizer(self):
+        project = Project.objects.create(title="Pond", image="projects/p.jpg", description="<p>Koi <i>pond</i></p>")
+        Project.objects.filter(pk=project.pk).update(body_html="", summary="", word_count=0)
+
+        importlib.import_module("growscape_app.migrations.0010_text_metadata").backfill_text_metadata(apps, None)
+
+        project.refresh_from_db()
+        self.assertEqual(project.body_html, "<p>Koi <i>pond</i></p>")
+        self.assertEqual((project.summary, project.word_count), ("Koi pond", 2))
+
+
+class GroupedPagesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gardens = Category.objects.create(name="Gardens")
+        cls.pools = Category.objects.create(name="Pools")
+        cls.empty = Category.objects.create(name="Empty")
+        GalleryImage.objects.bulk_create(
+            [GalleryImage(category=cls.gardens, title=f"Garden {n}", image=f"gallery/g{n}.jpg") for n in range(20)]
+            + [GalleryImage(category=cls.pools, title=f"Pool {n}", image=f"gallery/p{n}.jpg") for n in range(5)]
+        )
+
+    def _pages(self, requested):
+        return pagination.grouped_pages(
+            GalleryImage.objects.all(), "category_id",
+            counts={self.gardens.pk: 20, self.pools.pk: 5, self.empty.pk: 0},
+            requested=requested, per_page=8, order_by=[F("id").asc()],
+        )
+
+    def test_every_group_gets_its_page_from_one_query(self):
+        with self.assertNumQueries(1):
+            pages = self._pages({self.gardens.pk: "2"})
+
+        gardens = GalleryImage.objects.filter(category=self.gardens).order_by("id")
+        self.assertEqual(list(pages[self.gardens.pk]), list(gardens[8:16]))
+        self.assertEqual((pages[self.gardens.pk].number, pages[self.gardens.pk].paginator.num_pages), (2, 3))
+        self.assertTrue(pages[self.gardens.pk].has_next())
+        pools = GalleryImage.objects.filter(category=self.pools).order_by("id")
+        self.assertEqual(list(pages[self.pools.pk]), list(pools))
+        self.assertEqual(list(pages[self.empty.pk]), [])
+        self.assertEqual(pages[self.empty.pk].number, 1)
+
+    def test_invalid_and_out_of_range_numbers_fall_back_like_paginator(self):
+        pages = self._pages({self.gardens.pk: "99", self.pools.pk: "abc"})
+
+        self.assertEqual(pages[self.gardens.pk].number, 3)
+        self.assertEqual(len(pages[self.gardens.pk]), 4)
+        self.assertEqual(pages[self.pools.pk].number, 1)
+        self.assertEqual(len(pages[self.pools.pk]), 5)
+
+    def test_empty_counts_skip_the_query(self):
+        with self.assertNumQueries(0):
+            pages = pagination.grouped_pages(
+                GalleryImage.objects.all(), "category_id", {self.empty.pk: 0}, {}, per_page=8, order_by=["id"],
+            )
+        self.assertEqual(list(pages[self.empty.pk]), [])
+
+    def test_admin_gallery_pages_each_category_separately(self):
+        self.client.force_login(User.objects.create_user("staff", password="pw"))
+
+        response = self.client.get(reverse("list_image"), {f"page_{self.gardens.pk}": 3})
+
+        self.assertEqual(response.status_code, 200)
+        sizes = {category.pk: len(category.image_page) for category in response.context["categories"]}
+        self.assertEqual(sizes, {self.gardens.pk: 4, self.pools.pk: 5, self.empty.pk: 0})
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.root = _temporary_media(self)
+        self.factory = RequestFactory()
+        self.hashed = "content/ab/cd/abcd1234.txt"
+        for name, data in ((self.hashed, b"0123456789"), ("projects/notes.txt", b"legacy")):
+            os.makedirs(os.path.join(self.root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.root, name), "wb") as fh:
+                fh.write(data)
+
+    def _get(self, path, **headers):
+        return serve_media(self.factory.get(f"/media/{path}", headers=headers), path)
+
+    @override_settings(MEDIA_SERVE_MODE="accel", MEDIA_ACCEL_PREFIX="/protected-media/")
+    def test_accel_hands_the_file_to_nginx(self):
+        response = self._get(self.hashed)
+
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.hashed}")
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response["ETag"], '"abcd1234"')
+        self.assertIn(f"max-age={IMMUTABLE_MAX_AGE}", response["Cache-Control"])
+        self.assertIn("immutable", response["Cache-Control"])
+
+    @override_settings(MEDIA_SERVE_MODE="sendfile", MEDIA_CACHE_MAX_AGE=60)
+    def test_sendfile_passes_the_absolute_path(self):
+        response = self._get("projects/notes.txt")
+
+        self.assertEqual(response["X-Sendfile"], os.path.join(self.root, "projects", "notes.txt"))
+        self.assertIn("max-age=60", response["Cache-Control"])
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+    @override_settings(MEDIA_SERVE_MODE="python")
+    def test_python_streams_whole_files_and_single_ranges(self):
+        self.assertEqual(_streamed(self._get(self.hashed)), b"0123456789")
+
+        partial = self._get(self.hashed, Range="bytes=2-4")
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(_streamed(partial), b"234")
+
+        self.assertEqual(_streamed(self._get(self.hashed, Range="bytes=-3")), b"789")
+        self.assertEqual(self._get(self.hashed, Range="bytes=20-").status_code, 416)
+        self.assertEqual(self._get(self.hashed, Range="bytes=2-4", **{"If-Range": '"stale"'}).status_code, 200)
+
+    @override_settings(MEDIA_SERVE_MODE="accel")
+    def test_revalidation_and_missing_files(self):
+        etag = self._get(self.hashed)["ETag"]
+
+        response = self._get(self.hashed, **{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+        for path in ("projects/missing.txt", "../secrets.txt", "projects"):
+            with self.assertRaises(Http404):
+                self._get(path)
+
+
+class ResponsiveStaticTests(TestCase):
+    def setUp(self):
+        source_root, static_root = tempfile.TemporaryDirectory(), tempfile.TemporaryDirectory()
+        self.addCleanup(source_root.cleanup)
+        self.addCleanup(static_root.cleanup)
+        os.makedirs(os.path.join(source_root.name, "images"))
+        for name, size in (("images/hero.png", (1000, 500)), ("images/icon.png", (40, 40)), ("fonts/x.png", (600, 60))):
+            os.makedirs(os.path.join(source_root.name, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(source_root.name, name), "wb") as fh:
+                fh.write(_png(name, size=size).read())
+        with open(os.path.join(source_root.name, "images", "broken.jpg"), "wb") as fh:
+            fh.write(b"not an image")
+        self.static_root = static_root.name
+        settings_override = override_settings(
+            DEBUG=False,
+            STATICFILES_DIRS=[source_root.name],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATIC_ROOT=static_root.name,
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {"BACKEND": "growscape_app.staticfiles.ResponsiveStaticFilesStorage"},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for cached in (responsive_images._responsive_static_manifest, responsive_images._static_image_size):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def _collect(self):
+        with self.assertLogs("growscape_app.staticfiles", "WARNING") as logs:
+            call_command("collectstatic", interactive=False, verbosity=0)
+        return logs.output
+
+    def _manifest(self):
+        with open(os.path.join(self.static_root, RESPONSIVE_STATIC_MANIFEST)) as fh:
+            return json.load(fh)
+
+    def test_variant_widths_never_upscale(self):
+        self.assertEqual(variant_widths(1000), [480, 960, 1000])
+        self.assertEqual(variant_widths(40), [40])
+
+    def test_collectstatic_builds_hashed_variants_for_images_only(self):
+        warnings = self._collect()
+
+        manifest = self._manifest()
+        self.assertEqual(set(manifest), {"images/hero.png", "images/icon.png"})
+        self.assertIn("images/broken.jpg", warnings[0])
+        hero = manifest["images/hero.png"]
+        self.assertEqual((hero["width"], hero["height"], hero["widths"]), (1000, 500, [480, 960, 1000]))
+        self.assertEqual(len(hero["files"]), 3 * len(hero["formats"]))
+        for name, hashed in hero["files"].items():
+            self.assertTrue(os.path.exists(os.path.join(self.static_root, hashed)), hashed)
+            self.assertEqual(staticfiles_storage.stored_name(name), hashed)
+        with Image.open(os.path.join(self.static_root, hero["files"]["images/hero_480w.webp"])) as image:
+            self.assertEqual(image.size, (480, 240))
+
+    def test_unchanged_sources_are_not_encoded_again(self):
+        self._collect()
+
+        with mock.patch("growscape_app.staticfiles._render_variants", side_effect=ValueError("bad")) as render:
+            self._collect()
+
+        self.assertEqual([call.args[1] for call in render.call_args_list], ["images/broken.jpg"])
+        self.assertEqual(set(self._manifest()), {"images/hero.png", "images/icon.png"})
+
+    def test_tag_renders_variants_from_the_manifest(self):
+        self._collect()
+
+        html = _render("{% load responsive_images %}{% responsive_static 'images/hero.png' alt='Hero' %}")
+
+        self.assertIn('<picture class="responsive-image">', html)
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(staticfiles_storage.url("images/hero_960w.webp") + " 960w", html)
+        self.assertIn(f'src="{staticfiles_storage.url("images/hero.png")}"', html)
+        self.assertIn('height="500"', html)
+        self.assertIn('width="1000"', html)
+        self.assertIn('loading="lazy"', html)
+
+    def test_tag_falls_back_to_a_sized_img_without_variants(self):
+        with override_settings(STORAGES=settings.STORAGES | {
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }):
+            html = _render("{% load responsive_images %}{% responsive_static 'fonts/x.png' loading='eager' %}")
+
+        self.assertNotIn("<picture", html)
+        self.assertIn('height="60"', html)
+        self.assertIn('width="600"', html)
+        self.assertIn('loading="eager"', html)
+
+
+@override_settings(PAGE_CACHE_ENABLED=True, PAGE_CACHE_LOCK_WAIT=0)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_second_request_is_a_hit_and_carries_surrogate_keys(self):
+        first = self.client.get(reverse("portfolio"))
+        self.assertEqual(first["X-Page-Cache"], "MISS")
+        self.assertIn("Project", first["Surrogate-Key"].split())
+
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("portfolio"))
+        self.assertEqual(second["X-Page-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(
+            self.client.get(reverse("portfolio"), HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304,
+        )
+
+    def test_generation_bump_purges_only_pages_tagged_with_the_model(self):
+        self.client.get(reverse("portfolio"))
+
+        content_cache.bump_generation("GalleryImage")
+        self.assertEqual(self.client.get(reverse("portfolio"))["X-Page-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(title="Terrace", image="projects/t.jpg")
+        response = self.client.get(reverse("portfolio"))
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+        self.assertContains(response, "Terrace")
+
+    def test_visitors_with_a_session_bypass_the_cache(self):
+        self.client.get(reverse("portfolio"))
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+
+        self.assertNotIn("X-Page-Cache", self.client.get(reverse("portfolio")))
+
+    def test_database_error_serves_the_last_good_copy(self):
+        self.client.get(reverse("portfolio"))
+        content_cache.bump_generation("Project")
+
+        with mock.patch.object(Project.objects, "for_listing", side_effect=OperationalError("down")):
+            response = self.client.get(reverse("portfolio"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["X-Page-Cache"], "STALE")
+            self.assertIn("no-cache", response["Cache-Control"])
+
+            cache.clear()
+            with self.assertRaises(OperationalError):
+                self.client.get(reverse("portfolio"))
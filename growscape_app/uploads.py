@@ -0,0 +1,92 @@
+"""
+Bulk gallery uploads.
+
+Files are streamed to storage one by one and verified (a header check, not
+a full decode), and every accepted file becomes a GalleryImage row through a
+single bulk_create. Derivatives are built afterwards by the image job queue
+(see image_jobs.py), so the request never waits on resizing. Each file gets
+its own UploadResult so the admin page can report exactly what was rejected.
+"""
+import os
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from PIL import Image
+
+from .content_cache import bump_generation
+from .image_jobs import enqueue_derivatives
+from .models import GalleryImage
+
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+
+@dataclass
+class UploadResult:
+    filename: str
+    ok: bool
+    error: str = ""
+    stored_name: str = ""
+
+
+def _check_upload(upload):
+    extension = os.path.splitext(upload.name)[1].lower()
+    if extension not in ALLOWED_EXTENSIONS:
+        return f"Unsupported file type {extension or '(none)'}"
+    max_size = getattr(settings, "GALLERY_MAX_UPLOAD_SIZE", None)
+    if max_size and upload.size > max_size:
+        return f"File is larger than {max_size // (1024 * 1024)}MB"
+    return ""
+
+
+def _verify_stored(storage, name):
+    try:
+        with storage.open(name, "rb") as fh:
+            with Image.open(fh) as image:
+                image.verify()
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as exc:
+        return f"Not a valid image ({exc})"
+    return ""
+
+
+def bulk_upload_gallery_images(category, uploads):
+    """
+    Store, validate and insert ``uploads`` into ``category``.
+    Returns one UploadResult per upload, in the order given.
+    """
+    field = GalleryImage._meta.get_field("image")
+    storage = field.storage
+    results = []
+
+    # 1. Cheap checks, then stream accepted files to storage.
+    for upload in uploads:
+        error = _check_upload(upload)
+        if error:
+            results.append(UploadResult(upload.name, False, error))
+            continue
+        name = field.generate_filename(None, upload.name)
+        stored_name = storage.save(name, upload, max_length=field.max_length)
+        results.append(UploadResult(upload.name, True, stored_name=stored_name))
+
+    # 2. Reject anything that does not parse as an image.
+    for result in results:
+        if result.ok:
+            error = _verify_stored(storage, result.stored_name)
+            if error:
+                # Stored by content hash, so other rows may share the bytes;
+                # media_gc reclaims the file if nothing does.
+                result.ok, result.error = False, error
+
+    # 3. One INSERT batch for everything that survived, with its derivative jobs.
+    accepted = [result for result in results if result.ok]
+    if accepted:
+        with transaction.atomic():
+            GalleryImage.objects.bulk_create(
+                [GalleryImage(category=category, title=r.filename[:150], image=r.stored_name) for r in accepted],
+                batch_size=500,
+            )
+            enqueue_derivatives(GalleryImage, "image", [r.stored_name for r in accepted])
+            # bulk_create skips post_save, so invalidate the content cache here.
+            transaction.on_commit(lambda: bump_generation("GalleryImage"))
+
+    return results
@@ -12,6 +12,7 @@ urlpatterns = [
 
     # ==============================Dashboard=========================
     path("dashboard/", views.admin_dashboard, name="admin_dashboard"),
+    path("dashboard/queries/", views.query_profile, name="query_profile"),
 
     # ==============================Services=========================
     path("dashboard/services/", views.service_list, name="service_list"),
@@ -34,6 +35,7 @@ urlpatterns = [
     # ==============================Contacts (Admin)=========================
     path("dashboard/contacts/", views.view_contacts, name="view_contacts"),
     path("dashboard/contacts/delete/<int:pk>/", views.delete_contact, name="delete_contact"),
+    path("dashboard/contacts/export/", views.export_contacts, name="export_contacts"),
 
     # ==============================Blogs (Admin) =========================
     # RENAMED VIEW FUNCTION TO 'admin_blog_list' TO AVOID CONFLICT
@@ -60,6 +62,7 @@ urlpatterns = [
     # ==============================Inquiries=========================
     path("dashboard/inquiries/", views.inquiry_list, name="inquiry_list"),
     path("dashboard/inquiries/delete/<int:pk>/", views.inquiry_delete, name="inquiry_delete"),
+    path("dashboard/inquiries/export/", views.export_inquiries, name="export_inquiries"),
 
     # ==============================Frontend URLs=========================
     path('', views.home, name='home'),
@@ -74,6 +77,9 @@ urlpatterns = [
     path('team/', views.team_page, name='public_team'), 
     path('contact/', views.contact, name='contact'),
     path("gallery/", views.gallery, name="gallery"),
+    path("gallery/page/", views.gallery_fragment, name="gallery_fragment"),
+    path("search/", views.search_page, name="search"),
+    path("search/json/", views.search_json, name="search_json"),
 
     path('index.html/', views.index_redirect), 
 ]
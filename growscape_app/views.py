@@ -2,25 +2,35 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.core.paginator import Paginator
 from django.db.models.functions import Lower
 from django.utils import timezone
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
+from django.db.models import Count, F, Q, Sum
 from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from collections import defaultdict
 from datetime import timedelta
-import json
-from urllib import parse, request as urllib_request
-
+from urllib import parse
+
+from . import profiling
+from .conditional import content_condition
+from .content_cache import cached_list
+from .exports import EXPORT_FORMATS, ExportError, stream_export
+from .outbox import enqueue_email
+from .pagination import cursor_paginate, grouped_pages
+from .recaptcha import verify_recaptcha
+from .search import search
+from .uploads import bulk_upload_gallery_images
 # Import your models
-from .models import Service, Project, TeamMember, Blog, Testimonial, Category, GalleryImage, ContactMessage, ServiceInquiry
+from .models import Service, Project, TeamMember, Blog, Testimonial, Category, GalleryImage, ContactMessage, ServiceInquiry, DailyStat
 # Import your forms
 from .forms import ServiceForm, ProjectForm, TeamMemberForm, BlogForm, TestimonialForm, CategoryForm, GalleryImageForm, ContactForm, ServiceInquiryForm
 
-
-import ssl
-ssl._create_default_https_context = ssl._create_unverified_context
-from django.core.mail import EmailMultiAlternatives
 # ==========================================
 # 1. ADMIN AUTHENTICATION
 # ==========================================
@@ -60,40 +70,50 @@ def admin_logout(request):
 # 2. DASHBOARD HOME
 # ==========================================
 
+DASHBOARD_RANGES = {"30d": 30, "90d": 90, "6m": 182, "12m": 365}
+DEFAULT_DASHBOARD_RANGE = "6m"
+
+
 @login_required(login_url="admin_login")
 def admin_dashboard(request):
-    now = timezone.now()
-    this_month_start = now.replace(day=1, hour=0, minute=0, second=0)
-    six_months_ago = now - timedelta(days=180)
-
-    # Basic Counts
-    total_projects = Project.objects.count()
-    total_services = Service.objects.count()
-    total_contacts = ContactMessage.objects.count()
-    total_inquiries = ServiceInquiry.objects.count()
-    projects_this_month = Project.objects.filter(created_at__gte=this_month_start).count()
-
-    # Chart 1: Monthly Projects
-    monthly_data = (
-        Project.objects
-        .filter(created_at__gte=six_months_ago)
-        .annotate(month=TruncMonth('created_at'))
-        .values('month')
-        .annotate(count=Count('id'))
-        .order_by('month')
-    )
-    month_labels = [e['month'].strftime('%b %Y') for e in monthly_data]
-    month_counts = [e['count'] for e in monthly_data]
-
-    # Chart 2: Projects by Service
-    by_service = (
-        Project.objects
-        .values('service_category__name')
-        .annotate(count=Count('id'))
-        .order_by('-count')[:6]
-    )
-    service_labels = [e['service_category__name'] or 'Uncategorized' for e in by_service]
-    service_counts = [e['count'] for e in by_service]
+    range_key = request.GET.get("range", DEFAULT_DASHBOARD_RANGE)
+    if range_key not in DASHBOARD_RANGES:
+        range_key = DEFAULT_DASHBOARD_RANGE
+
+    today = timezone.localdate()
+    this_month_start = today.replace(day=1)
+    range_start = today - timedelta(days=DASHBOARD_RANGES[range_key] - 1)
+
+    # Basic Counts: one grouped query over the daily rollup table
+    totals = {
+        row["entity"]: row
+        for row in DailyStat.objects.values("entity").annotate(
+            total=Sum("count"),
+            this_month=Sum("count", filter=Q(date__gte=this_month_start)),
+        ).order_by()
+    }
+    service_names = dict(Service.objects.values_list("id", "name"))
+
+    def total(entity, column="total"):
+        return (totals.get(entity) or {}).get(column) or 0
+
+    # Charts: project rollup rows for the selected range, bucketed in Python
+    monthly = DASHBOARD_RANGES[range_key] > 90
+    per_bucket = defaultdict(int)
+    per_service = defaultdict(int)
+    for day, service_key, count in DailyStat.objects.filter(
+        entity=DailyStat.ENTITY_PROJECT, date__gte=range_start
+    ).values_list("date", "service_key", "count"):
+        per_bucket[day.replace(day=1) if monthly else day] += count
+        per_service[service_names.get(service_key, "Uncategorized")] += count
+
+    buckets = sorted(b for b, c in per_bucket.items() if c)
+    month_labels = [b.strftime('%b %Y' if monthly else '%d %b') for b in buckets]
+    month_counts = [per_bucket[b] for b in buckets]
+
+    by_service = sorted(((n, c) for n, c in per_service.items() if c), key=lambda e: -e[1])[:6]
+    service_labels = [name for name, _ in by_service]
+    service_counts = [count for _, count in by_service]
 
     # Recent Data Tables
     recent_projects = Project.objects.order_by('-created_at')[:6]
@@ -102,12 +122,14 @@ def admin_dashboard(request):
 
     context = {
         'stats': {
-            'total_projects': total_projects,
-            'total_services': total_services,
-            'total_contacts': total_contacts,
-            'total_inquiries': total_inquiries,
-            'projects_this_month': projects_this_month,
+            'total_projects': total(DailyStat.ENTITY_PROJECT),
+            'total_services': len(service_names),
+            'total_contacts': total(DailyStat.ENTITY_CONTACT),
+            'total_inquiries': total(DailyStat.ENTITY_INQUIRY),
+            'projects_this_month': total(DailyStat.ENTITY_PROJECT, "this_month"),
         },
+        'range_key': range_key,
+        'range_choices': [("30d", "30 Days"), ("90d", "90 Days"), ("6m", "6 Months"), ("12m", "12 Months")],
         'month_labels': month_labels,
         'month_counts': month_counts,
         'service_labels': service_labels,
@@ -119,6 +141,22 @@ def admin_dashboard(request):
     return render(request, "admin_pages/dashboard.html", context)
 
 
+@login_required(login_url="admin_login")
+def query_profile(request):
+    if not request.user.is_staff:
+        raise PermissionDenied
+    if request.method == "POST":
+        profiling.reset()
+        messages.success(request, "Query profiles cleared.")
+        return redirect("query_profile")
+    return render(request, "admin_pages/query_profile.html", {
+        "enabled": getattr(settings, "QUERY_PROFILER_ENABLED", False),
+        "profiles": profiling.worst_offenders(),
+        "slow_ms": getattr(settings, "QUERY_PROFILER_SLOW_MS", 100),
+        "n_plus_one": getattr(settings, "QUERY_PROFILER_N_PLUS_ONE", 5),
+    })
+
+
 # ==========================================
 # 3. SERVICE MANAGEMENT (ADMIN)
 # ==========================================
@@ -183,10 +221,8 @@ def service_delete(request, pk):
 
 @login_required(login_url="admin_login")
 def project_list(request):
-    projects_qs = Project.objects.all().order_by("-created_at")
-    paginator = Paginator(projects_qs, 9)
-    page_number = request.GET.get("page")
-    projects = paginator.get_page(page_number)
+    projects_qs = Project.objects.select_related("service_category")
+    projects = cursor_paginate(projects_qs, request.GET.get("cursor"), 9, with_total=True)
     return render(request, "admin_pages/project_list.html", {
         "projects": projects,
         "all_services": Service.objects.all()
@@ -288,10 +324,7 @@ def team_delete(request, pk):
 
 @login_required(login_url="admin_login")
 def admin_blog_list(request):  # RENAMED from blog_list to fix URL error
-    blogs_qs = Blog.objects.all().order_by("-created_at")
-    paginator = Paginator(blogs_qs, 6)
-    page_number = request.GET.get("page")
-    blogs = paginator.get_page(page_number)
+    blogs = cursor_paginate(Blog.objects.all(), request.GET.get("cursor"), 6, with_total=True)
 
     return render(request, "admin_pages/blog_list.html", {"blogs": blogs})
 
@@ -335,41 +368,46 @@ def blog_delete(request, pk):
 
 @login_required(login_url="admin_login")
 def gallery_images(request):
-    categories = Category.objects.all().prefetch_related("images")
-    category_pages = {}
-    for category in categories:
-        images_qs = category.images.all().order_by("-uploaded_at")
-        paginator = Paginator(images_qs, 8)
-        page_number = request.GET.get(f"page_{category.id}", 1)
-        try:
-            page_obj = paginator.page(page_number)
-        except PageNotAnInteger:
-            page_obj = paginator.page(1)
-        except EmptyPage:
-            page_obj = paginator.page(paginator.num_pages)
-        category_pages[category.id] = page_obj
-
-    return render(
-        request, "admin_pages/image_list.html",
-        {"categories": categories, "category_pages": category_pages},
+    # Counts from one grouped query, every category's current page from one window query
+    categories = list(Category.objects.annotate(image_count=Count("images")))
+    pages = grouped_pages(
+        GalleryImage.objects.only("id", "category_id", "title", "image", "uploaded_at"),
+        "category_id",
+        counts={category.id: category.image_count for category in categories},
+        requested={category.id: request.GET.get(f"page_{category.id}", 1) for category in categories},
+        per_page=8,
+        order_by=[F("uploaded_at").desc(), F("id").desc()],
     )
+    for category in categories:
+        category.image_page = pages[category.id]
+
+    return render(request, "admin_pages/image_list.html", {"categories": categories})
 
 @login_required(login_url="admin_login")
 def add_image(request):
     categories = Category.objects.all()
     if request.method == "POST":
-        category_id = request.POST.get("category")
-        category = Category.objects.get(id=category_id)
+        category_id = request.POST.get("category", "")
+        category = Category.objects.filter(pk=category_id).first() if category_id.isdigit() else None
         files = request.FILES.getlist("images")
-        for file in files:
-            GalleryImage.objects.create(
-                category=category,
-                title=file.name,
-                image=file,
-            )
-        messages.success(request, "Images uploaded successfully!")
-        return redirect("list_image")
-        
+        if category is None or not files:
+            messages.error(request, "Please select a category and at least one image.")
+            return render(request, "admin_pages/add_image.html", {"categories": categories})
+
+        results = bulk_upload_gallery_images(category, files)
+        uploaded = sum(1 for result in results if result.ok)
+        failed = len(results) - uploaded
+        if not failed:
+            messages.success(request, f"{uploaded} image(s) uploaded successfully!")
+            return redirect("list_image")
+
+        messages.error(request, f"{uploaded} image(s) uploaded, {failed} rejected. See details below.")
+        return render(request, "admin_pages/add_image.html", {
+            "categories": categories,
+            "selected_category": category.pk,
+            "upload_results": results,
+        })
+
     return render(request, "admin_pages/add_image.html", {"categories": categories})
 
 @login_required(login_url="admin_login")
@@ -479,10 +517,7 @@ def testimonial_delete(request, pk):
 
 @login_required(login_url="admin_login")
 def view_contacts(request):
-    contacts = ContactMessage.objects.all().order_by("-created_at")
-    paginator = Paginator(contacts, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = cursor_paginate(ContactMessage.objects.all(), request.GET.get("cursor"), 10, with_total=True)
     return render(request, "admin_pages/view_contacts.html", {"contacts": page_obj})
 
 @login_required(login_url="admin_login")
@@ -494,11 +529,10 @@ def delete_contact(request, pk):
 
 @login_required(login_url="admin_login")
 def inquiry_list(request):
-    inquiries_qs = ServiceInquiry.objects.all().order_by("-created_at")
-    paginator = Paginator(inquiries_qs, 10)
-    page_number = request.GET.get("page")
-    inquiries = paginator.get_page(page_number)
-    return render(request, "admin_pages/inquiry_list.html", {"inquiries": inquiries})
+    inquiries_qs = ServiceInquiry.objects.select_related("service_type")
+    inquiries = cursor_paginate(inquiries_qs, request.GET.get("cursor"), 10, with_total=True)
+    services = Service.objects.only("id", "name").order_by("name")
+    return render(request, "admin_pages/inquiry_list.html", {"inquiries": inquiries, "services": services})
 
 @login_required(login_url="admin_login")
 def inquiry_delete(request, pk):
@@ -509,111 +543,144 @@ def inquiry_delete(request, pk):
     return redirect("inquiry_list")
 
 
+def _export_response(request, kind):
+    fmt = request.GET.get("format", "csv")
+    filters = {}
+    for name in ("date_from", "date_to"):
+        raw = request.GET.get(name)
+        if raw:
+            try:
+                filters[name] = parse_date(raw)
+            except ValueError:
+                filters[name] = None
+            if filters[name] is None:
+                return HttpResponseBadRequest(f"Invalid {name}; use YYYY-MM-DD.")
+    service = request.GET.get("service")
+    if service:
+        if not service.isdigit():
+            return HttpResponseBadRequest("Invalid service.")
+        filters["service_id"] = int(service)
+
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Unknown export format.")
+    try:
+        chunks = stream_export(kind, fmt, **filters)
+    except ExportError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    content_type, extension = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    filename = f"{kind}-{timezone.localdate():%Y%m%d}.{extension}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+@login_required(login_url="admin_login")
+def export_contacts(request):
+    return _export_response(request, "contacts")
+
+@login_required(login_url="admin_login")
+def export_inquiries(request):
+    return _export_response(request, "inquiries")
+
+
 # ==========================================
 # 10. FRONTEND VIEWS (PUBLIC WEBSITE)
 # ==========================================
 
+def _public_services():
+    return cached_list("services", ["Service"], Service.objects.for_listing)
+
+
+def _public_testimonials():
+    return cached_list("testimonials", ["Testimonial"], Testimonial.objects.all)
+
+
+def _public_team_members():
+    return cached_list("team_members", ["TeamMember"], TeamMember.objects.all)
+
+
+@content_condition("Project", "Testimonial")
 def home(request):
+    services = _public_services()
     context = {
-        'services': Service.objects.all(),
-        'projects': Project.objects.all()[:6],
-        'testimonials': Testimonial.objects.all()[:5],
-        'blogs': Blog.objects.all()[:3],
-        'categories': Service.objects.all()
+        'services': services,
+        'projects': cached_list(
+            "home_projects", ["Project", "Service"],
+            lambda: Project.objects.for_listing().select_related('service_category')[:6],
+        ),
+        'testimonials': _public_testimonials()[:5],
+        'blogs': cached_list("home_blogs", ["Blog"], lambda: Blog.objects.for_listing()[:3]),
+        'categories': services,
     }
     return render(request, 'frontend/index.html', context)
 
+@content_condition("TeamMember", "Testimonial")
 def about(request):
-    team_members = TeamMember.objects.all()
-    testimonials = Testimonial.objects.all()
-    return render(request, "frontend/about.html", {"team_members": team_members, "testimonials": testimonials})
+    return render(request, "frontend/about.html", {
+        "team_members": _public_team_members(),
+        "testimonials": _public_testimonials(),
+    })
 
+@content_condition()
 def services_page(request):
-    services = Service.objects.all()
-    return render(request, "frontend/service.html", {"services": services})
+    return render(request, "frontend/service.html", {"services": _public_services()})
 
+@content_condition()
 def service_detail(request, slug):
     service = get_object_or_404(Service, slug=slug)
-    all_services = Service.objects.all()
-
-    # Handle both comma-separated and newline-separated features
-    raw = service.features_list or ''
-    if ',' in raw:
-        features = [f.strip() for f in raw.split(',') if f.strip()]
-    else:
-        features = [f.strip() for f in raw.splitlines() if f.strip()]
+    all_services = Service.objects.for_listing()
 
     return render(request, "frontend/service-single.html", {
         "service": service,
         "all_services": all_services,
-        "features": features,
     })
 
+@content_condition("Project")
 def portfolio(request):
-    projects = Project.objects.select_related('service_category').all()
+    projects = Project.objects.for_listing().select_related('service_category')
     categories = Service.objects.filter(projects__isnull=False).distinct()
     return render(request, "frontend/project.html", {
         "projects": projects,
         "categories": categories,
     })
 
+@content_condition("Project")
 def project_detail(request, pk):
     project = get_object_or_404(Project, pk=pk)
     return render(request, "frontend/project-single.html", {
         "project": project,
     })
 
+@content_condition("TeamMember")
 def team_page(request):
-    team_members = TeamMember.objects.all()
-    return render(request, "frontend/team.html", {"team_members": team_members})
+    return render(request, "frontend/team.html", {"team_members": _public_team_members()})
 
+@content_condition()
 def public_blog_list(request):
-    blogs = Blog.objects.all().order_by("-created_at")
+    blogs = Blog.objects.for_listing().order_by("-created_at")
     paginator = Paginator(blogs, 9)
     page = request.GET.get('page')
     blogs_paged = paginator.get_page(page)
     return render(request, "frontend/blog.html", {"blogs": blogs_paged})
 
+@content_condition()
 def blog_list(request):
-    all_blogs = Blog.objects.all()
+    all_blogs = Blog.objects.for_listing()
     paginator = Paginator(all_blogs, 6)
     page = request.GET.get('page')
     blogs = paginator.get_page(page)
     return render(request, "frontend/blog.html", {"blogs": blogs})
 
+@content_condition()
 def blog_detail(request, slug):
     blog = get_object_or_404(Blog, slug=slug)
-    recent_blogs = Blog.objects.exclude(slug=slug).order_by('-created_at')[:3]
+    recent_blogs = Blog.objects.for_listing().exclude(slug=slug).order_by('-created_at')[:3]
     return render(request, "frontend/blog-single.html", {
         "blog": blog,
         "recent_blogs": recent_blogs,
     })
 
-def _verify_recaptcha(token, user_ip=None):
-    recaptcha_secret = getattr(settings, "RECAPTCHA_SECRET_KEY", "")
-    if not recaptcha_secret:
-        return False
-
-    payload = {
-        "secret": recaptcha_secret,
-        "response": token or "",
-    }
-    if user_ip:
-        payload["remoteip"] = user_ip
-
-    try:
-        encoded_payload = parse.urlencode(payload).encode("utf-8")
-        recaptcha_request = urllib_request.Request(
-            "https://www.google.com/recaptcha/api/siteverify",
-            data=encoded_payload,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
-        with urllib_request.urlopen(recaptcha_request, timeout=10) as recaptcha_response:
-            response_data = json.loads(recaptcha_response.read().decode("utf-8"))
-        return bool(response_data.get("success"))
-    except Exception:
-        return False
-
 def contact(request):
     recaptcha_site_key = getattr(settings, "RECAPTCHA_SITE_KEY", "")
     recaptcha_secret = getattr(settings, "RECAPTCHA_SECRET_KEY", "")
@@ -634,7 +701,7 @@ def contact(request):
         message = request.POST.get('msg', '').strip()
         recaptcha_token = request.POST.get("g-recaptcha-response", "")
 
-        if recaptcha_enabled and not _verify_recaptcha(recaptcha_token, request.META.get("REMOTE_ADDR")):
+        if recaptcha_enabled and not verify_recaptcha(recaptcha_token, request.META.get("REMOTE_ADDR")):
             messages.error(request, "Captcha verification failed. Please try again.")
             return render(request, "frontend/contact.html", context)
 
@@ -678,9 +745,6 @@ def contact(request):
 #     return render(request, "frontend/service-inquiry.html", {"services": services})
 
 
-from django.core.mail import EmailMultiAlternatives
-from django.utils.html import strip_tags
-
 def service_inquiry(request):
     services = Service.objects.all()
     if request.method == 'POST':
@@ -693,97 +757,102 @@ def service_inquiry(request):
         location = request.POST.get('location', '').strip()
         message = request.POST.get('message', '').strip()
 
-        # 2. Save to Database
-        inquiry = ServiceInquiry.objects.create(
-            first_name=first_name,
-            last_name=last_name,
-            email=email_address,
-            phone=phone,
-            service_type_id=service_id or None,
-            location=location,
-            message=message,
-        )
-
-        # 3. Email Logic using your exact requested style
-        service_title = inquiry.service_type.name if inquiry.service_type else "General Service"
-        subject = "New Service Inquiry"
-
-        html_message = f"""
-<!DOCTYPE html>
-<html>
-<head><meta charset="UTF-8"></head>
-<body style="margin:0; padding:0; background-color:#f4f4f4; font-family: Arial, sans-serif;">
-    <table width="100%" cellpadding="0" cellspacing="0" style="padding:40px 20px;">
-        <tr>
-            <td align="center">
-                <table width="600" cellpadding="0" cellspacing="0" style="background:#ffffff; border-radius:8px; overflow:hidden; box-shadow:0 2px 8px rgba(0,0,0,0.1);">
-                    <tr>
-                        <td style="background:#2D4636; padding:30px; text-align:center;">
-                            <h2 style="margin:0; color:#ffffff;">New Service Inquiry</h2>
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding:30px;">
-                            <p style="color:#555; font-size:15px;">A new inquiry has been submitted through the Growscape website.</p>
-                            <table width="100%" cellpadding="0" cellspacing="0" style="border:1px solid #e0e0e0; border-radius:6px;">
-                                <tr>
-                                    <td style="padding:12px; font-weight:bold;">Full Name</td>
-                                    <td style="padding:12px;">{first_name} {last_name}</td>
-                                </tr>
-                                <tr style="background:#f8f9fa;">
-                                    <td style="padding:12px; font-weight:bold;">Email</td>
-                                    <td style="padding:12px;">{email_address}</td>
-                                </tr>
-                                <tr>
-                                    <td style="padding:12px; font-weight:bold;">Mobile</td>
-                                    <td style="padding:12px;">{phone}</td>
-                                </tr>
-                                <tr style="background:#f8f9fa;">
-                                    <td style="padding:12px; font-weight:bold;">Service</td>
-                                    <td style="padding:12px;">{service_title}</td>
-                                </tr>
-                                <tr>
-                                    <td style="padding:12px; font-weight:bold;">Location</td>
-                                    <td style="padding:12px;">{location}</td>
-                                </tr>
-                            </table>
-                            <p style="margin-top:20px;"><b>Message:</b> {message}</p>
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="background:#f8f9fa; padding:20px; text-align:center;">
-                            <p style="margin:0; font-size:13px; color:#888;">Growscape Landscaping LLC</p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-"""
-        plain_message = strip_tags(html_message)
-        email = EmailMultiAlternatives(
-            subject,
-            plain_message,
-            settings.EMAIL_HOST_USER,
-            ['info@growscape.ae']
-        )
-        email.attach_alternative(html_message, "text/html")
-        email.send(fail_silently=False)
+        # 2. Save the inquiry and queue the notification together; the
+        #    send_outbox worker delivers it, so SMTP never blocks the request.
+        with transaction.atomic():
+            inquiry = ServiceInquiry.objects.create(
+                first_name=first_name,
+                last_name=last_name,
+                email=email_address,
+                phone=phone,
+                service_type_id=service_id or None,
+                location=location,
+                message=message,
+            )
+            enqueue_email(
+                "New Service Inquiry",
+                "emails/service_inquiry.html",
+                {
+                    "inquiry": inquiry,
+                    "service_title": inquiry.service_type.name if inquiry.service_type else "General Service",
+                },
+                ["info@growscape.ae"],
+            )
 
         messages.success(request, "Your inquiry has been submitted!")
         return redirect('service_inquiry')
 
     return render(request, "frontend/service-inquiry.html", {"services": services})
 
-def gallery(request):
-    categories = Category.objects.all()
-    gallery_images = GalleryImage.objects.all()
+GALLERY_PAGE_SIZE = 24
+
+
+def _gallery_page(request):
+    """
+    One page of the public gallery, optionally limited to ?category=<id>.
+    Costs a COUNT plus a page query regardless of gallery size.
+    """
+    try:
+        active_category = int(request.GET.get("category", ""))
+    except ValueError:
+        active_category = None
+
+    images_qs = GalleryImage.objects.only("id", "category_id", "title", "image").order_by("-uploaded_at", "-id")
+    if active_category:
+        images_qs = images_qs.filter(category_id=active_category)
 
+    paginator = Paginator(images_qs, GALLERY_PAGE_SIZE)
+    return active_category, paginator.get_page(request.GET.get("page"))
+
+
+@content_condition("GalleryImage", "Category")
+def gallery(request):
+    active_category, page_obj = _gallery_page(request)
     return render(request, "frontend/gallery.html", {
-        "categories": categories,
-        "gallery_images": gallery_images,
+        "categories": Category.objects.order_by("name"),
+        "active_category": active_category,
+        "page_obj": page_obj,
+    })
+
+
+@content_condition("GalleryImage", "Category")
+def gallery_fragment(request):
+    """JSON endpoint used by the gallery's infinite scroll."""
+    active_category, page_obj = _gallery_page(request)
+    html = render_to_string(
+        "frontend/partials/gallery-items.html", {"gallery_images": page_obj}, request=request
+    )
+
+    next_url = None
+    if page_obj.has_next():
+        params = {"page": page_obj.next_page_number()}
+        if active_category:
+            params["category"] = active_category
+        next_url = f"{reverse('gallery_fragment')}?{parse.urlencode(params)}"
+
+    return JsonResponse({
+        "html": html,
+        "page": page_obj.number,
+        "has_next": page_obj.has_next(),
+        "next_url": next_url,
+    })
+
+SEARCH_RESULT_LIMIT = 30
+
+
+def search_page(request):
+    query = request.GET.get("q", "").strip()
+    results = search(query, limit=SEARCH_RESULT_LIMIT) if query else []
+    return render(request, "frontend/search.html", {"query": query, "results": results})
+
+
+def search_json(request):
+    query = request.GET.get("q", "").strip()
+    kinds = request.GET.getlist("kind")
+    results = search(query, limit=SEARCH_RESULT_LIMIT, kinds=kinds) if query else []
+    return JsonResponse({
+        "query": query,
+        "results": [dict(result, snippet=str(result["snippet"])) for result in results],
     })
 
 def custom_404(request, exception):
@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'growscape_app',
 ]
 
@@ -32,7 +33,9 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'growscape_app.page_cache.PageCacheMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'growscape_app.profiling.QueryProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'growscape_project.urls'
@@ -81,17 +84,87 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    # Uploads are stored by content hash and shared between rows; reclaim
+    # unreferenced files with `manage.py media_gc` (growscape_app/storage.py).
+    'default': {'BACKEND': 'growscape_app.storage.ContentAddressedStorage'},
+    # WhiteNoise's compressed manifest storage plus AVIF/WebP variants of
+    # static/images for {% responsive_static %} (growscape_app/staticfiles.py).
+    'staticfiles': {'BACKEND': 'growscape_app.staticfiles.ResponsiveStaticFilesStorage'},
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Local memory by default. Point REDIS_URL at a shared Redis (requires the
+# `redis` package) in production: with the per-process default, a content
+# change reaches other gunicorn workers only when their copy expires, so the
+# content cache is kept for seconds instead of a day.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'growscape',
+    }
+}
+CONTENT_CACHE_TIMEOUT = 30
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+    CONTENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Release id mixed into public page ETags so a deploy revalidates cached
+# copies; when unset the newest template mtime is used.
+RELEASE = os.environ.get('RELEASE', '')
+
+# Full-page cache for anonymous visitors (growscape_app/page_cache.py). Pages
+# are purged by content generation, which only reaches every worker through a
+# shared cache, so it is on by default with REDIS_URL and opt-in (PAGE_CACHE=1)
+# otherwise. The stale copy is only served when the database fails.
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE', '1' if os.environ.get('REDIS_URL') else '0') == '1'
+PAGE_CACHE_TIMEOUT = 60 * 60
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60 * 24 * 7
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_LOCK_WAIT = 3
+
+# Query profiler (growscape_app/profiling.py); off unless QUERY_PROFILER=1.
+QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER', '') == '1'
+QUERY_PROFILER_SLOW_MS = 100
+QUERY_PROFILER_N_PLUS_ONE = 5
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media outside DEBUG (growscape_app/media.py): 'accel' hands files to nginx
+# with X-Accel-Redirect, 'sendfile' uses X-Sendfile, 'python' streams them
+# from the worker. Unset, /media/ is only routed when DEBUG is on.
+MEDIA_SERVE_MODE = os.environ.get('MEDIA_SERVE_MODE', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+# Bulk gallery uploads (see growscape_app/uploads.py).
+DATA_UPLOAD_MAX_NUMBER_FILES = 500
+GALLERY_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+# Pool size for `manage.py process_image_jobs`, which builds their derivatives.
+GALLERY_UPLOAD_WORKERS = None  # defaults to min(4, CPU count)
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.zoho.in'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# Override with e.g. EMAIL_HOST=localhost EMAIL_PORT=1025 EMAIL_USE_TLS=0
+# EMAIL_HOST_PASSWORD= to send through a local debugging SMTP server.
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.zoho.in')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+EMAIL_TIMEOUT = 30
 EMAIL_HOST_USER = 'your-email@yourdomain.com'
-EMAIL_HOST_PASSWORD = 'your-email-password'
-DEFAULT_FROM_EMAIL = 'Your Company <your-email@yourdomain.com>'
\ No newline at end of file
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', 'your-email-password')
+DEFAULT_FROM_EMAIL = 'Your Company <your-email@yourdomain.com>'
+# reCAPTCHA verification (see growscape_app/recaptcha.py). The site/secret
+# keys are read with getattr, so the contact form works without them.
+RECAPTCHA_VERIFY_URL = 'https://www.google.com/recaptcha/api/siteverify'
+RECAPTCHA_TIMEOUT = 2.0
+RECAPTCHA_BREAKER_THRESHOLD = 5
+RECAPTCHA_BREAKER_RESET = 30
+# 'reject' fails closed while the provider is degraded; 'allow' lets submissions through.
+RECAPTCHA_DEGRADED_POLICY = 'reject'
+# Seconds between each worker's INFO log line of verify counters and latency; 0 disables it.
+RECAPTCHA_METRICS_LOG_INTERVAL = 300
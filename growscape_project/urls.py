@@ -1,35 +1,39 @@
 from django.contrib import admin
-from django.urls import path, include  
+from django.urls import path, include, re_path
 from django.conf import settings        
 from django.conf.urls.static import static
 from django.conf.urls import handler404
-from django.contrib.sitemaps.views import sitemap
-from growscape_app.sitemap import StaticViewSitemap, BlogSitemap, ServiceSitemap, ProjectSitemap
+from growscape_app.media import serve_media
+from growscape_app.sitemap import sitemap_index, sitemap_section
 from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
 import os
+import re
 
-sitemaps = {
-    'static': StaticViewSitemap,
-    'blog': BlogSitemap,
-    'service': ServiceSitemap,
-    'project': ProjectSitemap,
-}
+# Read once at import; the file only changes on deploy.
+with open(os.path.join(settings.BASE_DIR, 'growscape_project', 'robots.txt'), 'rb') as f:
+    ROBOTS_TXT = f.read()
 
 def robots_txt(request):
-    file_path = os.path.join(settings.BASE_DIR, 'growscape_project', 'robots.txt')
-    with open(file_path, 'r') as f:
-        return HttpResponse(f.read(), content_type="text/plain")
+    response = HttpResponse(ROBOTS_TXT, content_type="text/plain")
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24)
+    return response
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('growscape_app.urls')),
     
     path('robots.txt', robots_txt),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='sitemap'),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-<section>.xml', sitemap_section, name='sitemap_section'),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+elif settings.MEDIA_SERVE_MODE:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    ]
 
 handler404 = 'growscape_app.views.custom_404'
\ No newline at end of file
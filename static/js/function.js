@@ -315,6 +315,10 @@
 			$menudisesnav.on('click', function (e) {
 
 				var filterValue = $(this).attr('data-filter');
+				/* Plain links (e.g. server-side gallery categories) navigate normally */
+				if (!filterValue) {
+					return;
+				}
 				$menuitem.isotope({
 					filter: filterValue
 				});